@@ -6,6 +6,7 @@ from flask_cors import CORS
 from datetime import timedelta
 import cloudinary
 import os
+import tempfile
 
 
 def create_app():
@@ -20,7 +21,8 @@ def create_app():
             "http://localhost:3000",                 # local frontend
             "https://blogs-frontend-33c1.vercel.app"    # your deployed frontend (change if needed)
         ]}},
-        supports_credentials=True
+        supports_credentials=True,
+        expose_headers=["X-Next-Cursor", "ETag", "X-Cache"]
     )
 
     # -------------------------
@@ -38,6 +40,49 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = database_url
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    # -------------------------
+    # Connection Pool Configuration
+    # -------------------------
+    # See app/database.py for the sizing formula; WEB_THREADS should match
+    # gunicorn's --threads
+    app.config["UPLOAD_WORKERS"] = int(os.getenv("UPLOAD_WORKERS", 4))
+    app.config["DB_POOL_SIZE"] = int(os.getenv(
+        "DB_POOL_SIZE",
+        int(os.getenv("WEB_THREADS", 1)) + app.config["UPLOAD_WORKERS"] + 1
+    ))
+    app.config["DB_MAX_OVERFLOW"] = int(
+        os.getenv("DB_MAX_OVERFLOW", app.config["DB_POOL_SIZE"] // 2)
+    )
+    app.config["DB_POOL_TIMEOUT"] = float(os.getenv("DB_POOL_TIMEOUT", 10))
+    app.config["DB_POOL_RECYCLE"] = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    app.config["DB_POOL_PRE_PING"] = os.getenv("DB_POOL_PRE_PING", "true") == "true"
+    app.config["DB_STATEMENT_TIMEOUT_MS"] = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 0))
+    # Transaction-pooling PgBouncer in front of Postgres
+    app.config["DB_PGBOUNCER"] = os.getenv("DB_PGBOUNCER", "false") == "true"
+
+    from app.database import engine_options
+
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(app.config, database_url)
+
+    # -------------------------
+    # Read Replica Configuration
+    # -------------------------
+    # Comma-separated; GET/HEAD requests read from a healthy replica. Requires
+    # CACHE_BACKEND=redis, which holds the read-your-writes markers
+    replica_urls = [
+        url.strip().replace("postgres://", "postgresql://", 1)
+        for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+        if url.strip()
+    ]
+    app.config["SQLALCHEMY_BINDS"] = {
+        f"replica_{i}": {"url": url, **engine_options(app.config, url)}
+        for i, url in enumerate(replica_urls)
+    }
+    app.config["REPLICA_MAX_LAG_SECONDS"] = float(os.getenv("REPLICA_MAX_LAG_SECONDS", 5))
+    app.config["REPLICA_CHECK_SECONDS"] = float(os.getenv("REPLICA_CHECK_SECONDS", 5))
+    # How long a user's reads stay on the primary after they write
+    app.config["REPLICA_STICKY_SECONDS"] = float(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
     # -------------------------
     # JWT Configuration
     # -------------------------
@@ -45,6 +90,14 @@ def create_app():
     app.config["JWT_ACCESS_TOKEN_EXPIRES"] = timedelta(minutes=15)
     app.config["JWT_REFRESH_TOKEN_EXPIRES"] = timedelta(days=7)
 
+    # -------------------------
+    # Timeline Configuration
+    # -------------------------
+    app.config["TIMELINE_MAX_LENGTH"] = int(os.getenv("TIMELINE_MAX_LENGTH", 500))
+    app.config["TIMELINE_FANOUT_MAX_FOLLOWERS"] = int(
+        os.getenv("TIMELINE_FANOUT_MAX_FOLLOWERS", 5000)
+    )
+
     # -------------------------
     # Cloudinary Configuration
     # -------------------------
@@ -55,6 +108,78 @@ def create_app():
         secure=True
     )
 
+    # -------------------------
+    # Upload Pipeline Configuration
+    # -------------------------
+    app.config["UPLOAD_BACKEND"] = os.getenv("UPLOAD_BACKEND", "cloudinary")
+    app.config["UPLOAD_SPOOL_DIR"] = os.getenv(
+        "UPLOAD_SPOOL_DIR",
+        os.path.join(tempfile.gettempdir(), "blig_uploads")
+    )
+    app.config["UPLOAD_LOCAL_ROOT"] = os.getenv(
+        "UPLOAD_LOCAL_ROOT",
+        os.path.join(app.instance_path, "media")
+    )
+    app.config["UPLOAD_LOCAL_BASE_URL"] = os.getenv("UPLOAD_LOCAL_BASE_URL", "/media")
+
+    # -------------------------
+    # Password Hashing Configuration
+    # -------------------------
+    app.config["BCRYPT_ROUNDS"] = int(os.getenv("BCRYPT_ROUNDS", 12))
+    # Leave at least half the cores to the rest of the API during login bursts
+    app.config["BCRYPT_WORKERS"] = int(
+        os.getenv("BCRYPT_WORKERS", max(1, (os.cpu_count() or 2) // 2))
+    )
+    app.config["BCRYPT_MAX_QUEUE"] = int(os.getenv("BCRYPT_MAX_QUEUE", 16))
+    app.config["BCRYPT_TIMEOUT_SECONDS"] = float(os.getenv("BCRYPT_TIMEOUT_SECONDS", 5))
+
+    # -------------------------
+    # Like Buffer Configuration
+    # -------------------------
+    # 0 writes likes through on the request; >0 buffers toggles and
+    # flushes them in bulk every LIKE_BUFFER_MS milliseconds
+    app.config["LIKE_BUFFER_MS"] = float(os.getenv("LIKE_BUFFER_MS", 0))
+    app.config["LIKE_BUFFER_MAX_PENDING"] = int(os.getenv("LIKE_BUFFER_MAX_PENDING", 5000))
+
+    # -------------------------
+    # Account Deletion Configuration
+    # -------------------------
+    # Accounts whose deletion touches more rows than this (blogs with their
+    # likes and comments, the user's own likes, comments and follows) are
+    # deleted in the background
+    app.config["ACCOUNT_DELETE_SYNC_MAX_ROWS"] = int(
+        os.getenv("ACCOUNT_DELETE_SYNC_MAX_ROWS", 1000)
+    )
+    app.config["ACCOUNT_DELETE_CHUNK_SIZE"] = int(os.getenv("ACCOUNT_DELETE_CHUNK_SIZE", 500))
+
+    # -------------------------
+    # Batch Configuration
+    # -------------------------
+    app.config["BATCH_MAX_REQUESTS"] = int(os.getenv("BATCH_MAX_REQUESTS", 20))
+
+    # -------------------------
+    # Response Cache Configuration
+    # -------------------------
+    # none | redis | lru. Invalidations only reach every worker through
+    # Redis; lru is for a single worker (e.g. development)
+    app.config["CACHE_BACKEND"] = os.getenv("CACHE_BACKEND", "none")
+    app.config["CACHE_REDIS_URL"] = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    app.config["CACHE_TTL_SECONDS"] = float(os.getenv("CACHE_TTL_SECONDS", 30))
+    app.config["CACHE_MAX_ENTRIES"] = int(os.getenv("CACHE_MAX_ENTRIES", 2048))
+
+    # -------------------------
+    # JSON Configuration
+    # -------------------------
+    # Encode responses with orjson when it is installed
+    app.config["JSON_FAST_ENCODER"] = os.getenv("JSON_FAST_ENCODER", "true") == "true"
+
+    # -------------------------
+    # Metrics Configuration
+    # -------------------------
+    # /metrics is only served when a bearer token is configured
+    app.config["METRICS_TOKEN"] = os.getenv("METRICS_TOKEN")
+    app.config["SLOW_REQUEST_MS"] = float(os.getenv("SLOW_REQUEST_MS", 0))
+
     # -------------------------
     # Initialize Extensions
     # -------------------------
@@ -62,16 +187,60 @@ def create_app():
     Migrate(app, db)
     jwt = JWTManager(app)
 
+    from app.metrics import init_metrics
+
+    init_metrics(app)
+
+    from app.serializers import init_json
+
+    init_json(app)
+
+    from app.cache import create_response_cache
+
+    app.extensions["response_cache"] = create_response_cache(app)
+
+    from app.replicas import init_replicas
+
+    app.extensions["replica_router"] = init_replicas(app)
+
+    from app.passwords import create_password_hasher
+
+    app.extensions["password_hasher"] = create_password_hasher(app)
+
+    from app.likes import create_like_buffer
+
+    app.extensions["like_buffer"] = create_like_buffer(app)
+
+    from app.uploads import UploadPipeline, create_backend
+
+    app.extensions["upload_pipeline"] = UploadPipeline(
+        app,
+        backend=create_backend(app),
+        spool_dir=app.config["UPLOAD_SPOOL_DIR"],
+        max_workers=app.config["UPLOAD_WORKERS"]
+    )
+
+    from app.deletions import create_account_deleter
+
+    app.extensions["account_deleter"] = create_account_deleter(app)
+
     # -------------------------
     # Token Revocation Check
     # -------------------------
-    from app.models import TokenBlocklist
+    from app.blocklist import BlocklistCache
+
+    app.extensions["blocklist_cache"] = BlocklistCache(
+        token_lifetime=max(
+            app.config["JWT_ACCESS_TOKEN_EXPIRES"],
+            app.config["JWT_REFRESH_TOKEN_EXPIRES"]
+        ),
+        refresh_interval=float(os.getenv("BLOCKLIST_REFRESH_SECONDS", 5))
+    )
 
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
         jti = jwt_payload["jti"]
-        token = TokenBlocklist.query.filter_by(jti=jti).first()
-        return token is not None
+        return app.extensions["blocklist_cache"].is_revoked(jti)
 
     # -------------------------
     # Register Blueprints
@@ -80,11 +249,20 @@ def create_app():
     from app.routes.blog import blog_bp
     from app.routes.follow import follow_bp
     from app.routes.comment import comment_bp
+    from app.routes.batch import batch_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(blog_bp)
     app.register_blueprint(follow_bp)
     app.register_blueprint(comment_bp)
+    app.register_blueprint(batch_bp)
+
+    # -------------------------
+    # CLI Commands
+    # -------------------------
+    from app.commands import register_commands
+
+    register_commands(app)
 
     # -------------------------
     # Health Check
@@ -0,0 +1,176 @@
+import re
+from dataclasses import dataclass
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event, select
+from sqlalchemy.engine import Engine
+from app.extensions import db
+from app.models import Blog, Comment, Media, User
+from app.cache import ResponseCache
+
+# Query strings to request each endpoint with, formatted with the sample
+# values; endpoints not listed are requested once without one
+ROUTE_QUERIES = {
+    "blog.get_all_blogs": ["", "cursor=", "view=summary"],
+    "blog.search_blogs_view": ["q={term}", "q={term}&view=summary"],
+    "blog.trending_blogs_view": ["", "window=7d&view=summary"],
+    "comment.get_comments": ["", "since=2000-01-01T00:00:00"],
+}
+
+# SQLite's EXPLAIN QUERY PLAN reports a full table scan as "SCAN <table>"
+# without a USING clause
+_SQLITE_SCAN = re.compile(r"^SCAN (\w+)$")
+
+
+@dataclass
+class SeqScan:
+    endpoint: str
+    path: str
+    table: str
+    rows: int
+    statement: str
+
+
+# -------------------------
+# SAMPLE REQUESTS
+# -------------------------
+def _samples():
+    # The busiest rows, so listings have something to scan
+    blog_id = db.session.scalar(
+        select(Blog.id).order_by(Blog.comments_count.desc(), Blog.id).limit(1)
+    )
+    term = db.session.scalar(select(Blog.title).where(Blog.id == blog_id)) or "a"
+
+    return {
+        "blog_id": blog_id or 1,
+        "user_id": db.session.scalar(
+            select(User.id).order_by(User.followers_count.desc(), User.id).limit(1)
+        ) or 1,
+        "viewer_id": db.session.scalar(
+            select(User.id).order_by(User.following_count.desc(), User.id).limit(1)
+        ) or 1,
+        "media_id": db.session.scalar(select(Media.id).order_by(Media.id).limit(1)) or 1,
+        "comment_id": db.session.scalar(select(Comment.id).order_by(Comment.id).limit(1)) or 1,
+        "term": (re.findall(r"\w+", term) or ["a"])[0]
+    }
+
+
+def sample_requests(app):
+    """(endpoint, path) for every GET route, with URL arguments filled from
+    existing rows."""
+    samples = _samples()
+    requests = []
+
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: rule.rule):
+        if "GET" not in rule.methods or rule.endpoint == "static":
+            continue
+
+        path = rule.build({arg: samples[arg] for arg in rule.arguments})[1]
+        for query in ROUTE_QUERIES.get(rule.endpoint, [""]):
+            query = query.format(**samples)
+            requests.append((rule.endpoint, f"{path}?{query}" if query else path))
+
+    return requests, samples["viewer_id"]
+
+
+# -------------------------
+# EXPLAIN
+# -------------------------
+def _table_rows(conn, table):
+    if conn.dialect.name == "postgresql":
+        # The planner's estimate; exact counts would scan what we flag
+        return int(conn.exec_driver_sql(
+            "SELECT reltuples FROM pg_class WHERE oid = %(table)s::regclass",
+            {"table": table}
+        ).scalar() or 0)
+    return conn.exec_driver_sql(f'SELECT count(*) FROM "{table}"').scalar()
+
+
+def _postgres_scans(conn, statement, parameters):
+    plan = conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters).scalar()
+
+    def walk(node):
+        if node["Node Type"] == "Seq Scan":
+            yield node["Relation Name"]
+        for child in node.get("Plans", ()):
+            yield from walk(child)
+
+    return list(walk(plan[0]["Plan"]))
+
+
+def _sqlite_scans(conn, statement, parameters):
+    rows = conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+    return [
+        match.group(1)
+        for *_, detail in rows
+        if (match := _SQLITE_SCAN.match(detail))
+    ]
+
+
+def seq_scans(engine, statement, parameters):
+    """Tables ``statement`` reads with a full sequential scan."""
+    with engine.connect() as conn:
+        if conn.dialect.name == "postgresql":
+            scans = _postgres_scans(conn, statement, parameters)
+        else:
+            scans = _sqlite_scans(conn, statement, parameters)
+
+    # Scans of subqueries and CTEs are not scans of a table
+    return [table for table in scans if table in db.metadata.tables]
+
+
+def table_rows(engine, table):
+    with engine.connect() as conn:
+        return _table_rows(conn, table)
+
+
+# -------------------------
+# ADVISOR
+# -------------------------
+def find_seq_scans(app, min_rows):
+    """Request every GET route once and EXPLAIN each SELECT it issued.
+
+    Returns ``(statements_per_request, [SeqScan, ...])`` for full scans of
+    tables holding at least ``min_rows`` rows. Only read routes are
+    requested, so running this against a live database changes nothing.
+    """
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith("SELECT"):
+            captured.append((conn.engine, statement, parameters))
+
+    with app.app_context():
+        requests, viewer_id = sample_requests(app)
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(viewer_id))}"}
+
+    # Cache hits would hide the queries behind them
+    cache = app.extensions["response_cache"]
+    app.extensions["response_cache"] = ResponseCache(None, 0)
+
+    client = app.test_client()
+    issued = {}
+    findings = []
+    sizes = {}
+
+    event.listen(Engine, "before_cursor_execute", capture)
+    try:
+        for endpoint, path in requests:
+            captured.clear()
+            client.get(path, headers=headers)
+            issued[path] = len(captured)
+
+            statements = list(captured)
+            with app.app_context():
+                for engine, statement, parameters in statements:
+                    for table in seq_scans(engine, statement, parameters):
+                        if (engine, table) not in sizes:
+                            sizes[engine, table] = table_rows(engine, table)
+                        if sizes[engine, table] >= min_rows:
+                            findings.append(SeqScan(
+                                endpoint, path, table, sizes[engine, table], statement
+                            ))
+    finally:
+        event.remove(Engine, "before_cursor_execute", capture)
+        app.extensions["response_cache"] = cache
+
+    return issued, findings
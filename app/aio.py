@@ -0,0 +1,250 @@
+import asyncio
+import contextvars
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.util import greenlet_spawn
+from werkzeug.exceptions import HTTPException
+from app.cache import RedisBackend
+from app.database import engine_options
+from app.extensions import db
+from app.metrics import instrument_engine
+
+# ASGI serving
+# ------------
+# Requests run the unchanged Flask app inside a greenlet, the same mechanism
+# SQLAlchemy's asyncio extension uses internally: each query issued through
+# db.session is awaited on the event loop via the async driver, so a slow
+# query parks one coroutine instead of a whole worker. Routes, hooks,
+# caching and error handling are therefore identical to WSGI mode.
+#
+# Endpoints that block on something other than the database (bcrypt, and
+# uploads spooled to disk) are handed to a thread pool and use the regular
+# synchronous engine instead.
+#
+# Not covered: the Redis cache backend uses the synchronous client, so with
+# CACHE_BACKEND=redis every cache lookup blocks the event loop for one round
+# trip. Likewise UPLOAD_WORKERS=0 runs storage
+# uploads inline in the (threaded) upload request.
+
+THREADED_ENDPOINTS = {
+    "auth.register",
+    "auth.login",
+    "auth.upload_profile_image",
+    "blog.upload_media"
+}
+
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite"
+}
+
+# Engines for sessions created by the request currently being served
+_async_engines = contextvars.ContextVar("async_engines", default=None)
+
+
+def async_database_url(database_url):
+    url = make_url(database_url)
+    url = url.set(drivername=ASYNC_DRIVERS[url.get_backend_name()])
+
+    # asyncpg spells libpq's sslmode as ssl
+    if "sslmode" in url.query:
+        url = url.difference_update_query(["sslmode"]).update_query_dict(
+            {"ssl": url.query["sslmode"]}
+        )
+
+    return url.render_as_string(hide_password=False)
+
+
+def _install_session_factory():
+    # db.session builds sessions with a sessionmaker; while an async request
+    # is being served, hand it the async engines in place of db.engines
+    registry = db.session.registry
+    if getattr(registry.createfunc, "async_aware", False):
+        return
+
+    default = registry.createfunc
+
+    def create_session():
+        engines = _async_engines.get()
+        if engines is None:
+            return default()
+        return default(db=engines)
+
+    create_session.async_aware = True
+    registry.createfunc = create_session
+
+
+class AsgiApp:
+    """Serve a Flask app over ASGI with async database I/O."""
+
+    def __init__(self, flask_app, threads=8):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="asgi")
+        self.engines = None
+        _install_session_factory()
+
+        cache = flask_app.extensions.get("response_cache")
+        if cache is not None and isinstance(cache.backend, RedisBackend):
+            flask_app.logger.warning(
+                "CACHE_BACKEND=redis uses a synchronous client; "
+                "cache lookups will block the event loop"
+            )
+
+    # -------------------------
+    # ENGINES
+    # -------------------------
+    def _create_engines(self):
+        # Created on first use so that each server worker process gets its
+        # own pools after forking
+        config = self.flask_app.config
+        urls = {None: config["SQLALCHEMY_DATABASE_URI"]}
+        urls.update({
+            key: bind["url"] for key, bind in config["SQLALCHEMY_BINDS"].items()
+        })
+
+        engines = {}
+        for key, url in urls.items():
+            async_url = async_database_url(url)
+            engine = create_async_engine(async_url, **engine_options(config, async_url))
+            instrument_engine(engine.sync_engine, "async" if key is None else f"async_{key}")
+            engines[key] = engine
+
+        self.async_engines = engines
+        self.engines = SimpleNamespace(
+            engines={key: engine.sync_engine for key, engine in engines.items()}
+        )
+
+    async def _dispose(self):
+        if self.engines is not None:
+            for engine in self.async_engines.values():
+                await engine.dispose()
+        self.executor.shutdown(wait=False)
+
+    # -------------------------
+    # ASGI
+    # -------------------------
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+
+        if scope["type"] != "http":
+            raise RuntimeError(f"Unsupported ASGI scope type {scope['type']!r}")
+
+        if self.engines is None:
+            self._create_engines()
+
+        environ = _environ(scope, await _read_body(receive))
+
+        if self._endpoint(environ) in THREADED_ENDPOINTS:
+            loop = asyncio.get_running_loop()
+            status, headers, body = await loop.run_in_executor(
+                self.executor, self._call_wsgi, environ, None
+            )
+        else:
+            status, headers, body = await greenlet_spawn(
+                self._call_wsgi, environ, self.engines
+            )
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": headers
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self._dispose()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _endpoint(self, environ):
+        try:
+            endpoint, _ = self.flask_app.url_map.bind_to_environ(environ).match()
+        except HTTPException:
+            return None
+        return endpoint
+
+    def _call_wsgi(self, environ, engines):
+        token = _async_engines.set(engines)
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started["status"] = int(status.split(" ", 1)[0])
+            started["headers"] = [
+                (name.lower().encode("latin-1"), value.encode("latin-1"))
+                for name, value in headers
+            ]
+
+        try:
+            chunks = self.flask_app(environ, start_response)
+            try:
+                body = b"".join(chunks)
+            finally:
+                if hasattr(chunks, "close"):
+                    chunks.close()
+        finally:
+            _async_engines.reset(token)
+
+        return started["status"], started["headers"], body
+
+
+# -------------------------
+# ASGI -> WSGI TRANSLATION
+# -------------------------
+async def _read_body(receive):
+    body = bytearray()
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body", False):
+            return bytes(body)
+
+
+def _environ(scope, body):
+    server = scope.get("server") or ("localhost", 80)
+    client = scope.get("client") or ("", 0)
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin-1"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": str(client[1]),
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+        "CONTENT_LENGTH": str(len(body))
+    }
+
+    for name, value in scope.get("headers", []):
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+
+        if name == "CONTENT_TYPE":
+            environ["CONTENT_TYPE"] = value
+            continue
+        if name == "CONTENT_LENGTH":
+            continue
+
+        key = f"HTTP_{name}"
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
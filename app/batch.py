@@ -0,0 +1,105 @@
+from contextlib import contextmanager
+from functools import wraps
+from flask import current_app, g, has_app_context, request
+from werkzeug.test import EnvironBuilder
+from app.extensions import db
+
+# Headers of the /batch request that every sub-request sees as its own
+FORWARDED_HEADERS = ("Authorization", "Accept", "Accept-Language")
+
+# Per-request metrics state merged back into the /batch request
+_SQL_TOTALS = ("sql_count", "sql_time")
+
+
+# Sub-requests of a batch are dispatched through the regular routes, one
+# after another, inside the /batch request's app context. They therefore
+# share its database session (and identity map), the resolved viewer and
+# any lookup wrapped in batch_memo, so ten sub-requests about the same
+# blog load it once. Identical sub-requests run once.
+
+def batch_memo(fn):
+    """Reuse ``fn``'s result for identical arguments within one batch;
+    outside a batch every call goes through."""
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        memo = g.get("batch_memo") if has_app_context() else None
+        if memo is None:
+            return fn(*args, **kwargs)
+
+        key = (fn.__qualname__, args, tuple(sorted(kwargs.items())))
+        if key not in memo:
+            memo[key] = fn(*args, **kwargs)
+        return memo[key]
+
+    return wrapper
+
+
+@contextmanager
+def _own_globals():
+    # Request hooks keep per-request state on g, which the shared app
+    # context would otherwise hand from one sub-request to the next
+    outer = dict(vars(g))
+    try:
+        yield
+    finally:
+        inner = dict(vars(g))
+        vars(g).clear()
+        vars(g).update(outer)
+
+        for name in _SQL_TOTALS:
+            if name in outer:
+                setattr(g, name, outer[name] + inner.get(name, 0))
+        if "sql_statements" in outer:
+            g.sql_statements.extend(inner.get("sql_statements", ()))
+
+
+def _dispatch(app, path):
+    builder = EnvironBuilder(
+        path=path,
+        method="GET",
+        base_url=request.host_url,
+        headers=[
+            (name, request.headers[name])
+            for name in FORWARDED_HEADERS if name in request.headers
+        ]
+    )
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    with _own_globals(), app.request_context(environ):
+        try:
+            response = app.full_dispatch_request()
+        except Exception as e:
+            db.session.rollback()
+            response = app.make_response(app.handle_exception(e))
+
+    return {
+        "path": path,
+        "status": response.status_code,
+        "headers": {
+            name: value for name, value in response.headers.items()
+            if name not in ("Content-Length", "Content-Type")
+        },
+        "body": response.get_json(silent=True)
+    }
+
+
+def run_batch(paths):
+    """GET each of ``paths`` and return their results in order."""
+    app = current_app._get_current_object()
+
+    # Created here so that they outlive each sub-request's globals
+    g.setdefault("viewer_ids", {})
+    g.batch_memo = {}
+
+    results = {}
+    try:
+        for path in paths:
+            if path not in results:
+                results[path] = _dispatch(app, path)
+    finally:
+        g.pop("batch_memo", None)
+
+    return [results[path] for path in paths]
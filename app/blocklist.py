@@ -0,0 +1,177 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from flask import current_app
+from app.extensions import db
+from app.database import dialect_insert
+from app.models import TokenBlocklist
+from app.metrics import REGISTRY, Gauge
+from app.replicas import use_primary
+
+# Rows committed by other workers may carry a created_at slightly older
+# than our last refresh, so each refresh re-reads this much history.
+REFRESH_OVERLAP = timedelta(seconds=30)
+
+
+class BlocklistCache:
+    """Per-process set of revoked JTIs, refreshed incrementally.
+
+    Lookups are served from memory. At most once every ``refresh_interval``
+    seconds the cache pulls rows added to ``token_blocklist`` since the last
+    refresh, so a revocation made by another worker is seen within that
+    delay. Entries are dropped once the token they revoke has expired.
+    """
+
+    def __init__(self, token_lifetime, refresh_interval):
+        self.token_lifetime = token_lifetime
+        self.refresh_interval = refresh_interval
+        self._revoked = {}
+        self._watermark = None
+        self._next_refresh = 0.0
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti):
+        self._maybe_refresh()
+        expires_at = self._revoked.get(jti)
+        return expires_at is not None and expires_at > datetime.utcnow()
+
+    def __len__(self):
+        return len(self._revoked)
+
+    def add(self, jti, revoked_at, expires_at=None):
+        self._revoked[jti] = expires_at or revoked_at + self.token_lifetime
+
+    def _maybe_refresh(self):
+        if time.monotonic() < self._next_refresh:
+            return
+
+        with self._lock:
+            if time.monotonic() < self._next_refresh:
+                return
+            self._refresh()
+            self._next_refresh = time.monotonic() + self.refresh_interval
+
+    def _refresh(self):
+        now = datetime.utcnow()
+        since = now - self.token_lifetime
+        if self._watermark is not None:
+            since = max(since, self._watermark - REFRESH_OVERLAP)
+
+        # A lagging replica could hide a revocation
+        with use_primary():
+            rows = db.session.query(
+                TokenBlocklist.jti,
+                TokenBlocklist.created_at,
+                TokenBlocklist.expires_at
+            ).filter(TokenBlocklist.created_at >= since).all()
+
+        for jti, created_at, expires_at in rows:
+            self.add(jti, created_at, expires_at)
+
+        self._revoked = {
+            jti: expires_at
+            for jti, expires_at in list(self._revoked.items())
+            if expires_at > now
+        }
+        self._watermark = now
+
+
+def blocklist_cache():
+    return current_app.extensions["blocklist_cache"]
+
+
+def revoke_token(jti, exp):
+    """Revoke ``jti``; revoking it again (a retried logout) is a no-op."""
+    revoked_at = datetime.utcnow()
+    expires_at = datetime.utcfromtimestamp(exp)
+
+    db.session.execute(
+        dialect_insert(db.session, TokenBlocklist)
+        .values(jti=jti, created_at=revoked_at, expires_at=expires_at)
+        .on_conflict_do_nothing(index_elements=["jti"])
+    )
+    db.session.commit()
+
+    blocklist_cache().add(jti, revoked_at, expires_at)
+
+
+# -------------------------
+# COMPACTION
+# -------------------------
+def _expired_filter(now):
+    # Legacy rows have no expires_at; they are dead once the longest
+    # token lifetime has passed since they were written.
+    legacy_cutoff = now - blocklist_cache().token_lifetime
+    return db.or_(
+        TokenBlocklist.expires_at < now,
+        db.and_(
+            TokenBlocklist.expires_at.is_(None),
+            TokenBlocklist.created_at < legacy_cutoff
+        )
+    )
+
+
+def purge_expired_tokens(batch_size=1000, pause=0.0):
+    """Delete expired rows in short batches; returns the number deleted.
+
+    Each batch is its own transaction so row locks are held only briefly
+    and concurrent logouts are never blocked for long.
+    """
+    now = datetime.utcnow()
+    deleted = 0
+
+    while True:
+        ids = [
+            row_id for (row_id,) in db.session.query(TokenBlocklist.id)
+            .filter(_expired_filter(now))
+            .order_by(TokenBlocklist.id)
+            .limit(batch_size)
+        ]
+        if not ids:
+            break
+
+        TokenBlocklist.query.filter(
+            TokenBlocklist.id.in_(ids)
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        deleted += len(ids)
+
+        if len(ids) < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    return deleted
+
+
+def blocklist_stats():
+    now = datetime.utcnow()
+    return {
+        "rows": db.session.query(db.func.count(TokenBlocklist.id)).scalar(),
+        "expired_rows": db.session.query(
+            db.func.count(TokenBlocklist.id)
+        ).filter(_expired_filter(now)).scalar(),
+        "cached_jtis": len(blocklist_cache())
+    }
+
+
+def _blocklist_gauge():
+    # Scraped every few seconds, so no COUNT(*): the table total is the
+    # planner's estimate on Postgres and left out elsewhere
+    values = {("cached",): len(blocklist_cache())}
+
+    if db.session.get_bind().dialect.name == "postgresql":
+        # -1 until the table is first analyzed
+        values[("total",)] = max(0, int(db.session.execute(
+            db.text("SELECT reltuples FROM pg_class WHERE oid = 'token_blocklist'::regclass")
+        ).scalar() or 0))
+
+    return values
+
+
+REGISTRY.register(Gauge(
+    "blig_token_blocklist_rows",
+    "Revoked JTIs cached by this process, and the estimated rows in token_blocklist.",
+    ["state"],
+    callback=_blocklist_gauge
+))
@@ -0,0 +1,196 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import Response, current_app, g, request
+from app.personal import viewer_id
+
+
+# Responses of public GET endpoints are cached under a key built from the
+# endpoint, its query string and the current version of every tag it depends
+# on. Write routes invalidate by bumping tag versions, which makes every key
+# built from the old version unreachable; stale entries then age out.
+
+# -------------------------
+# BACKENDS
+# -------------------------
+class LRUBackend:
+    """In-process LRU. Invalidations are only seen by the current worker,
+    so under gunicorn other workers serve stale entries for up to the TTL."""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def versions(self, tags):
+        with self._lock:
+            return [self._versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self._lock:
+            for tag in tags:
+                self._versions[tag] = self._versions.get(tag, 0) + 1
+
+
+class RedisBackend:
+    """Shared cache; invalidations reach every worker immediately."""
+
+    def __init__(self, url):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("CACHE_BACKEND=redis requires the 'redis' package")
+
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def set(self, key, value, ttl):
+        self.client.set(key, value, ex=max(1, int(ttl)))
+
+    def versions(self, tags):
+        values = self.client.mget([f"tag:{tag}" for tag in tags])
+        return [int(value or 0) for value in values]
+
+    def bump(self, tags):
+        pipe = self.client.pipeline(transaction=False)
+        for tag in tags:
+            pipe.incr(f"tag:{tag}")
+        pipe.execute()
+
+
+# -------------------------
+# RESPONSE CACHE
+# -------------------------
+def _encode(response):
+    headers = [
+        (name, value) for name, value in response.headers.items()
+        if name != "Content-Length"
+    ]
+    header = json.dumps([response.status_code, headers])
+    return header.encode("utf-8") + b"\n" + response.get_data()
+
+
+def _decode(value):
+    header, body = value.split(b"\n", 1)
+    status, headers = json.loads(header)
+    return Response(body, status=status, headers=headers)
+
+
+class ResponseCache:
+
+    def __init__(self, backend, ttl):
+        self.backend = backend
+        self.ttl = ttl
+
+    def key(self, tags):
+        versions = self.backend.versions(tags) if tags else []
+        # Re-encoded, so an escaped "&" or "=" inside a value cannot pass
+        # for a separator and collide with another query string
+        args = urlencode(sorted(request.args.items(multi=True)))
+        stamp = ",".join(f"{tag}@{version}" for tag, version in zip(tags, versions))
+        return f"resp:{request.endpoint}?{args}|{stamp}"
+
+    def invalidate(self, *tags):
+        if self.backend is not None and tags:
+            self.backend.bump(tags)
+
+
+def cached(*tag_templates, per_viewer=False):
+    """Cache a public GET view and answer conditional requests.
+
+    ``tag_templates`` are formatted with the view's URL arguments, e.g.
+    ``cached("blog:{blog_id}")``. Every response gets a strong ETag and a
+    matching If-None-Match is answered with 304 even on a cache miss.
+
+    ``per_viewer`` views add the authenticated user's own state to the
+    response; those requests bypass the shared cache and only anonymous
+    responses are stored.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(**kwargs):
+            cache = current_app.extensions["response_cache"]
+
+            if cache.backend is None or (per_viewer and viewer_id() is not None):
+                response = current_app.make_response(view(**kwargs))
+                if per_viewer:
+                    response.vary.add("Authorization")
+                return _conditional(response)
+
+            tags = [template.format(**kwargs) for template in tag_templates]
+            key = cache.key(tags)
+
+            value = cache.backend.get(key)
+            if value is not None:
+                response = _decode(value)
+                response.headers["X-Cache"] = "HIT"
+                return response.make_conditional(request)
+
+            response = current_app.make_response(view(**kwargs))
+            if per_viewer:
+                response.vary.add("Authorization")
+            if response.status_code == 200:
+                response.add_etag()
+                cache.backend.set(key, _encode(response), _ttl_for_request(cache))
+
+            response.headers["X-Cache"] = "MISS"
+            return _conditional(response)
+
+        return wrapper
+    return decorator
+
+
+def _ttl_for_request(cache):
+    # A replica may not have replayed the write that invalidated this key
+    # yet, so what it served is only kept as long as it may lag
+    if g.get("db_replica") is not None:
+        return min(cache.ttl, current_app.config["REPLICA_MAX_LAG_SECONDS"])
+    return cache.ttl
+
+
+def _conditional(response):
+    if response.status_code == 200:
+        response.add_etag()
+    return response.make_conditional(request)
+
+
+def invalidate(*tags):
+    current_app.extensions["response_cache"].invalidate(*tags)
+
+
+def create_response_cache(app):
+    backend_name = app.config["CACHE_BACKEND"]
+
+    if backend_name == "redis":
+        backend = RedisBackend(app.config["CACHE_REDIS_URL"])
+    elif backend_name == "lru":
+        backend = LRUBackend(app.config["CACHE_MAX_ENTRIES"])
+    else:
+        backend = None
+
+    return ResponseCache(backend, app.config["CACHE_TTL_SECONDS"])
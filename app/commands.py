@@ -0,0 +1,127 @@
+from datetime import timedelta
+import click
+
+
+def register_commands(app):
+
+    # -------------------------
+    # COUNTERS
+    # -------------------------
+    @app.cli.command("reconcile-counters")
+    def reconcile_counters_command():
+        """Fix drift in the denormalized like/comment/follow counters."""
+        from app.counters import reconcile_counters
+
+        fixed = reconcile_counters()
+        for column, rows in fixed.items():
+            click.echo(f"{column}: {rows} row(s) fixed")
+
+    # -------------------------
+    # TIMELINES
+    # -------------------------
+    @app.cli.command("rebuild-timelines")
+    def rebuild_timelines_command():
+        """Rebuild every home timeline from follows and blogs."""
+        from app.timeline import rebuild_timelines
+
+        rebuild_timelines()
+        click.echo("Timelines rebuilt")
+
+    # -------------------------
+    # TRENDING
+    # -------------------------
+    @app.cli.command("refresh-trending")
+    @click.option("--window", "windows", multiple=True,
+                  help="Window to refresh (24h, 7d); all by default.")
+    def refresh_trending_command(windows):
+        """Recompute trending scores from recent likes and comments.
+
+        Run it from cron every few minutes; likes and comments keep the
+        scores current in between.
+        """
+        from app.trending import WINDOWS, refresh_trending
+
+        unknown = set(windows).difference(WINDOWS)
+        if unknown:
+            raise click.BadParameter(", ".join(sorted(unknown)), param_hint="--window")
+
+        for name, rows in refresh_trending(windows or None).items():
+            click.echo(f"{name}: {rows} blog(s) scored")
+
+    # -------------------------
+    # UPLOADS
+    # -------------------------
+    @app.cli.command("sweep-uploads")
+    @click.option("--older-than", default=30, show_default=True,
+                  help="Minutes a media upload may stay pending.")
+    def sweep_uploads_command(older_than):
+        """Fail media uploads left pending by a worker that died."""
+        from app.uploads import fail_stale_media
+
+        failed = fail_stale_media(timedelta(minutes=older_than))
+        click.echo(f"Marked {failed} stale upload(s) as failed")
+
+    # -------------------------
+    # TOKEN BLOCKLIST
+    # -------------------------
+    @app.cli.command("purge-blocklist")
+    @click.option("--batch-size", default=1000, show_default=True)
+    @click.option("--pause", default=0.0, show_default=True,
+                  help="Seconds to sleep between batches.")
+    def purge_blocklist_command(batch_size, pause):
+        """Delete revoked tokens that have already expired."""
+        from app.blocklist import purge_expired_tokens
+
+        deleted = purge_expired_tokens(batch_size=batch_size, pause=pause)
+        click.echo(f"Deleted {deleted} expired token(s)")
+
+    @app.cli.command("blocklist-stats")
+    def blocklist_stats_command():
+        """Show the size of the token blocklist."""
+        from app.blocklist import blocklist_stats
+
+        for name, value in blocklist_stats().items():
+            click.echo(f"{name}: {value}")
+
+    # -------------------------
+    # QUERY PLANS
+    # -------------------------
+    @app.cli.command("explain-routes")
+    @click.option("--min-rows", default=10000, show_default=True,
+                  help="Flag full scans of tables with at least this many rows.")
+    def explain_routes_command(min_rows):
+        """EXPLAIN the queries of every GET route and flag sequential scans.
+
+        Exits with status 1 when any are found, so it can gate a deploy.
+        """
+        from app.advisor import find_seq_scans
+
+        issued, findings = find_seq_scans(app, min_rows)
+
+        for path, count in issued.items():
+            click.echo(f"{count:3} queries  {path}")
+
+        for scan in findings:
+            click.echo(
+                f"SEQ SCAN {scan.table} (~{scan.rows} rows) in {scan.endpoint} "
+                f"{scan.path}\n    {' '.join(scan.statement.split())}"
+            )
+
+        if findings:
+            raise SystemExit(1)
+
+        click.echo(f"No sequential scans of tables with {min_rows}+ rows")
+
+    # -------------------------
+    # ACCOUNTS
+    # -------------------------
+    @app.cli.command("purge-deleted-accounts")
+    @click.option("--chunk-size", default=500, show_default=True)
+    @click.option("--pause", default=0.0, show_default=True,
+                  help="Seconds to sleep between chunks.")
+    def purge_deleted_accounts_command(chunk_size, pause):
+        """Finish deleting accounts whose background deletion was interrupted."""
+        from app.deletions import purge_deleted_accounts
+
+        purged = purge_deleted_accounts(chunk_size=chunk_size, pause=pause)
+        click.echo(f"Deleted {purged} account(s)")
@@ -0,0 +1,65 @@
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models import Blog, User, Like, Comment, Follow
+
+
+# -------------------------
+# ATOMIC UPDATES
+# -------------------------
+# Each helper issues a single "SET col = col + delta" UPDATE so concurrent
+# writers never lose increments. They do not commit: callers run them in
+# the same transaction as the row insert/delete they account for.
+
+def bump_blog(blog_id, column, delta):
+    col = getattr(Blog, column)
+    # Keep updated_at: a like or comment is not an edit of the post
+    Blog.query.filter(Blog.id == blog_id).update(
+        {col: col + delta, Blog.updated_at: Blog.updated_at},
+        synchronize_session=False
+    )
+
+
+def bump_user(user_id, column, delta):
+    col = getattr(User, column)
+    User.query.filter(User.id == user_id).update(
+        {col: col + delta},
+        synchronize_session=False
+    )
+
+
+def bump_follow(follower_id, following_id, delta):
+    bump_user(follower_id, "following_count", delta)
+    bump_user(following_id, "followers_count", delta)
+
+
+# -------------------------
+# RECONCILIATION
+# -------------------------
+def _counter_sources():
+    return [
+        (Blog, Blog.likes_count, select(func.count(Like.id)).where(
+            Like.blog_id == Blog.id).scalar_subquery()),
+        (Blog, Blog.comments_count, select(func.count(Comment.id)).where(
+            Comment.blog_id == Blog.id).scalar_subquery()),
+        (User, User.followers_count, select(func.count(Follow.id)).where(
+            Follow.following_id == User.id).scalar_subquery()),
+        (User, User.following_count, select(func.count(Follow.id)).where(
+            Follow.follower_id == User.id).scalar_subquery()),
+    ]
+
+
+def reconcile_counters():
+    """Recompute every denormalized counter; returns rows fixed per column."""
+    fixed = {}
+
+    for model, column, actual in _counter_sources():
+        result = db.session.execute(
+            db.update(model)
+            .where(column != actual)
+            .values({column: actual})
+            .execution_options(synchronize_session=False)
+        )
+        fixed[f"{model.__tablename__}.{column.key}"] = result.rowcount
+
+    db.session.commit()
+    return fixed
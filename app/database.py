@@ -0,0 +1,97 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+
+
+# Pool sizing
+# -----------
+# Every gunicorn worker process owns one pool per engine, and each request
+# thread holds at most one connection at a time. Background threads that
+# touch the database (upload jobs, the like buffer) need their own slots:
+#
+#   DB_POOL_SIZE     = threads per worker + UPLOAD_WORKERS + 1
+#   DB_MAX_OVERFLOW  = a small burst allowance, e.g. DB_POOL_SIZE // 2
+#
+#   connections = instances x workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+#
+# which must stay below Postgres max_connections minus superuser/admin
+# slots, or below PgBouncer's max_client_conn when DB_PGBOUNCER is on
+# (PgBouncer then holds default_pool_size real server connections).
+# Example: 2 instances x 4 workers x (8 + 4) = 96 connections.
+
+def engine_options(config, database_url):
+    """SQLALCHEMY_ENGINE_OPTIONS for ``database_url`` from the DB_* config."""
+    url = make_url(database_url)
+
+    # SQLite (the test/benchmark stand-in) keeps SQLAlchemy's defaults
+    if url.get_backend_name() == "sqlite":
+        return {}
+
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+        # LIFO reuses warm connections and lets surplus ones idle out
+        # server-side instead of all being kept alive round-robin
+        "pool_use_lifo": True
+    }
+    connect_args = {}
+
+    if config["DB_PGBOUNCER"]:
+        # Transaction pooling hands each transaction to any server
+        # connection, so nothing may be prepared or set per session.
+        # psycopg2 never prepares server-side; psycopg 3 and asyncpg do.
+        if url.get_driver_name() == "psycopg":
+            connect_args["prepare_threshold"] = None
+        elif url.get_driver_name() == "asyncpg":
+            connect_args["statement_cache_size"] = 0
+            connect_args["prepared_statement_cache_size"] = 0
+    elif config["DB_STATEMENT_TIMEOUT_MS"]:
+        # Applied once per connection at startup; PgBouncer rejects such
+        # startup parameters, so that mode uses SET LOCAL instead
+        timeout = str(config["DB_STATEMENT_TIMEOUT_MS"])
+        if url.get_driver_name() == "asyncpg":
+            connect_args["server_settings"] = {"statement_timeout": timeout}
+        else:
+            connect_args["options"] = f"-c statement_timeout={timeout}"
+
+    if connect_args:
+        options["connect_args"] = connect_args
+
+    return options
+
+
+# -------------------------
+# STATEMENT TIMEOUTS
+# -------------------------
+@event.listens_for(Session, "after_begin")
+def _set_local_statement_timeout(session, transaction, connection):
+    # Only needed behind PgBouncer; otherwise the timeout is a startup
+    # option of every pooled connection and costs no extra round-trip
+    if connection.dialect.name != "postgresql" or not has_app_context():
+        return
+
+    config = current_app.config
+    if config["DB_PGBOUNCER"] and config["DB_STATEMENT_TIMEOUT_MS"]:
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = {int(config['DB_STATEMENT_TIMEOUT_MS'])}"
+        )
+
+
+# -------------------------
+# UPSERTS
+# -------------------------
+_INSERTS = {
+    "postgresql": postgresql_insert,
+    "sqlite": sqlite_insert
+}
+
+
+def dialect_insert(session, table):
+    """INSERT for ``table`` with ON CONFLICT support on the session's database."""
+    return _INSERTS[session.get_bind().dialect.name](table)
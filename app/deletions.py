@@ -0,0 +1,235 @@
+import logging
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, func, literal, or_, select, update
+from app.extensions import db
+from app.models import Blog, Comment, Follow, Like, Media, User
+from app.counters import bump_blog
+from app.likes import apply_likes
+from app.trending import COMMENT_WEIGHT, record_activity
+from app.search import unindex_blogs
+from app.cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------
+# BULK DELETES
+# -------------------------
+# Rows go through set-based DELETEs and the ON DELETE CASCADE foreign keys
+# remove their children (likes, comments, media, timeline entries) in the
+# database. Stored files are collected first and removed afterwards, in
+# bulk, once the rows are committed.
+
+def media_assets(*criteria):
+    """(public_id, resource_type) of stored media matching ``criteria``."""
+    rows = db.session.execute(
+        select(Media.public_id, Media.media_type)
+        .where(Media.public_id.is_not(None), *criteria)
+    )
+    return [(public_id, media_type) for public_id, media_type in rows]
+
+
+def delete_blogs(blog_ids):
+    """Delete blogs and everything under them; returns their stored
+    files. Does not commit."""
+    assets = media_assets(Media.blog_id.in_(blog_ids))
+
+    db.session.execute(
+        delete(Blog)
+        .where(Blog.id.in_(blog_ids))
+        .execution_options(synchronize_session=False)
+    )
+    unindex_blogs(blog_ids)
+
+    return assets
+
+
+def _chunks(statement):
+    # Re-run ``statement`` (which has a LIMIT) until it comes back empty;
+    # every chunk is deleted and committed before the next is read
+    while True:
+        rows = db.session.execute(statement).all()
+        if not rows:
+            return
+        yield rows
+
+
+def delete_account(user_id, chunk_size=500, pause=0.0):
+    """Delete a user and everything they own, ``chunk_size`` rows per
+    transaction so that no statement holds locks for long.
+
+    Counters on other users' blogs and profiles are adjusted as the
+    user's likes, comments and follows go. Re-running it after a crash
+    picks up where the failed run stopped.
+    """
+    pipeline = current_app.extensions["upload_pipeline"]
+
+    def commit(tags):
+        db.session.commit()
+        invalidate(*sorted(tags))
+        if pause:
+            time.sleep(pause)
+
+    for rows in _chunks(
+        select(Blog.id).where(Blog.author_id == user_id).order_by(Blog.id).limit(chunk_size)
+    ):
+        blog_ids = [blog_id for (blog_id,) in rows]
+        assets = delete_blogs(blog_ids)
+        commit({"blogs", *(f"blog:{blog_id}" for blog_id in blog_ids)})
+        pipeline.submit_cleanup(assets)
+
+    for rows in _chunks(
+        select(Like.blog_id).where(Like.user_id == user_id).limit(chunk_size)
+    ):
+        apply_likes({(user_id, blog_id): False for (blog_id,) in rows})
+        commit({"blogs", *(f"blog:{blog_id}" for (blog_id,) in rows)})
+
+    for rows in _chunks(
+        select(Comment.id, Comment.blog_id, Comment.created_at)
+        .where(Comment.author_id == user_id)
+        .order_by(Comment.id)
+        .limit(chunk_size)
+    ):
+        db.session.execute(delete(Comment).where(Comment.id.in_([row.id for row in rows])))
+        removed = Counter(row.blog_id for row in rows)
+        for blog_id in sorted(removed):
+            bump_blog(blog_id, "comments_count", -removed[blog_id])
+        record_activity([(row.blog_id, -COMMENT_WEIGHT, row.created_at) for row in rows])
+        commit({"blogs", *(
+            tag for blog_id in removed
+            for tag in (f"blog:{blog_id}", f"comments:{blog_id}")
+        )})
+
+    for rows in _chunks(
+        select(Follow.id, Follow.follower_id, Follow.following_id)
+        .where(or_(Follow.follower_id == user_id, Follow.following_id == user_id))
+        .order_by(Follow.id)
+        .limit(chunk_size)
+    ):
+        db.session.execute(delete(Follow).where(Follow.id.in_([row.id for row in rows])))
+
+        # Each other user appears at most once per direction
+        followed = [row.following_id for row in rows if row.follower_id == user_id]
+        followers = [row.follower_id for row in rows if row.following_id == user_id]
+        if followed:
+            db.session.execute(
+                update(User).where(User.id.in_(followed))
+                .values(followers_count=User.followers_count - 1)
+            )
+        if followers:
+            db.session.execute(
+                update(User).where(User.id.in_(followers))
+                .values(following_count=User.following_count - 1)
+            )
+        commit({
+            *(f"followers:{other}" for other in followed),
+            *(f"following:{other}" for other in followers)
+        })
+
+    profile_image = db.session.scalar(
+        select(User.profile_image_public_id).where(User.id == user_id)
+    )
+
+    # The home timeline, the last thing left, cascades
+    db.session.execute(delete(User).where(User.id == user_id))
+    commit({"blogs", "users"})
+
+    if profile_image:
+        pipeline.submit_cleanup([(profile_image, "image")])
+
+
+# -------------------------
+# ACCOUNT DELETION
+# -------------------------
+def owned_rows(user, limit):
+    """Rows deleting ``user`` would touch, counted exactly up to ``limit``.
+
+    Blogs weigh one row plus their like and comment counters; the user's
+    likes and comments elsewhere are counted with a LIMIT so that a huge
+    account costs no more to measure than ``limit`` rows; follows come
+    from the user's counters.
+    """
+    blogs = (
+        select((1 + Blog.likes_count + Blog.comments_count).label("rows"))
+        .where(Blog.author_id == user.id)
+        .limit(limit + 1)
+        .subquery()
+    )
+    total = db.session.scalar(select(func.coalesce(func.sum(blogs.c.rows), 0)))
+
+    for column in (Like.user_id, Comment.author_id):
+        capped = select(literal(1)).where(column == user.id).limit(limit + 1).subquery()
+        total += db.session.scalar(select(func.count()).select_from(capped))
+
+    return total + user.followers_count + user.following_count
+
+
+class AccountDeleter:
+    """Delete accounts on request, off the request thread once large.
+
+    The account is marked deleted (and can no longer log in) right away.
+    Accounts whose deletion touches at most ``sync_max_rows`` rows (see
+    ``owned_rows``) are then deleted inline; larger ones are handed to a
+    single background thread. Accounts left marked by a crash are
+    finished by ``flask purge-deleted-accounts``.
+    """
+
+    def __init__(self, app, chunk_size, sync_max_rows):
+        self.app = app
+        self.chunk_size = chunk_size
+        self.sync_max_rows = sync_max_rows
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def submit(self, user):
+        """Returns True when the deletion continues in the background."""
+        user.deleted_at = datetime.utcnow()
+        db.session.commit()
+
+        if owned_rows(user, self.sync_max_rows) <= self.sync_max_rows:
+            delete_account(user.id, self.chunk_size)
+            return False
+
+        # One thread: deletions are bulk work that should not compete
+        # with requests for the connection pool
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1,
+                    thread_name_prefix="account-delete"
+                )
+        self._executor.submit(self._run, user.id)
+        return True
+
+    def _run(self, user_id):
+        with self.app.app_context():
+            try:
+                delete_account(user_id, self.chunk_size)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Deleting account %s failed", user_id)
+
+
+def purge_deleted_accounts(chunk_size=500, pause=0.0):
+    """Finish every account marked deleted; returns how many."""
+    user_ids = db.session.scalars(
+        select(User.id).where(User.deleted_at.is_not(None)).order_by(User.id)
+    ).all()
+
+    for user_id in user_ids:
+        delete_account(user_id, chunk_size, pause)
+
+    return len(user_ids)
+
+
+def create_account_deleter(app):
+    return AccountDeleter(
+        app,
+        chunk_size=app.config["ACCOUNT_DELETE_CHUNK_SIZE"],
+        sync_max_rows=app.config["ACCOUNT_DELETE_SYNC_MAX_ROWS"]
+    )
@@ -1,3 +1,54 @@
+import sqlite3
+from flask import g, has_request_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import BigInteger, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
 
-db = SQLAlchemy()
+
+# -------------------------
+# Read replica routing
+# -------------------------
+class RoutingSession(Session):
+    """Sends reads of a routed request to the replica chosen for it.
+
+    app/replicas.py picks the replica per request and stores its bind key
+    in ``g.db_replica``. Flushes and INSERT/UPDATE/DELETE statements always
+    use the primary, as does everything outside a routed request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context():
+            replica = g.get("db_replica")
+            if replica is not None and not getattr(clause, "is_dml", False):
+                return self._db.engines[replica]
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+
+# -------------------------
+# SQLite stand-in support
+# -------------------------
+# Lets the benchmark suite and local runs use SQLite in place of Postgres.
+
+# SQLite only auto-increments "INTEGER PRIMARY KEY" columns, so our BigInteger
+# ids are emitted as INTEGER there (still 64-bit).
+@compiles(BigInteger, "sqlite")
+def _compile_bigint_sqlite(type_, compiler, **kw):
+    return "INTEGER"
+
+
+# ON DELETE CASCADE is ignored unless foreign keys are switched on per connection
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    # The aiosqlite adapter (ASGI mode) wraps the same sqlite3 connection
+    if isinstance(dbapi_connection, sqlite3.Connection) or (
+        type(dbapi_connection).__module__ == "sqlalchemy.dialects.sqlite.aiosqlite"
+    ):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
@@ -0,0 +1,213 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import delete, select, tuple_
+from app.extensions import db
+from app.database import dialect_insert
+from app.models import Blog, Like, User
+from app.counters import bump_blog
+from app.trending import LIKE_WEIGHT, record_activity
+from app.cache import invalidate
+from app.metrics import REGISTRY, Gauge
+
+logger = logging.getLogger(__name__)
+
+# Rows per multi-row INSERT/DELETE; keeps SQLite under its bind-parameter cap
+CHUNK = 1000
+
+
+def _insert_likes(rows):
+    return (
+        dialect_insert(db.session, Like)
+        .values(rows)
+        .on_conflict_do_nothing(index_elements=["user_id", "blog_id"])
+        .returning(Like.blog_id)
+    )
+
+
+# -------------------------
+# SINGLE-STATEMENT WRITES
+# -------------------------
+# Neither helper reads before writing: the unique constraint decides whether
+# a like is new, and the counter moves only for rows actually inserted or
+# deleted. They do not commit.
+
+def add_like(user_id, blog_id):
+    """Like ``blog_id``; returns False if it was already liked.
+
+    A missing blog surfaces as an IntegrityError from the foreign key.
+    """
+    row = {"user_id": user_id, "blog_id": blog_id, "created_at": datetime.utcnow()}
+    inserted = db.session.execute(_insert_likes([row])).first() is not None
+
+    if inserted:
+        bump_blog(blog_id, "likes_count", 1)
+        record_activity([(blog_id, LIKE_WEIGHT, row["created_at"])])
+    return inserted
+
+
+def remove_like(user_id, blog_id):
+    """Unlike ``blog_id``; returns False if there was no like."""
+    liked_at = db.session.execute(
+        delete(Like)
+        .where(Like.user_id == user_id, Like.blog_id == blog_id)
+        .returning(Like.created_at)
+    ).scalar()
+
+    if liked_at is None:
+        return False
+
+    bump_blog(blog_id, "likes_count", -1)
+    record_activity([(blog_id, -LIKE_WEIGHT, liked_at)])
+    return True
+
+
+def apply_likes(changes):
+    """Apply ``{(user_id, blog_id): liked}`` in bulk; returns net deltas per blog.
+
+    Each affected blog gets one counter UPDATE, taken in id order so that
+    concurrent flushes lock rows in the same order.
+    """
+    now = datetime.utcnow()
+    likes = [key for key, liked in changes.items() if liked]
+    unlikes = [key for key, liked in changes.items() if not liked]
+    deltas = Counter()
+    activity = []
+
+    if likes:
+        # Toggles for deleted blogs or users are skipped, so that one bad
+        # foreign key does not fail everyone else's
+        blogs = set(db.session.scalars(
+            select(Blog.id).where(Blog.id.in_({blog_id for _, blog_id in likes}))
+        ))
+        users = set(db.session.scalars(
+            select(User.id).where(User.id.in_({user_id for user_id, _ in likes}))
+        ))
+        rows = [
+            {"user_id": user_id, "blog_id": blog_id, "created_at": now}
+            for user_id, blog_id in likes if blog_id in blogs and user_id in users
+        ]
+        for start in range(0, len(rows), CHUNK):
+            for blog_id in db.session.scalars(_insert_likes(rows[start:start + CHUNK])):
+                deltas[blog_id] += 1
+                activity.append((blog_id, LIKE_WEIGHT, now))
+
+    for start in range(0, len(unlikes), CHUNK):
+        for blog_id, liked_at in db.session.execute(
+            delete(Like)
+            .where(tuple_(Like.user_id, Like.blog_id).in_(unlikes[start:start + CHUNK]))
+            .returning(Like.blog_id, Like.created_at)
+        ):
+            deltas[blog_id] -= 1
+            activity.append((blog_id, -LIKE_WEIGHT, liked_at))
+
+    for blog_id in sorted(deltas):
+        if deltas[blog_id]:
+            bump_blog(blog_id, "likes_count", deltas[blog_id])
+    record_activity(activity)
+
+    return deltas
+
+
+# -------------------------
+# WRITE-BEHIND BUFFER
+# -------------------------
+class LikeBuffer:
+    """Coalesce like/unlike toggles in memory and write them in bulk.
+
+    Only the last toggle per (user, blog) within a window is kept, and a
+    hot post takes one counter update per flush instead of one per like.
+    Toggles not yet flushed are lost if the process is killed.
+    """
+
+    def __init__(self, app, interval_ms, max_pending):
+        self.app = app
+        self.interval = interval_ms / 1000
+        self.max_pending = max_pending
+        self._pending = {}
+        self._lock = threading.Lock()
+        # Held from taking a batch until it is committed, so batches are
+        # written in the order they were taken: a like swapped out first
+        # can never land after an unlike swapped out later
+        self._flush_lock = threading.Lock()
+        self._thread = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def toggle(self, user_id, blog_id, liked):
+        with self._lock:
+            self._pending[(user_id, blog_id)] = liked
+            full = len(self._pending) >= self.max_pending
+
+        self._ensure_started()
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+
+            if not pending:
+                return
+
+            with self.app.app_context():
+                try:
+                    deltas = apply_likes(pending)
+                    db.session.commit()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Dropped %d buffered like toggles", len(pending))
+                    return
+
+                if deltas:
+                    invalidate("blogs", *(f"blog:{blog_id}" for blog_id in deltas))
+
+    def _ensure_started(self):
+        # Started lazily so each gunicorn worker runs its own flusher
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._run,
+                name="like-buffer",
+                daemon=True
+            )
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Like buffer flush failed")
+
+
+def create_like_buffer(app):
+    if app.config["LIKE_BUFFER_MS"] <= 0:
+        return None
+
+    return LikeBuffer(
+        app,
+        interval_ms=app.config["LIKE_BUFFER_MS"],
+        max_pending=app.config["LIKE_BUFFER_MAX_PENDING"]
+    )
+
+
+def _pending_toggles():
+    buffer = current_app.extensions.get("like_buffer")
+    return len(buffer) if buffer is not None else 0
+
+
+REGISTRY.register(Gauge(
+    "blig_like_buffer_pending",
+    "Like/unlike toggles buffered in this process and not yet written.",
+    callback=_pending_toggles
+))
@@ -0,0 +1,358 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event, exc
+from app.extensions import db
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+COUNT_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+# -------------------------
+# METRIC TYPES
+# -------------------------
+# A minimal Prometheus text-format registry. Values are per process: under
+# gunicorn each worker exposes its own series, which Prometheus aggregates
+# across scrapes.
+
+def _format_labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(
+        '%s="%s"' % (name, str(value).replace("\\", "\\\\").replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return "{" + body + "}"
+
+
+class _Metric:
+    type = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(labels.get(name, "") for name in self.labelnames)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}"
+        ]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """A gauge whose value is either set directly or read from a callback."""
+
+    type = "gauge"
+
+    def __init__(self, name, documentation, labelnames=(), callback=None):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self):
+        if self.callback is not None:
+            try:
+                values = self.callback()
+            except Exception:
+                logger.exception("Gauge callback for %s failed", self.name)
+                return []
+            if not isinstance(values, dict):
+                values = {(): values}
+        else:
+            with self._lock:
+                values = dict(self._values)
+
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+            for key, value in values.items()
+        ]
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0, 0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[0][i] += 1
+            state[1] += 1
+            state[2] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, ([*s[0]], s[1], s[2])) for key, s in self._values.items()]
+
+        lines = []
+        for key, (buckets, count, total) in items:
+            for bound, cumulative in zip(self.buckets, buckets):
+                labels = _format_labels(self.labelnames, key, [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, [("le", "+Inf")])
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "blig_http_request_duration_seconds",
+    "HTTP request latency by endpoint.",
+    ["blueprint", "endpoint", "method", "status"]
+))
+REQUEST_SQL_STATEMENTS = REGISTRY.register(Histogram(
+    "blig_http_request_sql_statements",
+    "SQL statements issued per HTTP request.",
+    ["blueprint", "endpoint"],
+    buckets=COUNT_BUCKETS
+))
+REQUEST_SQL_TIME = REGISTRY.register(Histogram(
+    "blig_http_request_sql_duration_seconds",
+    "Total time spent executing SQL per HTTP request.",
+    ["blueprint", "endpoint"]
+))
+POOL_CHECKOUT_WAIT = REGISTRY.register(Histogram(
+    "blig_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a connection from the pool.",
+    ["engine"]
+))
+POOL_CHECKOUT_TIMEOUTS = REGISTRY.register(Counter(
+    "blig_db_pool_checkout_timeouts_total",
+    "Connection checkouts that gave up after DB_POOL_TIMEOUT.",
+    ["engine"]
+))
+EXTERNAL_CALL_LATENCY = REGISTRY.register(Histogram(
+    "blig_external_call_duration_seconds",
+    "Latency of CPU-heavy or remote calls made while serving requests.",
+    ["service", "operation"]
+))
+
+
+def observe_external(service, operation):
+    return EXTERNAL_CALL_LATENCY.time(service=service, operation=operation)
+
+
+# -------------------------
+# SQL INSTRUMENTATION
+# -------------------------
+# Instrumented engines by name, for the pool occupancy gauge
+_ENGINES = {}
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+
+    if not has_request_context():
+        return
+
+    g.sql_count = g.get("sql_count", 0) + 1
+    g.sql_time = g.get("sql_time", 0.0) + elapsed
+    if current_app.config["SLOW_REQUEST_MS"] and "sql_statements" in g:
+        g.sql_statements.append((elapsed, statement))
+
+
+def _handle_error(context):
+    # A statement that raises never reaches after_cursor_execute
+    if context.connection is not None and context.execution_context is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def instrument_engine(engine, name="default"):
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _ENGINES[name] = engine
+
+    # The pool has no "before checkout" event, so time the call that
+    # blocks on it: every Connection acquires its DBAPI connection here.
+    raw_connection = engine.raw_connection
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        except exc.TimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc(engine=name)
+            raise
+        finally:
+            POOL_CHECKOUT_WAIT.observe(time.perf_counter() - start, engine=name)
+
+    engine.raw_connection = timed_raw_connection
+
+
+def _pool_connections():
+    values = {}
+    for name, engine in _ENGINES.items():
+        pool = engine.pool
+        # Only QueuePool exposes sizes; SQLite's pools are skipped
+        if not hasattr(pool, "checkedout"):
+            continue
+        values[(name, "size")] = pool.size()
+        values[(name, "checked_out")] = pool.checkedout()
+        values[(name, "idle")] = pool.checkedin()
+        values[(name, "overflow")] = max(0, pool.overflow())
+        values[(name, "max_overflow")] = pool._max_overflow
+    return values
+
+
+POOL_CONNECTIONS = REGISTRY.register(Gauge(
+    "blig_db_pool_connections",
+    "Connection pool occupancy; checked_out reaching size + max_overflow "
+    "means requests are queueing for a connection.",
+    ["engine", "state"],
+    callback=_pool_connections
+))
+
+
+# -------------------------
+# REQUEST HOOKS
+# -------------------------
+def _start_timer():
+    g.request_start = time.perf_counter()
+    g.sql_count = 0
+    g.sql_time = 0.0
+    g.sql_statements = []
+
+
+def _record_request(response):
+    start = g.pop("request_start", None)
+    if start is None:
+        return response
+
+    elapsed = time.perf_counter() - start
+    blueprint = request.blueprint or ""
+    endpoint = request.endpoint or "unmatched"
+
+    REQUEST_LATENCY.observe(
+        elapsed,
+        blueprint=blueprint,
+        endpoint=endpoint,
+        method=request.method,
+        status=response.status_code
+    )
+    REQUEST_SQL_STATEMENTS.observe(
+        g.get("sql_count", 0), blueprint=blueprint, endpoint=endpoint
+    )
+    REQUEST_SQL_TIME.observe(
+        g.get("sql_time", 0.0), blueprint=blueprint, endpoint=endpoint
+    )
+
+    slow_ms = current_app.config["SLOW_REQUEST_MS"]
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        statements = "\n".join(
+            f"  [{duration * 1000:.1f}ms] {statement}"
+            for duration, statement in g.get("sql_statements", [])
+        )
+        logger.warning(
+            "Slow request %s %s -> %s in %.1fms (%d SQL, %.1fms)\n%s",
+            request.method,
+            request.path,
+            response.status_code,
+            elapsed * 1000,
+            g.get("sql_count", 0),
+            g.get("sql_time", 0.0) * 1000,
+            statements
+        )
+
+    return response
+
+
+def metrics_view():
+    token = current_app.config["METRICS_TOKEN"]
+    if request.headers.get("Authorization") != f"Bearer {token}":
+        return {"error": "Unauthorized"}, 401
+
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+def init_metrics(app):
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    # Fail closed: without a token there is no /metrics to scrape
+    if app.config["METRICS_TOKEN"]:
+        app.add_url_rule("/metrics", "metrics", metrics_view, methods=["GET"])
+    else:
+        app.logger.info("METRICS_TOKEN is not set; /metrics is disabled")
+
+    with app.app_context():
+        for name, engine in db.engines.items():
+            instrument_engine(engine, name or "default")
@@ -5,3 +5,5 @@ from .like import Like
 from .token_blocklist import TokenBlocklist
 from .follow import Follow
 from .comment import Comment
+from .timeline import TimelineEntry
+from .trending import TrendingScore, TrendingPeriod
@@ -1,6 +1,21 @@
+import re
 from datetime import datetime
 from app.extensions import db
 
+EXCERPT_LENGTH = 280
+
+
+def make_excerpt(body_text):
+    """The first EXCERPT_LENGTH characters of the body on one line, cut at
+    a word boundary."""
+    text = re.sub(r"\s+", " ", body_text or "").strip()
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+
+    cut = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] or text[:EXCERPT_LENGTH]
+    return cut.rstrip(" .,;:") + "…"
+
+
 class Blog(db.Model):
     __tablename__ = "blogs"
 
@@ -13,10 +28,32 @@ class Blog(db.Model):
     )
 
     title = db.Column(db.String(255), nullable=False)
-    body_text = db.Column(db.Text, nullable=False)
+    # Only the single-blog view needs the body; listings read the excerpt
+    # so Postgres never has to de-TOAST it for them
+    body_text = db.deferred(db.Column(db.Text, nullable=False))
+    excerpt = db.Column(
+        db.String(EXCERPT_LENGTH + 1),
+        default="",
+        server_default="",
+        nullable=False
+    )
 
     is_published = db.Column(db.Boolean, default=False)
 
+    likes_count = db.Column(
+        db.Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
+    comments_count = db.Column(
+        db.Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
     created_at = db.Column(
         db.DateTime,
         default=datetime.utcnow,
@@ -30,26 +67,36 @@ class Blog(db.Model):
         nullable=False
     )
 
-    # Relationships
+    __table_args__ = (
+        db.Index("ix_blogs_created_at_id", "created_at", "id"),
+        # Author's blogs newest first; also the author_id foreign key index
+        db.Index("ix_blogs_author_id_created_at", "author_id", "created_at", "id"),
+    )
+
+    # Relationships. Children are removed by the ON DELETE CASCADE foreign
+    # keys (passive_deletes) rather than loaded and deleted one by one.
     author = db.relationship("User", back_populates="blogs")
 
     media_items = db.relationship(
         "Media",
         back_populates="blog",
         cascade="all, delete-orphan",
+        passive_deletes=True,
         order_by="Media.position"
     )
 
     likes = db.relationship(
         "Like",
         back_populates="blog",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     comments = db.relationship(
     "Comment",
     back_populates="blog",
     cascade="all, delete-orphan",
+    passive_deletes=True,
     order_by="Comment.created_at.asc()"
     )
 
@@ -34,6 +34,12 @@ class Comment(db.Model):
         nullable=False
     )
 
+    __table_args__ = (
+        db.Index("ix_comments_blog_id_created_at_id", "blog_id", "created_at", "id"),
+        db.Index("ix_comments_author_id", "author_id"),
+        db.Index("ix_comments_created_at", "created_at"),
+    )
+
     # Relationships
     blog = db.relationship("Blog", back_populates="comments")
     author = db.relationship("User", back_populates="comments")
@@ -30,6 +30,8 @@ class Follow(db.Model):
             "following_id",
             name="uq_follower_following"
         ),
+        db.Index("ix_follows_following_id_created_at", "following_id", "created_at", "id"),
+        db.Index("ix_follows_follower_id_created_at", "follower_id", "created_at", "id"),
     )
 
     def __repr__(self):
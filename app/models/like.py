@@ -26,6 +26,8 @@ class Like(db.Model):
 
     __table_args__ = (
         db.UniqueConstraint("user_id", "blog_id", name="uq_user_blog_like"),
+        db.Index("ix_likes_blog_id", "blog_id"),
+        db.Index("ix_likes_created_at", "created_at"),
     )
 
     # Relationships
@@ -22,8 +22,18 @@ class Media(db.Model):
     # ✅ FIXED
     media_type = db.Column(db.String(20), nullable=False)
 
-    media_url = db.Column(db.String(500), nullable=False)
+    # Empty until the upload pipeline has pushed the file to storage
+    media_url = db.Column(db.String(500), nullable=True)
     thumbnail_url = db.Column(db.String(500), nullable=True)
+    public_id = db.Column(db.String(255), nullable=True)
+
+    # pending -> ready | failed
+    status = db.Column(
+        db.String(20),
+        default="ready",
+        server_default="ready",
+        nullable=False
+    )
 
     position = db.Column(db.Integer, default=0)
 
@@ -33,6 +43,11 @@ class Media(db.Model):
         nullable=False
     )
 
+    __table_args__ = (
+        db.Index("ix_media_blog_id_position", "blog_id", "position"),
+        db.Index("ix_media_uploader_id", "uploader_id"),
+    )
+
     # Relationships
     blog = db.relationship("Blog", back_populates="media_items")
     uploader = db.relationship("User", back_populates="media_uploads")
@@ -0,0 +1,31 @@
+from app.extensions import db
+
+class TimelineEntry(db.Model):
+    __tablename__ = "timeline_entries"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+
+    user_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    blog_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("blogs.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Copy of blogs.created_at so a timeline can be trimmed and
+    # ordered without touching the blogs table.
+    created_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "blog_id", name="uq_timeline_user_blog"),
+        db.Index("ix_timeline_user_created_at", "user_id", "created_at", "blog_id"),
+        db.Index("ix_timeline_entries_blog_id", "blog_id"),
+    )
+
+    def __repr__(self):
+        return f"<TimelineEntry user={self.user_id} blog={self.blog_id}>"
@@ -5,5 +5,6 @@ class TokenBlocklist(db.Model):
     __tablename__ = "token_blocklist"
 
     id = db.Column(db.Integer, primary_key=True)
-    jti = db.Column(db.String(36), nullable=False, index=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=True, index=True)
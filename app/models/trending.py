@@ -0,0 +1,41 @@
+from app.extensions import db
+
+
+class TrendingScore(db.Model):
+    __tablename__ = "trending_scores"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+
+    # "24h" or "7d"; see app.trending.WINDOWS
+    period = db.Column(db.String(8), nullable=False)
+
+    blog_id = db.Column(
+        db.BigInteger,
+        db.ForeignKey("blogs.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    # Decayed score scaled to the period's refreshed_at, so that adding a
+    # new like never requires rewriting the other rows
+    score = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint("period", "blog_id", name="uq_trending_period_blog"),
+        db.Index("ix_trending_period_score", "period", "score", "blog_id"),
+        db.Index("ix_trending_scores_blog_id", "blog_id"),
+    )
+
+    def __repr__(self):
+        return f"<TrendingScore {self.period} blog={self.blog_id}>"
+
+
+class TrendingPeriod(db.Model):
+    __tablename__ = "trending_periods"
+
+    name = db.Column(db.String(8), primary_key=True)
+
+    # When the period's scores were last recomputed from likes and comments
+    refreshed_at = db.Column(db.DateTime, nullable=False)
+
+    def __repr__(self):
+        return f"<TrendingPeriod {self.name}>"
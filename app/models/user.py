@@ -13,6 +13,21 @@ class User(db.Model):
     bio = db.Column(db.Text, nullable=True)
     profile_image_url = db.Column(db.String(500), nullable=True)
     profile_image_public_id = db.Column(db.String(255), nullable=True)
+    profile_image_status = db.Column(db.String(20), nullable=True)
+
+    followers_count = db.Column(
+        db.Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
+
+    following_count = db.Column(
+        db.Integer,
+        default=0,
+        server_default="0",
+        nullable=False
+    )
 
     created_at = db.Column(
         db.DateTime,
@@ -20,40 +35,50 @@ class User(db.Model):
         nullable=False
     )
 
-    # Relationships
+    # Set when deletion is requested; the row goes once app.deletions has
+    # removed everything the user owns
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    # Relationships, removed by ON DELETE CASCADE (passive_deletes)
     blogs = db.relationship(
         "Blog",
         back_populates="author",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     media_uploads = db.relationship(
         "Media",
         back_populates="uploader",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     likes = db.relationship(
         "Like",
         back_populates="user",
-        cascade="all, delete-orphan"
+        cascade="all, delete-orphan",
+        passive_deletes=True
     )
 
     followers = db.relationship(
     "Follow",
     foreign_keys="[Follow.following_id]",
-    cascade="all, delete-orphan"
+    cascade="all, delete-orphan",
+    passive_deletes=True
     )
 
     following = db.relationship(
     "Follow",
     foreign_keys="[Follow.follower_id]",
-    cascade="all, delete-orphan"
+    cascade="all, delete-orphan",
+    passive_deletes=True
     )
     comments = db.relationship(
     "Comment",
     back_populates="author",
-    cascade="all, delete-orphan"
+    cascade="all, delete-orphan",
+    passive_deletes=True
     )
 
 
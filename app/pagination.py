@@ -0,0 +1,97 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import DateTime, Float, Integer, String, tuple_
+
+MAX_PER_PAGE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+# -------------------------
+# CURSOR ENCODING
+# -------------------------
+def encode_cursor(values):
+    raw = json.dumps([
+        v.isoformat() if isinstance(v, datetime) else v
+        for v in values
+    ], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def _decode_value(column, value):
+    # JSON hands back whatever the client sent; bool is an int subclass
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise ValueError(value)
+        return datetime.fromisoformat(value)
+    if isinstance(column.type, Integer):
+        valid = isinstance(value, int) and not isinstance(value, bool)
+    elif isinstance(column.type, Float):
+        valid = isinstance(value, (int, float)) and not isinstance(value, bool)
+    elif isinstance(column.type, String):
+        valid = isinstance(value, str)
+    else:
+        valid = value is not None
+    if not valid:
+        raise ValueError(value)
+    return value
+
+
+def decode_cursor(cursor, columns):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError):
+        raise InvalidCursor(cursor)
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor(cursor)
+
+    try:
+        return [_decode_value(col, v) for col, v in zip(columns, values)]
+    except (TypeError, ValueError):
+        raise InvalidCursor(cursor)
+
+
+def clamp_per_page(per_page):
+    return max(1, min(per_page, MAX_PER_PAGE))
+
+
+# -------------------------
+# KEYSET PAGINATION
+# -------------------------
+def keyset_page(query, columns, cursor, per_page, descending=True):
+    """Seek past ``cursor`` on ``columns`` and return ``(items, next_cursor)``.
+
+    ``columns`` must be a unique sort key backed by a composite index,
+    e.g. ``(Blog.created_at, Blog.id)``. The row-value comparison lets the
+    database start the index scan at the cursor, so the cost of a page
+    does not depend on how deep it is.
+    """
+    per_page = clamp_per_page(per_page)
+
+    if cursor:
+        key = tuple_(*columns)
+        values = tuple_(*decode_cursor(cursor, columns))
+        query = query.filter(key < values if descending else key > values)
+
+    query = query.order_by(*[
+        col.desc() if descending else col.asc()
+        for col in columns
+    ])
+
+    rows = query.limit(per_page + 1).all()
+    items = rows[:per_page]
+
+    next_cursor = None
+    if len(rows) > per_page:
+        next_cursor = cursor_for(items[-1], columns)
+
+    return items, next_cursor
+
+
+def cursor_for(item, columns):
+    return encode_cursor([getattr(item, col.key) for col in columns])
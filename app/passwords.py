@@ -0,0 +1,112 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+import bcrypt
+from flask import current_app
+from app.metrics import REGISTRY, Gauge, observe_external
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool and its queue are full."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated pool instead of the request thread.
+
+    bcrypt releases the GIL while hashing, so ``max_workers`` threads cap
+    how many cores password work can take. At most ``max_queue`` more jobs
+    may wait; beyond that ``hash``/``verify`` raise HasherBusy immediately
+    so a login burst is shed instead of stalling every other endpoint.
+    """
+
+    def __init__(self, rounds, max_workers, max_queue, timeout):
+        self.rounds = rounds
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="bcrypt"
+                )
+            return self._executor
+
+    def _run(self, operation, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HasherBusy()
+
+        with self._lock:
+            self.in_flight += 1
+
+        def job():
+            with observe_external("bcrypt", operation):
+                return fn(*args)
+
+        # The slot is freed when the job finishes, not when the caller
+        # gives up waiting, so timed-out work still counts against the limit
+        def release(future):
+            with self._lock:
+                self.in_flight -= 1
+            self._slots.release()
+
+        try:
+            future = self._get_executor().submit(job)
+        except Exception:
+            release(None)
+            raise
+        future.add_done_callback(release)
+
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            raise HasherBusy()
+
+    def hash(self, password):
+        hashed = self._run(
+            "hashpw",
+            bcrypt.hashpw,
+            password.encode("utf-8"),
+            bcrypt.gensalt(rounds=self.rounds)
+        )
+        return hashed.decode("utf-8")
+
+    def verify(self, password, password_hash):
+        return self._run(
+            "checkpw",
+            bcrypt.checkpw,
+            password.encode("utf-8"),
+            password_hash.encode("utf-8")
+        )
+
+    def needs_rehash(self, password_hash):
+        # $2b$<cost>$<salt+hash>
+        try:
+            return int(password_hash.split("$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+def password_hasher():
+    return current_app.extensions["password_hasher"]
+
+
+def create_password_hasher(app):
+    return PasswordHasher(
+        rounds=app.config["BCRYPT_ROUNDS"],
+        max_workers=app.config["BCRYPT_WORKERS"],
+        max_queue=app.config["BCRYPT_MAX_QUEUE"],
+        timeout=app.config["BCRYPT_TIMEOUT_SECONDS"]
+    )
+
+
+REGISTRY.register(Gauge(
+    "blig_bcrypt_in_flight",
+    "Password hashing jobs running or queued in this process.",
+    callback=lambda: password_hasher().in_flight
+))
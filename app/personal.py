@@ -0,0 +1,81 @@
+from flask import g, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import select
+from app.extensions import db
+from app.models import Follow, Like
+
+
+# Listings are public, but an authenticated viewer also gets its own state
+# per item: liked_by_me on blogs, is_following on users. Each page resolves
+# it with one IN lookup on the (user_id, blog_id) / (follower_id,
+# following_id) unique indexes, never one query per item. Anonymous
+# responses leave the flags out, so they can still be shared through the
+# response cache; see cached(per_viewer=True).
+
+def viewer_id():
+    """The authenticated user's id, or None; resolved once per token.
+
+    Keyed by the Authorization header rather than stored on ``g`` alone,
+    since requests sharing an app context share ``g``.
+    """
+    header = request.headers.get("Authorization")
+    viewers = g.setdefault("viewer_ids", {})
+
+    if header not in viewers:
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            # Public routes serve a bad or expired token as anonymous
+            identity = None
+        viewers[header] = int(identity) if identity is not None else None
+    return viewers[header]
+
+
+# -------------------------
+# BATCHED LOOKUPS
+# -------------------------
+def liked_blog_ids(user_id, blog_ids):
+    if not blog_ids:
+        return set()
+    return set(db.session.scalars(
+        select(Like.blog_id).where(Like.user_id == user_id, Like.blog_id.in_(blog_ids))
+    ))
+
+
+def followed_user_ids(user_id, user_ids):
+    if not user_ids:
+        return set()
+    return set(db.session.scalars(
+        select(Follow.following_id).where(
+            Follow.follower_id == user_id,
+            Follow.following_id.in_(user_ids)
+        )
+    ))
+
+
+# -------------------------
+# FLAGS
+# -------------------------
+def flag_liked(rows, blogs):
+    """Add liked_by_me to the serialized ``blogs`` of ``rows``."""
+    user_id = viewer_id()
+    if user_id is None:
+        return blogs
+
+    liked = liked_blog_ids(user_id, {row.id for row in rows})
+    for row, blog in zip(rows, blogs):
+        blog["liked_by_me"] = row.id in liked
+    return blogs
+
+
+def flag_following(rows, users):
+    """Add is_following to the serialized ``users`` of follow listing rows."""
+    user_id = viewer_id()
+    if user_id is None:
+        return users
+
+    followed = followed_user_ids(user_id, {row.user_id for row in rows})
+    for row, user in zip(rows, users):
+        user["is_following"] = row.user_id in followed
+    return users
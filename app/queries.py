@@ -0,0 +1,152 @@
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models import Blog, Comment, Follow, Media, User
+from app.pagination import keyset_page, clamp_per_page
+from app.batch import batch_memo
+
+BLOG_SORT_KEY = (Blog.created_at, Blog.id)
+FOLLOW_SORT_KEY = (Follow.created_at, Follow.id)
+COMMENT_SORT_KEY = (Comment.created_at, Comment.id)
+
+
+# -------------------------
+# BLOG LOADING
+# -------------------------
+# Columns read for each blog field. Listings select plain rows rather than
+# Blog objects: no identity map, no relationship state, and only the
+# columns the response asks for. id and created_at are always selected
+# since they form the keyset cursor.
+BLOG_FIELD_COLUMNS = {
+    "title": (Blog.title,),
+    "excerpt": (Blog.excerpt,),
+    "body_text": (Blog.body_text,),
+    "likes_count": (Blog.likes_count,),
+    "comments_count": (Blog.comments_count,),
+    "author": (User.id.label("author_id"), User.username.label("author_username")),
+    # First ready media item, served by the (blog_id, position) index
+    "thumbnail": (
+        select(func.coalesce(Media.thumbnail_url, Media.media_url))
+        .where(Media.blog_id == Blog.id, Media.status == "ready")
+        .order_by(Media.position, Media.id)
+        .limit(1)
+        .correlate(Blog)
+        .scalar_subquery()
+        .label("thumbnail"),
+    ),
+    "updated_at": (Blog.updated_at,)
+}
+
+
+def blog_rows(fields=None):
+    columns = [Blog.id, Blog.created_at]
+    for field in BLOG_FIELD_COLUMNS if fields is None else fields:
+        columns.extend(BLOG_FIELD_COLUMNS.get(field, ()))
+
+    query = db.session.query(*columns).select_from(Blog)
+    if fields is None or "author" in fields:
+        query = query.join(User, User.id == Blog.author_id)
+    return query
+
+
+def media_for(blog_ids):
+    """Ready media per blog id in position order, from one IN query."""
+    media = {blog_id: [] for blog_id in blog_ids}
+    if not blog_ids:
+        return media
+
+    rows = db.session.query(
+        Media.blog_id,
+        Media.id,
+        Media.media_url,
+        Media.media_type
+    ).filter(
+        Media.blog_id.in_(blog_ids),
+        Media.status == "ready"
+    ).order_by(Media.blog_id, Media.position, Media.id)
+
+    for row in rows:
+        media[row.blog_id].append(row)
+    return media
+
+
+def get_blog_page(page, per_page, count=True, fields=None):
+    return blog_rows(fields).order_by(
+        Blog.created_at.desc(),
+        Blog.id.desc()
+    ).paginate(
+        page=page,
+        per_page=clamp_per_page(per_page),
+        error_out=False,
+        count=count
+    )
+
+
+def get_blog_page_after(cursor, per_page, fields=None):
+    return keyset_page(blog_rows(fields), BLOG_SORT_KEY, cursor, per_page)
+
+
+def count_blogs():
+    return Blog.query.order_by(None).count()
+
+
+@batch_memo
+def get_blog(blog_id, fields=None):
+    return blog_rows(fields).filter(Blog.id == blog_id).first()
+
+
+@batch_memo
+def blog_exists(blog_id):
+    return db.session.query(
+        db.session.query(Blog.id).filter(Blog.id == blog_id).exists()
+    ).scalar()
+
+
+# -------------------------
+# FOLLOW LISTINGS
+# -------------------------
+def _follow_listing(user_column, filter_column, user_id, cursor, per_page):
+    # One joined query that reads only the columns the listing returns;
+    # rows carry Follow.created_at/id for the keyset cursor.
+    query = db.session.query(
+        Follow.id,
+        Follow.created_at,
+        User.id.label("user_id"),
+        User.username,
+        User.profile_image_url
+    ).join(
+        User,
+        User.id == user_column
+    ).filter(filter_column == user_id)
+
+    return keyset_page(query, FOLLOW_SORT_KEY, cursor, per_page)
+
+
+def get_followers_page(user_id, cursor, per_page):
+    return _follow_listing(Follow.follower_id, Follow.following_id, user_id, cursor, per_page)
+
+
+def get_following_page(user_id, cursor, per_page):
+    return _follow_listing(Follow.following_id, Follow.follower_id, user_id, cursor, per_page)
+
+
+# -------------------------
+# COMMENTS
+# -------------------------
+def get_comment_page(blog_id, cursor, per_page, since=None):
+    # Oldest first, authors joined in the same query; served by the
+    # (blog_id, created_at, id) index.
+    query = db.session.query(
+        Comment.id,
+        Comment.content,
+        Comment.created_at,
+        User.id.label("author_id"),
+        User.username.label("author_username")
+    ).join(
+        User,
+        User.id == Comment.author_id
+    ).filter(Comment.blog_id == blog_id)
+
+    if since is not None:
+        query = query.filter(Comment.created_at > since)
+
+    return keyset_page(query, COMMENT_SORT_KEY, cursor, per_page, descending=False)
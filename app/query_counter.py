@@ -0,0 +1,32 @@
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Count the SQL statements an engine executes inside a ``with`` block.
+
+    Used to check that an endpoint issues a fixed number of queries
+    no matter how many rows it returns::
+
+        with QueryCounter(db.engine) as counter:
+            client.get("/blogs?per_page=50")
+        assert counter.count == 4
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.engine, "before_cursor_execute", self._on_execute)
+        return False
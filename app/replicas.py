@@ -0,0 +1,204 @@
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import event, text
+from app.cache import RedisBackend
+from app.metrics import REGISTRY, Gauge
+from app.personal import viewer_id
+
+logger = logging.getLogger(__name__)
+
+READ_METHODS = ("GET", "HEAD")
+
+# POST endpoints that only read; their sub-requests are routed one by one
+READ_ONLY_ENDPOINTS = {"batch.batch"}
+
+# Seconds a replica is behind the primary; 0 when it has replayed all WAL it
+# received. An idle primary makes replay timestamps look old, hence the LSN
+# comparison first.
+PG_REPLICA_LAG = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+
+
+@contextmanager
+def use_primary():
+    """Read from the primary for the duration of the block."""
+    replica = g.pop("db_replica", None) if has_request_context() else None
+    try:
+        yield
+    finally:
+        if replica is not None:
+            g.db_replica = replica
+
+
+class ReplicaRouter:
+    """Picks a healthy replica for read-only requests.
+
+    A replica is skipped once it lags more than ``max_lag`` seconds or its
+    connections start failing; its state is rechecked at most every
+    ``check_interval`` seconds per worker. A user who wrote within the last
+    ``sticky_seconds`` reads from the primary so they see their own write.
+    """
+
+    def __init__(self, engines, max_lag, check_interval, sticky_seconds, sticky_store):
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.sticky_seconds = sticky_seconds
+        self.sticky_store = sticky_store
+        self._healthy = {name: True for name in engines}
+        self._next_check = {name: 0.0 for name in engines}
+        self._lock = threading.Lock()
+
+        for name, engine in engines.items():
+            event.listen(engine, "handle_error", self._on_error(name))
+
+    # -------------------------
+    # HEALTH
+    # -------------------------
+    def _on_error(self, name):
+        def handle_error(context):
+            if context.is_disconnect or context.connection is None:
+                self._mark(name, False, "connection failed")
+        return handle_error
+
+    def _mark(self, name, healthy, reason=""):
+        if self._healthy[name] != healthy:
+            if healthy:
+                logger.info("Replica %s is back in rotation", name)
+            else:
+                logger.warning("Replica %s taken out of rotation: %s", name, reason)
+        self._healthy[name] = healthy
+        self._next_check[name] = time.monotonic() + self.check_interval
+
+    def _lag(self, engine):
+        with engine.connect() as conn:
+            if conn.dialect.name != "postgresql":
+                return 0.0
+            return float(conn.execute(PG_REPLICA_LAG).scalar() or 0)
+
+    def _check(self, name):
+        try:
+            lag = self._lag(self.engines[name])
+        except Exception as e:
+            self._mark(name, False, str(e))
+            return
+
+        if lag > self.max_lag:
+            self._mark(name, False, f"{lag:.1f}s behind")
+        else:
+            self._mark(name, True)
+
+    def healthy(self):
+        now = time.monotonic()
+        due = [name for name, at in self._next_check.items() if at <= now]
+
+        # One thread re-checks; the others keep using the last known state
+        if due and self._lock.acquire(blocking=False):
+            try:
+                for name in due:
+                    self._check(name)
+            finally:
+                self._lock.release()
+
+        return [name for name, healthy in self._healthy.items() if healthy]
+
+    # -------------------------
+    # ROUTING
+    # -------------------------
+    def mark_sticky(self, user_id):
+        self.sticky_store.set(f"primary:{user_id}", b"1", self.sticky_seconds)
+
+    def is_sticky(self, user_id):
+        return self.sticky_store.get(f"primary:{user_id}") is not None
+
+    def choose(self, user_id):
+        if user_id is not None and self.is_sticky(user_id):
+            return None
+
+        healthy = self.healthy()
+        return random.choice(healthy) if healthy else None
+
+
+# -------------------------
+# REQUEST HOOKS
+# -------------------------
+def _route_request():
+    if request.method not in READ_METHODS:
+        return
+
+    router = current_app.extensions["replica_router"]
+    # Identity is resolved (and the blocklist consulted) on the primary
+    g.db_replica = router.choose(viewer_id())
+
+
+def _remember_write(response):
+    if (
+        request.method in READ_METHODS
+        or request.endpoint in READ_ONLY_ENDPOINTS
+        or response.status_code >= 400
+    ):
+        return response
+
+    try:
+        user_id = get_jwt_identity()
+    except RuntimeError:
+        return response
+
+    if user_id is not None:
+        current_app.extensions["replica_router"].mark_sticky(user_id)
+    return response
+
+
+def init_replicas(app):
+    """Route read-only requests to the DATABASE_REPLICA_URLS binds; returns
+    the router, or None when no replicas are configured."""
+    from app.extensions import db
+
+    with app.app_context():
+        engines = {
+            key: engine for key, engine in db.engines.items()
+            if key is not None and key.startswith("replica_")
+        }
+
+    if not engines:
+        return None
+
+    # The read-your-writes marker must be visible to every worker; a
+    # per-process store would send a writer's next read to a replica
+    cache = app.extensions.get("response_cache")
+    if cache is None or not isinstance(cache.backend, RedisBackend):
+        raise RuntimeError("DATABASE_REPLICA_URLS requires CACHE_BACKEND=redis")
+
+    router = ReplicaRouter(
+        engines,
+        max_lag=app.config["REPLICA_MAX_LAG_SECONDS"],
+        check_interval=app.config["REPLICA_CHECK_SECONDS"],
+        sticky_seconds=app.config["REPLICA_STICKY_SECONDS"],
+        sticky_store=cache.backend
+    )
+    app.before_request(_route_request)
+    app.after_request(_remember_write)
+
+    return router
+
+
+def _replica_health():
+    router = current_app.extensions.get("replica_router")
+    if router is None:
+        return {}
+    return {(name,): int(healthy) for name, healthy in router._healthy.items()}
+
+
+REGISTRY.register(Gauge(
+    "blig_db_replica_healthy",
+    "1 while a read replica is in rotation, 0 after it lagged or failed.",
+    ["replica"],
+    callback=_replica_health
+))
@@ -1,8 +1,10 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app.extensions import db
-from app.models import User, TokenBlocklist
-import bcrypt
-import cloudinary.uploader
+from app.models import User
+from app.blocklist import revoke_token
+from app.uploads import UploadTooLarge
+from app.passwords import HasherBusy, password_hasher
+from app.serializers import USER
 
 from flask_jwt_extended import (
     create_access_token,
@@ -14,6 +16,13 @@ from flask_jwt_extended import (
 
 auth_bp = Blueprint("auth", __name__)
 
+
+def _hasher_busy():
+    response = jsonify({"error": "Server busy, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 429
+
+
 # -------------------------
 # REGISTER
 # -------------------------
@@ -35,12 +44,15 @@ def register():
     if existing_user:
         return jsonify({"error": "User already exists"}), 400
 
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
+    try:
+        hashed_pw = password_hasher().hash(password)
+    except HasherBusy:
+        return _hasher_busy()
 
     new_user = User(
         username=username,
         email=email,
-        password_hash=hashed_pw.decode("utf-8")
+        password_hash=hashed_pw
     )
 
     db.session.add(new_user)
@@ -62,14 +74,30 @@ def login():
     if not email or not password:
         return jsonify({"error": "Missing email or password"}), 400
 
-    user = User.query.filter_by(email=email).first()
+    user = User.query.filter_by(email=email, deleted_at=None).first()
 
     if not user:
         return jsonify({"error": "Invalid credentials"}), 401
 
-    if not bcrypt.checkpw(password.encode("utf-8"), user.password_hash.encode("utf-8")):
+    hasher = password_hasher()
+
+    try:
+        password_ok = hasher.verify(password, user.password_hash)
+    except HasherBusy:
+        return _hasher_busy()
+
+    if not password_ok:
         return jsonify({"error": "Invalid credentials"}), 401
 
+    # Upgrade the stored hash when BCRYPT_ROUNDS has changed; if the pool
+    # is busy the login still succeeds and the next one retries
+    if hasher.needs_rehash(user.password_hash):
+        try:
+            user.password_hash = hasher.hash(password)
+            db.session.commit()
+        except HasherBusy:
+            pass
+
     access_token = create_access_token(identity=str(user.id))
     refresh_token = create_refresh_token(identity=str(user.id))
 
@@ -89,15 +117,31 @@ def get_current_user():
     user_id = int(get_jwt_identity())
     user = User.query.get(user_id)
 
-    if not user:
+    if not user or user.deleted_at:
         return jsonify({"error": "User not found"}), 404
 
-    return jsonify({
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "profile_image_url": user.profile_image_url
-    }), 200
+    return jsonify(USER()(user)), 200
+
+
+# -------------------------
+# DELETE ACCOUNT
+# -------------------------
+@auth_bp.route("/me", methods=["DELETE"])
+@jwt_required()
+def delete_current_user():
+    user_id = int(get_jwt_identity())
+    user = User.query.get(user_id)
+
+    if not user or user.deleted_at:
+        return jsonify({"error": "User not found"}), 404
+
+    token = get_jwt()
+    revoke_token(token["jti"], token["exp"])
+
+    if current_app.extensions["account_deleter"].submit(user):
+        return jsonify({"message": "Account deletion started"}), 202
+
+    return jsonify({"message": "Account deleted"}), 200
 
 
 # -------------------------
@@ -116,22 +160,22 @@ def upload_profile_image():
         return jsonify({"error": "No file provided"}), 400
 
     file = request.files["file"]
+    pipeline = current_app.extensions["upload_pipeline"]
 
-    upload_result = cloudinary.uploader.upload(
-        file,
-        folder="profile_images",
-        resource_type="image"
-    )
-
-    user.profile_image_url = upload_result["secure_url"]
-    user.profile_image_public_id = upload_result["public_id"]
+    try:
+        path = pipeline.spool(file)
+    except UploadTooLarge:
+        return jsonify({"error": "File too large"}), 400
 
+    user.profile_image_status = "pending"
     db.session.commit()
 
+    pipeline.submit_profile_image(user.id, path, file.mimetype)
+
     return jsonify({
-        "message": "Profile image updated",
-        "profile_image_url": user.profile_image_url
-    }), 200
+        "message": "Profile image upload accepted",
+        "status": "pending"
+    }), 202
 
 
 # -------------------------
@@ -141,6 +185,12 @@ def upload_profile_image():
 @jwt_required(refresh=True)
 def refresh():
     user_id = get_jwt_identity()
+
+    # Refresh tokens outlive a deleted account
+    if not db.session.query(
+        User.query.filter_by(id=int(user_id), deleted_at=None).exists()
+    ).scalar():
+        return jsonify({"error": "User not found"}), 401
     new_access_token = create_access_token(identity=user_id)
 
     return jsonify({
@@ -154,11 +204,8 @@ def refresh():
 @auth_bp.route("/logout", methods=["POST"])
 @jwt_required()
 def logout():
-    jti = get_jwt()["jti"]
-
-    revoked_token = TokenBlocklist(jti=jti)
-    db.session.add(revoked_token)
-    db.session.commit()
+    token = get_jwt()
+    revoke_token(token["jti"], token["exp"])
 
     return jsonify({"message": "Successfully logged out"}), 200
 
@@ -169,10 +216,7 @@ def logout():
 @auth_bp.route("/logout/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def logout_refresh():
-    jti = get_jwt()["jti"]
-
-    revoked_token = TokenBlocklist(jti=jti)
-    db.session.add(revoked_token)
-    db.session.commit()
+    token = get_jwt()
+    revoke_token(token["jti"], token["exp"])
 
     return jsonify({"message": "Refresh token revoked"}), 200
@@ -0,0 +1,38 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.batch import run_batch
+
+batch_bp = Blueprint("batch", __name__)
+
+
+# -----------------------------
+# BATCH
+# -----------------------------
+@batch_bp.route("/batch", methods=["POST"])
+def batch():
+    data = request.get_json(silent=True) or {}
+    subrequests = data.get("requests")
+
+    if not isinstance(subrequests, list) or not subrequests:
+        return jsonify({"error": "Missing requests"}), 400
+
+    max_requests = current_app.config["BATCH_MAX_REQUESTS"]
+    if len(subrequests) > max_requests:
+        return jsonify({"error": f"At most {max_requests} requests per batch"}), 400
+
+    paths = []
+    for index, sub in enumerate(subrequests):
+        path = sub.get("path") if isinstance(sub, dict) else None
+        method = sub.get("method", "GET") if isinstance(sub, dict) else None
+
+        if not isinstance(path, str) or not path.startswith("/") or path.startswith("//"):
+            return jsonify({"error": f"requests[{index}]: path must start with /"}), 400
+
+        if method != "GET":
+            return jsonify({"error": f"requests[{index}]: only GET is supported"}), 400
+
+        if path.split("?", 1)[0].rstrip("/") == "/batch":
+            return jsonify({"error": f"requests[{index}]: batches cannot be nested"}), 400
+
+        paths.append(path)
+
+    return jsonify({"responses": run_batch(paths)}), 200
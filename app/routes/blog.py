@@ -1,11 +1,52 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.exc import IntegrityError
 from app.extensions import db
-from app.models import Blog, Like, Media, Follow
-import cloudinary.uploader
+from app.models import Blog, Media
+from app.queries import (
+    BLOG_SORT_KEY,
+    get_blog_page,
+    get_blog_page_after,
+    get_blog,
+    count_blogs
+)
+from app.pagination import InvalidCursor, clamp_per_page, cursor_for
+from app.search import search_blogs
+from app.timeline import fan_out_blog, read_feed
+from app.trending import DEFAULT_WINDOW, WINDOWS, trending_blogs
+from app.likes import add_like, remove_like
+from app.deletions import media_assets
+from app.uploads import MAX_UPLOAD_BYTES, UploadTooLarge
+from app.cache import cached, invalidate
+from app.personal import flag_liked
+from app.models.blog import make_excerpt
+from app.serializers import (
+    BLOG_DEFAULT_FIELDS,
+    BLOG_FIELDS,
+    BLOG_SUMMARY_FIELDS,
+    MEDIA,
+    InvalidFields,
+    requested_fields,
+    serialize_blogs
+)
 
 blog_bp = Blueprint("blog", __name__)
 
+
+def _invalid_fields(e):
+    return jsonify({"error": f"Unknown fields: {', '.join(e.fields)}"}), 400
+
+
+def _listing_fields():
+    # ?view=summary returns cards (excerpt and thumbnail, no body);
+    # ?fields= overrides either view
+    summary = request.args.get("view") == "summary"
+    return requested_fields(
+        BLOG_FIELDS,
+        BLOG_SUMMARY_FIELDS if summary else BLOG_DEFAULT_FIELDS
+    )
+
+
 # -----------------------------
 # CREATE BLOG
 # -----------------------------
@@ -25,11 +66,15 @@ def create_blog():
         author_id=user_id,
         title=title,
         body_text=body_text,
+        excerpt=make_excerpt(body_text),
         is_published=True
     )
 
     db.session.add(new_blog)
+    db.session.flush()
+    fan_out_blog(new_blog)
     db.session.commit()
+    invalidate("blogs")
 
     return jsonify({
         "message": "Blog created successfully",
@@ -41,43 +86,48 @@ def create_blog():
 # GET ALL BLOGS (PAGINATED)
 # -----------------------------
 @blog_bp.route("/blogs", methods=["GET"])
+@cached("blogs", per_viewer=True)
 def get_all_blogs():
-    page = request.args.get("page", 1, type=int)
+    cursor = request.args.get("cursor")
     per_page = request.args.get("per_page", 5, type=int)
 
-    pagination = Blog.query.order_by(
-        Blog.created_at.desc()
-    ).paginate(page=page, per_page=per_page, error_out=False)
+    try:
+        fields = _listing_fields()
+    except InvalidFields as e:
+        return _invalid_fields(e)
+
+    # Cursor mode seeks on (created_at, id) and skips COUNT(*) unless asked;
+    # page mode keeps the old OFFSET behaviour for existing clients.
+    if cursor is not None:
+        include_total = request.args.get("include_total", "false") == "true"
 
+        try:
+            blogs, next_cursor = get_blog_page_after(cursor, per_page, fields)
+        except InvalidCursor:
+            return jsonify({"error": "Invalid cursor"}), 400
+
+        return jsonify({
+            "per_page": clamp_per_page(per_page),
+            "next_cursor": next_cursor,
+            "total": count_blogs() if include_total else None,
+            "blogs": flag_liked(blogs, serialize_blogs(blogs, fields))
+        }), 200
+
+    page = request.args.get("page", 1, type=int)
+    include_total = request.args.get("include_total", "true") == "true"
+
+    pagination = get_blog_page(page, per_page, count=include_total, fields=fields)
     blogs = pagination.items
-    result = []
-
-    for blog in blogs:
-        result.append({
-            "id": blog.id,
-            "title": blog.title,
-            "body_text": blog.body_text,
-            "likes_count": len(blog.likes),
-            "author": {
-                "id": blog.author.id,
-                "username": blog.author.username
-            },
-            "media": [
-                {
-                    "id": m.id,
-                    "url": m.media_url,
-                    "type": m.media_type
-                } for m in blog.media_items
-            ],
-            "created_at": blog.created_at.isoformat(),
-            "updated_at": blog.updated_at.isoformat()
-        })
 
     return jsonify({
         "page": page,
-        "per_page": per_page,
+        "per_page": pagination.per_page,
         "total": pagination.total,
-        "blogs": result
+        "next_cursor": (
+            cursor_for(blogs[-1], BLOG_SORT_KEY)
+            if len(blogs) == pagination.per_page else None
+        ),
+        "blogs": flag_liked(blogs, serialize_blogs(blogs, fields))
     }), 200
 
 
@@ -85,30 +135,92 @@ def get_all_blogs():
 # GET SINGLE BLOG
 # -----------------------------
 @blog_bp.route("/blogs/<int:blog_id>", methods=["GET"])
+@cached("blog:{blog_id}")
 def get_single_blog(blog_id):
-    blog = Blog.query.get(blog_id)
+    try:
+        fields = requested_fields(BLOG_FIELDS, BLOG_DEFAULT_FIELDS)
+    except InvalidFields as e:
+        return _invalid_fields(e)
+
+    blog = get_blog(blog_id, fields)
 
     if not blog:
         return jsonify({"error": "Blog not found"}), 404
 
+    return jsonify(serialize_blogs([blog], fields)[0]), 200
+
+
+# -----------------------------
+# SEARCH BLOGS
+# -----------------------------
+@blog_bp.route("/blogs/search", methods=["GET"])
+@cached("blogs", per_viewer=True)
+def search_blogs_view():
+    q = request.args.get("q", "").strip()
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 20, type=int)
+
+    if not q:
+        return jsonify({"error": "Missing search query"}), 400
+
+    try:
+        fields = _listing_fields()
+    except InvalidFields as e:
+        return _invalid_fields(e)
+
+    try:
+        hits, next_cursor = search_blogs(q, cursor, per_page, fields)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    rows = [row for row, _ in hits]
+    blogs = flag_liked(rows, serialize_blogs(rows, fields))
+
     return jsonify({
-        "id": blog.id,
-        "title": blog.title,
-        "body_text": blog.body_text,
-        "likes_count": len(blog.likes),
-        "author": {
-            "id": blog.author.id,
-            "username": blog.author.username
-        },
-        "media": [
-            {
-                "id": m.id,
-                "url": m.media_url,
-                "type": m.media_type
-            } for m in blog.media_items
-        ],
-        "created_at": blog.created_at.isoformat(),
-        "updated_at": blog.updated_at.isoformat()
+        "query": q,
+        "per_page": clamp_per_page(per_page),
+        "next_cursor": next_cursor,
+        "blogs": [
+            {**blog, "rank": rank}
+            for blog, (_, rank) in zip(blogs, hits)
+        ]
+    }), 200
+
+
+# -----------------------------
+# TRENDING BLOGS
+# -----------------------------
+@blog_bp.route("/blogs/trending", methods=["GET"])
+@cached("blogs", "trending", per_viewer=True)
+def trending_blogs_view():
+    window = request.args.get("window", DEFAULT_WINDOW)
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 20, type=int)
+
+    if window not in WINDOWS:
+        return jsonify({"error": f"window must be one of: {', '.join(WINDOWS)}"}), 400
+
+    try:
+        fields = _listing_fields()
+    except InvalidFields as e:
+        return _invalid_fields(e)
+
+    try:
+        hits, next_cursor = trending_blogs(window, cursor, per_page, fields)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    rows = [row for row, _ in hits]
+    blogs = flag_liked(rows, serialize_blogs(rows, fields))
+
+    return jsonify({
+        "window": window,
+        "per_page": clamp_per_page(per_page),
+        "next_cursor": next_cursor,
+        "blogs": [
+            {**blog, "score": score}
+            for blog, (_, score) in zip(blogs, hits)
+        ]
     }), 200
 
 
@@ -134,8 +246,10 @@ def update_blog(blog_id):
 
     if data.get("body_text"):
         blog.body_text = data["body_text"]
+        blog.excerpt = make_excerpt(data["body_text"])
 
     db.session.commit()
+    invalidate("blogs", f"blog:{blog_id}")
 
     return jsonify({
         "message": "Blog updated successfully",
@@ -158,8 +272,13 @@ def delete_blog(blog_id):
     if blog.author_id != user_id:
         return jsonify({"error": "Unauthorized"}), 403
 
+    assets = media_assets(Media.blog_id == blog_id)
+
+    # Likes, comments, media and timeline entries go by ON DELETE CASCADE
     db.session.delete(blog)
     db.session.commit()
+    invalidate("blogs", f"blog:{blog_id}", f"comments:{blog_id}")
+    current_app.extensions["upload_pipeline"].submit_cleanup(assets)
 
     return jsonify({"message": "Blog deleted successfully"}), 200
 
@@ -171,23 +290,24 @@ def delete_blog(blog_id):
 @jwt_required()
 def like_blog(blog_id):
     user_id = int(get_jwt_identity())
-    blog = Blog.query.get(blog_id)
+    like_buffer = current_app.extensions["like_buffer"]
 
-    if not blog:
-        return jsonify({"error": "Blog not found"}), 404
+    if like_buffer is not None:
+        like_buffer.toggle(user_id, blog_id, True)
+        return jsonify({"message": "Like accepted"}), 202
 
-    existing_like = Like.query.filter_by(
-        user_id=user_id,
-        blog_id=blog_id
-    ).first()
+    try:
+        liked = add_like(user_id, blog_id)
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({"error": "Blog not found"}), 404
 
-    if existing_like:
+    if not liked:
         return jsonify({"error": "Already liked"}), 400
 
-    new_like = Like(user_id=user_id, blog_id=blog_id)
-
-    db.session.add(new_like)
-    db.session.commit()
+    # Listings, search and trending embed likes_count
+    invalidate("blogs", f"blog:{blog_id}")
 
     return jsonify({"message": "Blog liked"}), 200
 
@@ -199,17 +319,19 @@ def like_blog(blog_id):
 @jwt_required()
 def unlike_blog(blog_id):
     user_id = int(get_jwt_identity())
+    like_buffer = current_app.extensions["like_buffer"]
 
-    like = Like.query.filter_by(
-        user_id=user_id,
-        blog_id=blog_id
-    ).first()
+    if like_buffer is not None:
+        like_buffer.toggle(user_id, blog_id, False)
+        return jsonify({"message": "Unlike accepted"}), 202
 
-    if not like:
+    unliked = remove_like(user_id, blog_id)
+    db.session.commit()
+
+    if not unliked:
         return jsonify({"error": "Like not found"}), 404
 
-    db.session.delete(like)
-    db.session.commit()
+    invalidate("blogs", f"blog:{blog_id}")
 
     return jsonify({"message": "Blog unliked"}), 200
 
@@ -235,53 +357,73 @@ def upload_media(blog_id):
     file = request.files["file"]
 
     # Optional file size validation (10MB)
-    if file.content_length and file.content_length > 10 * 1024 * 1024:
+    if file.content_length and file.content_length > MAX_UPLOAD_BYTES:
         return jsonify({"error": "File too large"}), 400
 
-    upload_result = cloudinary.uploader.upload(
-        file,
-        resource_type="auto"
-    )
+    pipeline = current_app.extensions["upload_pipeline"]
 
-    media_type = (
-        "video" if upload_result["resource_type"] == "video" else "image"
-    )
+    try:
+        path = pipeline.spool(file)
+    except UploadTooLarge:
+        return jsonify({"error": "File too large"}), 400
 
     existing_count = Media.query.filter_by(blog_id=blog_id).count()
 
     new_media = Media(
         blog_id=blog_id,
         uploader_id=user_id,
-        media_type=media_type,
-        media_url=upload_result["secure_url"],
-        thumbnail_url=upload_result.get("thumbnail_url"),
+        media_type="video" if file.mimetype.startswith("video/") else "image",
+        status="pending",
         position=existing_count
     )
 
     db.session.add(new_media)
     db.session.commit()
 
+    pipeline.submit_media(new_media.id, path, file.mimetype)
+
     return jsonify({
-        "message": "Media uploaded successfully",
+        "message": "Media upload accepted",
         "media_id": new_media.id,
-        "media_url": new_media.media_url,
-        "media_type": new_media.media_type
-    }), 201
+        "status": "pending"
+    }), 202
+
+
+# -----------------------------
+# MEDIA STATUS
+# -----------------------------
+@blog_bp.route("/media/<int:media_id>", methods=["GET"])
+def get_media(media_id):
+    media = db.session.get(Media, media_id)
+
+    if not media:
+        return jsonify({"error": "Media not found"}), 404
+
+    return jsonify(MEDIA()(media)), 200
+
 
+# -----------------------------
+# FOLLOWING FEED
+# -----------------------------
 @blog_bp.route("/feed", methods=["GET"])
 @jwt_required()
 def following_feed():
     user_id = int(get_jwt_identity())
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 10, type=int)
 
-    followed_ids = db.session.query(Follow.following_id).filter_by(
-        follower_id=user_id
-    ).subquery()
+    try:
+        fields = _listing_fields()
+    except InvalidFields as e:
+        return _invalid_fields(e)
 
-    blogs = Blog.query.filter(
-        Blog.author_id.in_(followed_ids)
-    ).order_by(Blog.created_at.desc()).all()
+    try:
+        blogs, next_cursor = read_feed(user_id, cursor, per_page, fields)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
 
     return jsonify({
-        "blogs": [blog.to_dict() for blog in blogs]
+        "per_page": clamp_per_page(per_page),
+        "next_cursor": next_cursor,
+        "blogs": flag_liked(blogs, serialize_blogs(blogs, fields))
     }), 200
-
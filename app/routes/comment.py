@@ -1,7 +1,14 @@
+from datetime import datetime
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import Comment, Blog
+from app.counters import bump_blog
+from app.trending import COMMENT_WEIGHT, record_activity
+from app.cache import cached, invalidate
+from app.queries import blog_exists, get_comment_page
+from app.pagination import InvalidCursor
+from app.serializers import COMMENT, InvalidFields, requested_fields
 
 comment_bp = Blueprint("comment", __name__)
 
@@ -24,11 +31,15 @@ def create_comment(blog_id):
     new_comment = Comment(
         blog_id=blog_id,
         author_id=user_id,
-        content=content
+        content=content,
+        created_at=datetime.utcnow()
     )
 
     db.session.add(new_comment)
+    bump_blog(blog_id, "comments_count", 1)
+    record_activity([(blog_id, COMMENT_WEIGHT, new_comment.created_at)])
     db.session.commit()
+    invalidate("blogs", f"blog:{blog_id}", f"comments:{blog_id}")
 
     return jsonify({
         "message": "Comment added",
@@ -37,26 +48,40 @@ def create_comment(blog_id):
 
 
 @comment_bp.route("/blogs/<int:blog_id>/comments", methods=["GET"])
+@cached("comments:{blog_id}")
 def get_comments(blog_id):
-    blog = Blog.query.get(blog_id)
-    if not blog:
+    if not blog_exists(blog_id):
         return jsonify({"error": "Blog not found"}), 404
 
-    comments = blog.comments
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 50, type=int)
+    since = request.args.get("since")
+
+    # ?since=<ISO timestamp> lets clients fetch only comments newer than
+    # the last one they have.
+    if since is not None:
+        try:
+            since = datetime.fromisoformat(since)
+        except ValueError:
+            return jsonify({"error": "Invalid since"}), 400
+
+    try:
+        fields = requested_fields(COMMENT.fields)
+    except InvalidFields as e:
+        return jsonify({"error": f"Unknown fields: {', '.join(e.fields)}"}), 400
+
+    try:
+        rows, next_cursor = get_comment_page(blog_id, cursor, per_page, since)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    serialize = COMMENT(fields)
+    response = jsonify([serialize(row) for row in rows])
 
-    result = []
-    for comment in comments:
-        result.append({
-            "id": comment.id,
-            "content": comment.content,
-            "author": {
-                "id": comment.author.id,
-                "username": comment.author.username
-            },
-            "created_at": comment.created_at.isoformat()
-        })
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
 
-    return jsonify(result), 200
+    return response, 200
 
 
 @comment_bp.route("/comments/<int:comment_id>", methods=["DELETE"])
@@ -73,7 +98,10 @@ def delete_comment(comment_id):
         return jsonify({"error": "Unauthorized"}), 403
 
     db.session.delete(comment)
+    bump_blog(comment.blog_id, "comments_count", -1)
+    record_activity([(comment.blog_id, -COMMENT_WEIGHT, comment.created_at)])
     db.session.commit()
+    invalidate("blogs", f"blog:{comment.blog_id}", f"comments:{comment.blog_id}")
 
     return jsonify({"message": "Comment deleted"}), 200
 
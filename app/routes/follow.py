@@ -1,7 +1,14 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.extensions import db
 from app.models import Follow, User
+from app.counters import bump_follow
+from app.timeline import backfill_timeline, remove_author_from_timeline
+from app.queries import get_followers_page, get_following_page
+from app.pagination import InvalidCursor
+from app.cache import cached, invalidate
+from app.personal import flag_following
+from app.serializers import FOLLOW_USER, InvalidFields, requested_fields
 
 follow_bp = Blueprint("follow", __name__)
 @follow_bp.route("/users/<int:user_id>/follow", methods=["POST"])
@@ -30,7 +37,10 @@ def follow_user(user_id):
     )
 
     db.session.add(new_follow)
+    bump_follow(current_user_id, user_id, 1)
+    backfill_timeline(current_user_id, user_to_follow)
     db.session.commit()
+    invalidate(f"followers:{user_id}", f"following:{current_user_id}")
 
     return jsonify({"message": "Followed successfully"}), 200
 
@@ -49,36 +59,53 @@ def unfollow_user(user_id):
         return jsonify({"error": "Not following"}), 404
 
     db.session.delete(follow)
+    bump_follow(current_user_id, user_id, -1)
+    remove_author_from_timeline(current_user_id, user_id)
     db.session.commit()
+    invalidate(f"followers:{user_id}", f"following:{current_user_id}")
 
     return jsonify({"message": "Unfollowed successfully"}), 200
 
+def _follow_listing_response(rows, next_cursor):
+    try:
+        fields = requested_fields(FOLLOW_USER.fields)
+    except InvalidFields as e:
+        return jsonify({"error": f"Unknown fields: {', '.join(e.fields)}"}), 400
+
+    serialize = FOLLOW_USER(fields)
+    response = jsonify(flag_following(rows, [serialize(row) for row in rows]))
+
+    # The body stays a plain list for existing clients; the cursor for
+    # the next page travels in a header.
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+
+    return response, 200
+
+
 @follow_bp.route("/users/<int:user_id>/followers", methods=["GET"])
+@cached("followers:{user_id}", "users", per_viewer=True)
 def get_followers(user_id):
-    followers = Follow.query.filter_by(following_id=user_id).all()
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 20, type=int)
 
-    result = []
-    for follow in followers:
-        user = User.query.get(follow.follower_id)
-        result.append({
-            "id": user.id,
-            "username": user.username
-        })
+    try:
+        rows, next_cursor = get_followers_page(user_id, cursor, per_page)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
 
-    return jsonify(result), 200
+    return _follow_listing_response(rows, next_cursor)
 
 
 @follow_bp.route("/users/<int:user_id>/following", methods=["GET"])
+@cached("following:{user_id}", "users", per_viewer=True)
 def get_following(user_id):
-    following = Follow.query.filter_by(follower_id=user_id).all()
-
-    result = []
-    for follow in following:
-        user = User.query.get(follow.following_id)
-        result.append({
-            "id": user.id,
-            "username": user.username
-        })
+    cursor = request.args.get("cursor")
+    per_page = request.args.get("per_page", 20, type=int)
 
-    return jsonify(result), 200
+    try:
+        rows, next_cursor = get_following_page(user_id, cursor, per_page)
+    except InvalidCursor:
+        return jsonify({"error": "Invalid cursor"}), 400
 
+    return _follow_listing_response(rows, next_cursor)
@@ -0,0 +1,239 @@
+import bisect
+import re
+import threading
+from collections import defaultdict
+from sqlalchemy import DDL, BigInteger, Float, column, event, func, inspect, literal_column, tuple_
+from app.extensions import db
+from app.models import Blog
+from app.pagination import clamp_per_page, decode_cursor, encode_cursor
+from app.queries import blog_rows
+
+# Cursor columns shared by both implementations: (rank, id), highest first
+SEARCH_SORT_KEY = (column("rank", Float), column("id", BigInteger))
+
+# Weights of the A (title) and B (body) labels, as in Postgres ts_rank
+TITLE_WEIGHT = 1.0
+BODY_WEIGHT = 0.4
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def search_blogs(q, cursor, per_page, fields=None):
+    """Return ``([(row, rank), ...], next_cursor)`` for the query ``q``;
+    rows are ``blog_rows(fields)`` rows.
+
+    Every term is prefix-matched and all terms must match. Postgres uses the
+    generated ``blogs.search_vector`` column and its GIN index; other
+    databases (SQLite in tests and benchmarks) use an in-process inverted
+    index instead.
+    """
+    terms = tokenize(q)
+    if not terms:
+        return [], None
+
+    per_page = clamp_per_page(per_page)
+    after = decode_cursor(cursor, SEARCH_SORT_KEY) if cursor else None
+
+    if db.engine.dialect.name == "postgresql":
+        hits = _search_postgres(terms, after, per_page + 1, fields)
+    else:
+        hits = _search_fallback(terms, after, per_page + 1, fields)
+
+    next_cursor = None
+    if len(hits) > per_page:
+        hits = hits[:per_page]
+        row, rank = hits[-1]
+        next_cursor = encode_cursor([rank, row.id])
+
+    return hits, next_cursor
+
+
+# -------------------------
+# POSTGRES
+# -------------------------
+# The column is not mapped on Blog so that other dialects can still create
+# the table; migration 5c2e8b17a9d4 adds it to existing databases and these
+# DDL hooks add it when the schema is built with create_all().
+for statement in (
+    "ALTER TABLE blogs ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(body_text, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX ix_blogs_search_vector ON blogs USING GIN (search_vector)",
+):
+    event.listen(
+        Blog.__table__,
+        "after_create",
+        DDL(statement).execute_if(dialect="postgresql")
+    )
+
+
+def _search_postgres(terms, after, limit, fields):
+    tsquery = func.to_tsquery(
+        "english",
+        " & ".join(f"{term}:*" for term in terms)
+    )
+    vector = literal_column("blogs.search_vector")
+
+    ranked = db.session.query(
+        Blog.id.label("id"),
+        func.ts_rank_cd(vector, tsquery).label("rank")
+    ).filter(vector.op("@@")(tsquery)).subquery()
+
+    query = blog_rows(fields).add_columns(ranked.c.rank).join(
+        ranked,
+        ranked.c.id == Blog.id
+    )
+
+    if after is not None:
+        query = query.filter(tuple_(ranked.c.rank, ranked.c.id) < tuple_(*after))
+
+    rows = query.order_by(ranked.c.rank.desc(), ranked.c.id.desc()).limit(limit).all()
+    return [(row, row.rank) for row in rows]
+
+
+# -------------------------
+# IN-PROCESS FALLBACK
+# -------------------------
+class InvertedIndex:
+    """term -> {blog_id: weighted term frequency}, with a sorted term list
+    for prefix lookups. Built lazily and kept current by mapper events.
+
+    The index lives in each process and only sees writes made through it:
+    under several workers, a blog created, edited or deleted through one
+    worker keeps its old terms in the others until they restart. It backs
+    development and tests on SQLite; production search runs on Postgres.
+    """
+
+    def __init__(self):
+        self._postings = defaultdict(dict)
+        self._terms = []
+        # blog_id -> ({title term: weight}, {body term: weight})
+        self._docs = {}
+        self._lock = threading.Lock()
+        self.built = False
+
+    def build(self):
+        with self._lock:
+            if self.built:
+                return
+            rows = db.session.query(Blog.id, Blog.title, Blog.body_text).yield_per(1000)
+            for blog_id, title, body_text in rows:
+                self._add(blog_id, _weights(title, TITLE_WEIGHT), _weights(body_text, BODY_WEIGHT))
+            self._terms = sorted(self._postings)
+            self.built = True
+
+    def _add(self, blog_id, title_weights, body_weights):
+        weights = defaultdict(float, title_weights)
+        for term, weight in body_weights.items():
+            weights[term] += weight
+
+        for term, weight in weights.items():
+            self._postings[term][blog_id] = weight
+        self._docs[blog_id] = (title_weights, body_weights)
+
+    def _remove(self, blog_id):
+        title_weights, body_weights = self._docs.pop(blog_id, ({}, {}))
+        for term in set(title_weights).union(body_weights):
+            postings = self._postings[term]
+            postings.pop(blog_id, None)
+            if not postings:
+                del self._postings[term]
+
+    def update(self, blog_id, title, body_text=None):
+        """Reindex a blog; a ``body_text`` of None keeps its indexed body."""
+        with self._lock:
+            if not self.built:
+                return
+            body_weights = (
+                self._docs.get(blog_id, ({}, {}))[1] if body_text is None
+                else _weights(body_text, BODY_WEIGHT)
+            )
+            self._remove(blog_id)
+            self._add(blog_id, _weights(title, TITLE_WEIGHT), body_weights)
+            self._terms = sorted(self._postings)
+
+    def remove(self, *blog_ids):
+        with self._lock:
+            if not self.built:
+                return
+            for blog_id in blog_ids:
+                self._remove(blog_id)
+            self._terms = sorted(self._postings)
+
+    def _prefix_scores(self, prefix):
+        scores = defaultdict(float)
+        start = bisect.bisect_left(self._terms, prefix)
+        for term in self._terms[start:]:
+            if not term.startswith(prefix):
+                break
+            for blog_id, weight in self._postings[term].items():
+                scores[blog_id] += weight
+        return scores
+
+    def search(self, terms):
+        with self._lock:
+            per_term = [self._prefix_scores(term) for term in terms]
+
+        matches = set(per_term[0]).intersection(*per_term[1:])
+        return {
+            blog_id: sum(scores[blog_id] for scores in per_term)
+            for blog_id in matches
+        }
+
+
+def _weights(text, weight):
+    weights = defaultdict(float)
+    for term in tokenize(text):
+        weights[term] += weight
+    return dict(weights)
+
+
+_index = InvertedIndex()
+
+
+def _search_fallback(terms, after, limit, fields):
+    _index.build()
+
+    ranked = sorted(
+        ((rank, blog_id) for blog_id, rank in _index.search(terms).items()),
+        reverse=True
+    )
+    if after is not None:
+        ranked = [key for key in ranked if key < tuple(after)]
+    ranked = ranked[:limit]
+
+    rows = {
+        row.id: row
+        for row in blog_rows(fields).filter(Blog.id.in_([blog_id for _, blog_id in ranked]))
+    }
+    return [(rows[blog_id], rank) for rank, blog_id in ranked if blog_id in rows]
+
+
+@event.listens_for(Blog, "after_insert")
+@event.listens_for(Blog, "after_update")
+def _index_blog(mapper, connection, blog):
+    # body_text is deferred. Loading it here would query in the middle of
+    # the flush; an unloaded body was not changed, so its terms are kept.
+    if _index.built:
+        unloaded = inspect(blog).unloaded
+        _index.update(
+            blog.id,
+            blog.title,
+            None if "body_text" in unloaded else blog.body_text
+        )
+
+
+@event.listens_for(Blog, "after_delete")
+def _unindex_blog(mapper, connection, blog):
+    _index.remove(blog.id)
+
+
+def unindex_blogs(blog_ids):
+    """For blogs removed by bulk DELETE, which skips mapper events."""
+    _index.remove(*blog_ids)
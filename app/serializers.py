@@ -0,0 +1,184 @@
+from operator import attrgetter
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+from app.queries import media_for
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class InvalidFields(ValueError):
+
+    def __init__(self, fields):
+        super().__init__(fields)
+        self.fields = fields
+
+
+# -------------------------
+# SERIALIZERS
+# -------------------------
+# Serializers read plain SQL rows (or ORM objects) by attribute. Each field
+# selection is compiled once into a function holding just the getters it
+# needs, so serializing a row does no per-field checks.
+
+def _iso(name):
+    get = attrgetter(name)
+    return lambda row: get(row).isoformat()
+
+
+def _author(row):
+    return {"id": row.author_id, "username": row.author_username}
+
+
+def _compile(getters, fields):
+    pairs = [(name, getters[name]) for name in fields]
+
+    def serialize(row):
+        return {name: get(row) for name, get in pairs}
+
+    return serialize
+
+
+class Serializer:
+
+    def __init__(self, **getters):
+        self.getters = getters
+        self.fields = tuple(getters)
+        self._compiled = {}
+
+    def __call__(self, fields=None):
+        fields = self.fields if fields is None else fields
+        serialize = self._compiled.get(fields)
+        if serialize is None:
+            serialize = self._compiled[fields] = _compile(self.getters, fields)
+        return serialize
+
+
+BLOG = Serializer(
+    id=attrgetter("id"),
+    title=attrgetter("title"),
+    excerpt=attrgetter("excerpt"),
+    body_text=attrgetter("body_text"),
+    likes_count=attrgetter("likes_count"),
+    comments_count=attrgetter("comments_count"),
+    author=_author,
+    thumbnail=attrgetter("thumbnail"),
+    created_at=_iso("created_at"),
+    updated_at=_iso("updated_at")
+)
+
+# "media" is loaded separately, in one IN query per page
+BLOG_FIELDS = BLOG.fields + ("media",)
+
+BLOG_DEFAULT_FIELDS = (
+    "id", "title", "body_text", "likes_count", "comments_count",
+    "author", "created_at", "updated_at", "media"
+)
+
+# Listing cards: no body, one thumbnail instead of every media item
+BLOG_SUMMARY_FIELDS = (
+    "id", "title", "excerpt", "likes_count", "comments_count",
+    "author", "thumbnail", "created_at"
+)
+
+COMMENT = Serializer(
+    id=attrgetter("id"),
+    content=attrgetter("content"),
+    author=_author,
+    created_at=_iso("created_at")
+)
+
+USER = Serializer(
+    id=attrgetter("id"),
+    username=attrgetter("username"),
+    email=attrgetter("email"),
+    profile_image_url=attrgetter("profile_image_url"),
+    profile_image_status=attrgetter("profile_image_status")
+)
+
+# Follow listing rows carry Follow.id as "id" for the cursor
+FOLLOW_USER = Serializer(
+    id=attrgetter("user_id"),
+    username=attrgetter("username"),
+    profile_image_url=attrgetter("profile_image_url")
+)
+
+MEDIA = Serializer(
+    media_id=attrgetter("id"),
+    blog_id=attrgetter("blog_id"),
+    status=attrgetter("status"),
+    media_url=attrgetter("media_url"),
+    media_type=attrgetter("media_type"),
+    thumbnail_url=attrgetter("thumbnail_url")
+)
+
+
+def requested_fields(allowed, default=None):
+    """The ``?fields=a,b`` projection, in ``allowed`` order; ``default``
+    (all fields unless given) when absent."""
+    spec = request.args.get("fields")
+    if not spec:
+        return allowed if default is None else default
+
+    names = {name.strip() for name in spec.split(",") if name.strip()}
+    unknown = names.difference(allowed)
+    if unknown:
+        raise InvalidFields(sorted(unknown))
+
+    return tuple(name for name in allowed if name in names)
+
+
+def serialize_blogs(rows, fields=BLOG_DEFAULT_FIELDS):
+    serialize = BLOG(tuple(name for name in fields if name != "media"))
+    if "media" not in fields:
+        return [serialize(row) for row in rows]
+
+    media = media_for([row.id for row in rows])
+    return [
+        {
+            **serialize(row),
+            "media": [
+                {"id": m.id, "url": m.media_url, "type": m.media_type}
+                for m in media[row.id]
+            ]
+        } for row in rows
+    ]
+
+
+# -------------------------
+# JSON ENCODING
+# -------------------------
+class OrjsonProvider(DefaultJSONProvider):
+    """Encodes responses with orjson. Keys stay sorted as with Flask's
+    provider, and types orjson does not know fall back to its ``default``."""
+
+    option = (
+        orjson.OPT_SORT_KEYS
+        | orjson.OPT_NON_STR_KEYS
+        # Flask renders datetimes as HTTP dates, not ISO strings
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+    ) if orjson is not None else 0
+
+    def _encode(self, obj):
+        return orjson.dumps(obj, default=self.default, option=self.option)
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return self._encode(obj).decode("utf-8")
+
+    def response(self, *args, **kwargs):
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b"\n", mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Use orjson for responses when it is installed and enabled."""
+    if app.config["JSON_FAST_ENCODER"] and orjson is not None:
+        app.json = OrjsonProvider(app)
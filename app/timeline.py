@@ -0,0 +1,194 @@
+from flask import current_app
+from sqlalchemy import BigInteger, DateTime, delete, func, insert, literal, select
+from app.extensions import db
+from app.models import Blog, Follow, TimelineEntry, User
+from app.pagination import keyset_page, clamp_per_page, cursor_for
+from app.queries import blog_rows, BLOG_SORT_KEY
+
+
+# Home timelines are materialized on write ("fan-out-on-write"): a new blog
+# is copied into every follower's timeline_entries in one INSERT ... SELECT.
+# Authors with more than TIMELINE_FANOUT_MAX_FOLLOWERS followers are skipped
+# and their posts are merged in when the feed is read instead, so the cost
+# of publishing is bounded by that limit times TIMELINE_MAX_LENGTH.
+
+def _max_length():
+    return current_app.config["TIMELINE_MAX_LENGTH"]
+
+
+def _fanout_limit():
+    return current_app.config["TIMELINE_FANOUT_MAX_FOLLOWERS"]
+
+
+def is_large_account(user):
+    return user.followers_count > _fanout_limit()
+
+
+# -------------------------
+# WRITE PATH
+# -------------------------
+def fan_out_blog(blog):
+    author = db.session.get(User, blog.author_id)
+    if is_large_account(author):
+        return
+
+    followers = select(Follow.follower_id).where(
+        Follow.following_id == blog.author_id
+    )
+
+    db.session.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "blog_id", "created_at"],
+            select(
+                Follow.follower_id,
+                literal(blog.id, BigInteger),
+                literal(blog.created_at, DateTime)
+            ).where(Follow.following_id == blog.author_id)
+        )
+    )
+    trim_timelines(followers)
+
+
+def backfill_timeline(follower_id, author):
+    if is_large_account(author):
+        return
+
+    recent = select(
+        literal(follower_id, BigInteger),
+        Blog.id,
+        Blog.created_at
+    ).where(
+        Blog.author_id == author.id
+    ).order_by(
+        Blog.created_at.desc(),
+        Blog.id.desc()
+    ).limit(_max_length())
+
+    db.session.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "blog_id", "created_at"],
+            recent
+        )
+    )
+    trim_timelines([follower_id])
+
+
+def remove_author_from_timeline(follower_id, author_id):
+    db.session.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.user_id == follower_id,
+            TimelineEntry.blog_id.in_(
+                select(Blog.id).where(Blog.author_id == author_id)
+            )
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def trim_timelines(user_ids):
+    """Cut the timelines of ``user_ids`` back to TIMELINE_MAX_LENGTH.
+
+    Counting entries is an index-only scan; the row_number() ranking only
+    runs for the few timelines that actually went over the cap.
+    """
+    over_cap = db.session.scalars(
+        select(TimelineEntry.user_id)
+        .where(TimelineEntry.user_id.in_(user_ids))
+        .group_by(TimelineEntry.user_id)
+        .having(func.count() > _max_length())
+    ).all()
+    if not over_cap:
+        return
+
+    ranked = select(
+        TimelineEntry.id,
+        func.row_number().over(
+            partition_by=TimelineEntry.user_id,
+            order_by=(TimelineEntry.created_at.desc(), TimelineEntry.blog_id.desc())
+        ).label("rank")
+    ).where(
+        TimelineEntry.user_id.in_(over_cap)
+    ).subquery()
+
+    db.session.execute(
+        delete(TimelineEntry).where(
+            TimelineEntry.id.in_(
+                select(ranked.c.id).where(ranked.c.rank > _max_length())
+            )
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def rebuild_timelines():
+    """Rebuild every timeline from follows and blogs (after bulk loads)."""
+    ranked = select(
+        Follow.follower_id.label("user_id"),
+        Blog.id.label("blog_id"),
+        Blog.created_at,
+        func.row_number().over(
+            partition_by=Follow.follower_id,
+            order_by=(Blog.created_at.desc(), Blog.id.desc())
+        ).label("rank")
+    ).join(
+        Blog,
+        Blog.author_id == Follow.following_id
+    ).join(
+        User,
+        User.id == Follow.following_id
+    ).where(User.followers_count <= _fanout_limit()).subquery()
+
+    db.session.execute(delete(TimelineEntry))
+    db.session.execute(
+        insert(TimelineEntry).from_select(
+            ["user_id", "blog_id", "created_at"],
+            select(ranked.c.user_id, ranked.c.blog_id, ranked.c.created_at)
+            .where(ranked.c.rank <= _max_length())
+        )
+    )
+    db.session.commit()
+
+
+# -------------------------
+# READ PATH
+# -------------------------
+def read_feed(user_id, cursor, per_page, fields=None):
+    per_page = clamp_per_page(per_page)
+
+    materialized = blog_rows(fields).join(
+        TimelineEntry,
+        TimelineEntry.blog_id == Blog.id
+    ).filter(TimelineEntry.user_id == user_id)
+
+    blogs, next_cursor = keyset_page(materialized, BLOG_SORT_KEY, cursor, per_page)
+
+    # Fan-out-on-read for followed accounts too large to fan out on write
+    large_author_ids = [
+        author_id for (author_id,) in db.session.query(User.id).join(
+            Follow,
+            Follow.following_id == User.id
+        ).filter(
+            Follow.follower_id == user_id,
+            User.followers_count > _fanout_limit()
+        )
+    ]
+
+    if not large_author_ids:
+        return blogs, next_cursor
+
+    pulled, pulled_cursor = keyset_page(
+        blog_rows(fields).filter(Blog.author_id.in_(large_author_ids)),
+        BLOG_SORT_KEY,
+        cursor,
+        per_page
+    )
+
+    merged = sorted(
+        {blog.id: blog for blog in blogs + pulled}.values(),
+        key=lambda blog: (blog.created_at, blog.id),
+        reverse=True
+    )
+    blogs = merged[:per_page]
+
+    has_more = bool(next_cursor or pulled_cursor or len(merged) > per_page)
+    next_cursor = cursor_for(blogs[-1], BLOG_SORT_KEY) if has_more and blogs else None
+
+    return blogs, next_cursor
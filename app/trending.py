@@ -0,0 +1,202 @@
+from collections import defaultdict, namedtuple
+from datetime import datetime, timedelta
+from sqlalchemy import BigInteger, cast, delete, func, literal_column, select
+from app.extensions import db
+from app.database import dialect_insert
+from app.models import Blog, Comment, Like, TrendingPeriod, TrendingScore
+from app.pagination import keyset_page
+from app.queries import blog_rows
+from app.cache import invalidate
+
+
+# Trending scores are kept per period in trending_scores, ordered by the
+# (period, score, blog_id) index, so a page costs the same at any size.
+#
+# A like or comment at time t is worth weight * 2^((t - base) / half_life),
+# where base is the period's last refresh. Every score decays by the same
+# factor as time passes, so ordering by the stored value is ordering by
+# the decayed score, and a new like is a single "score = score + w" upsert
+# that never touches other rows. `flask refresh-trending`, run from cron,
+# recomputes each period from the likes and comments inside its window,
+# dropping activity that has aged out and resetting base so the weights
+# stay small.
+#
+# Writers read base in their own transaction under a share lock on the
+# period's row, and a refresh holds that row for update from before it
+# aggregates until it commits. A like therefore lands either before the
+# refresh, which counts it, or after, against the new base; while a
+# period is being refreshed, likes and comments wait for it.
+
+Window = namedtuple("Window", "length half_life")
+
+WINDOWS = {
+    "24h": Window(timedelta(hours=24), timedelta(hours=6)),
+    "7d": Window(timedelta(days=7), timedelta(hours=36)),
+}
+
+DEFAULT_WINDOW = "24h"
+
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 3.0
+
+TRENDING_SORT_KEY = (TrendingScore.score, TrendingScore.blog_id)
+
+# Refreshes aggregate activity per bucket rather than per row
+BUCKET_SECONDS = 900
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _weight(weight, at, base, window):
+    return weight * 2 ** ((at - base).total_seconds() / window.half_life.total_seconds())
+
+
+def refreshed_at(lock=False):
+    """{period: refreshed_at} for refreshed periods.
+
+    With ``lock``, the rows are share-locked until the transaction ends,
+    so that no refresh can replace the scores in between.
+    """
+    query = select(TrendingPeriod.name, TrendingPeriod.refreshed_at)
+    if lock:
+        query = query.with_for_update(read=True)
+    return dict(db.session.execute(query).all())
+
+
+# -------------------------
+# WRITE PATH
+# -------------------------
+def record_activity(events):
+    """Add ``[(blog_id, weight, at), ...]`` to every refreshed period.
+
+    A removed like or comment is recorded with a negative weight and its
+    original ``at``, which takes back exactly what it added. Activity from
+    before a period's window is skipped: the last refresh left it out.
+    Does not commit.
+    """
+    if not events:
+        return
+
+    periods = refreshed_at(lock=True)
+
+    for name, window in WINDOWS.items():
+        base = periods.get(name)
+        if base is None:
+            continue
+
+        deltas = defaultdict(float)
+        for blog_id, weight, at in events:
+            if at >= base - window.length:
+                deltas[blog_id] += _weight(weight, at, base, window)
+
+        rows = [
+            {"period": name, "blog_id": blog_id, "score": delta}
+            for blog_id, delta in sorted(deltas.items()) if delta
+        ]
+        if not rows:
+            continue
+
+        upsert = dialect_insert(db.session, TrendingScore).values(rows)
+        db.session.execute(upsert.on_conflict_do_update(
+            index_elements=["period", "blog_id"],
+            set_={"score": TrendingScore.score + upsert.excluded.score}
+        ))
+
+
+# -------------------------
+# REFRESH
+# -------------------------
+def _epoch_seconds(column):
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.extract("epoch", column)
+    return func.strftime("%s", column)
+
+
+def _window_scores(window, now):
+    scores = defaultdict(float)
+
+    for model, weight in ((Like, LIKE_WEIGHT), (Comment, COMMENT_WEIGHT)):
+        # Inlined so that GROUP BY repeats the exact SELECT expression
+        bucket = cast(_epoch_seconds(model.created_at), BigInteger) // literal_column(
+            str(BUCKET_SECONDS), BigInteger
+        )
+        rows = db.session.execute(
+            select(model.blog_id, bucket, func.count())
+            .where(model.created_at >= now - window.length, model.created_at <= now)
+            .group_by(model.blog_id, bucket)
+        )
+        for blog_id, slot, count in rows:
+            at = min(EPOCH + timedelta(seconds=(slot + 0.5) * BUCKET_SECONDS), now)
+            scores[blog_id] += count * _weight(weight, at, now, window)
+
+    return scores
+
+
+def refresh_trending(periods=None, chunk_size=1000):
+    """Recompute the scores of ``periods`` (all by default); returns rows
+    written per period. Each period is replaced in one transaction."""
+    written = {}
+
+    for name in periods or WINDOWS:
+        # Writers wait from here until the commit; see the module comment
+        db.session.execute(
+            select(TrendingPeriod.name)
+            .where(TrendingPeriod.name == name)
+            .with_for_update()
+        )
+        now = datetime.utcnow()
+        scores = _window_scores(WINDOWS[name], now)
+
+        db.session.execute(delete(TrendingScore).where(TrendingScore.period == name))
+        rows = [
+            {"period": name, "blog_id": blog_id, "score": score}
+            for blog_id, score in sorted(scores.items())
+        ]
+        for start in range(0, len(rows), chunk_size):
+            # An upsert, in case a database without row locks let a writer in
+            upsert = dialect_insert(db.session, TrendingScore).values(
+                rows[start:start + chunk_size]
+            )
+            db.session.execute(upsert.on_conflict_do_update(
+                index_elements=["period", "blog_id"],
+                set_={"score": upsert.excluded.score}
+            ))
+
+        upsert = dialect_insert(db.session, TrendingPeriod).values(name=name, refreshed_at=now)
+        db.session.execute(upsert.on_conflict_do_update(
+            index_elements=["name"],
+            set_={"refreshed_at": upsert.excluded.refreshed_at}
+        ))
+        db.session.commit()
+        written[name] = len(rows)
+
+    invalidate("trending")
+
+    return written
+
+
+# -------------------------
+# READ PATH
+# -------------------------
+def trending_blogs(period, cursor, per_page, fields=None):
+    """A page of ``(row, score)`` for ``period``, hottest first; score is
+    decayed to now."""
+    ranked = blog_rows(fields).add_columns(
+        TrendingScore.score,
+        TrendingScore.blog_id
+    ).join(
+        TrendingScore,
+        TrendingScore.blog_id == Blog.id
+    ).filter(
+        TrendingScore.period == period,
+        TrendingScore.score > 0
+    )
+
+    rows, next_cursor = keyset_page(ranked, TRENDING_SORT_KEY, cursor, per_page)
+
+    base = refreshed_at().get(period)
+    if base is None:
+        return [(row, row.score) for row in rows], next_cursor
+
+    decay = _weight(1.0, base, datetime.utcnow(), WINDOWS[period])
+    return [(row, round(row.score * decay, 6)) for row in rows], next_cursor
@@ -0,0 +1,256 @@
+import glob
+import logging
+import mimetypes
+import os
+import shutil
+import threading
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import cloudinary.api
+import cloudinary.uploader
+from sqlalchemy import update
+from app.extensions import db
+from app.models import Media, User
+from app.metrics import observe_external
+from app.cache import invalidate
+
+logger = logging.getLogger(__name__)
+
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+# Cloudinary's limit on public ids per bulk delete call
+DELETE_BATCH_SIZE = 100
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+# -------------------------
+# STORAGE BACKENDS
+# -------------------------
+# A backend takes a spooled file and returns a dict with "url",
+# "public_id", "resource_type" ("image"/"video") and "thumbnail_url".
+# delete() removes stored files given (public_id, resource_type) pairs.
+
+class CloudinaryBackend:
+
+    def upload(self, path, content_type=None, folder=None, resource_type="auto"):
+        with observe_external("cloudinary", "upload"):
+            result = cloudinary.uploader.upload(
+                path,
+                folder=folder,
+                resource_type=resource_type
+            )
+        return {
+            "url": result["secure_url"],
+            "public_id": result["public_id"],
+            "resource_type": result["resource_type"],
+            "thumbnail_url": result.get("thumbnail_url")
+        }
+
+    def delete(self, assets):
+        by_type = defaultdict(list)
+        for public_id, resource_type in assets:
+            by_type[resource_type].append(public_id)
+
+        # Derived images (thumbnails) go with their original
+        for resource_type, public_ids in by_type.items():
+            for start in range(0, len(public_ids), DELETE_BATCH_SIZE):
+                with observe_external("cloudinary", "delete"):
+                    cloudinary.api.delete_resources(
+                        public_ids[start:start + DELETE_BATCH_SIZE],
+                        resource_type=resource_type
+                    )
+
+
+class LocalBackend:
+    """Filesystem stand-in for Cloudinary, for development and benchmarks."""
+
+    def __init__(self, root, base_url):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def upload(self, path, content_type=None, folder=None, resource_type="auto"):
+        public_id = "/".join(filter(None, [folder, uuid.uuid4().hex]))
+        extension = mimetypes.guess_extension(content_type or "") or ""
+
+        target = os.path.join(self.root, public_id + extension)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(path, target)
+
+        return {
+            "url": f"{self.base_url}/{public_id}{extension}",
+            "public_id": public_id,
+            "resource_type": "video" if (content_type or "").startswith("video/") else "image",
+            "thumbnail_url": None
+        }
+
+    def delete(self, assets):
+        for public_id, _ in assets:
+            # Stored as public_id plus whatever extension the upload had
+            base = os.path.join(self.root, public_id)
+            for path in [base, *glob.glob(glob.escape(base) + ".*")]:
+                if os.path.isfile(path):
+                    os.remove(path)
+
+
+# -------------------------
+# PIPELINE
+# -------------------------
+class UploadPipeline:
+    """Spool uploads to local disk and push them to storage off the request.
+
+    The request handler only streams the file to ``spool_dir`` and records
+    a ``pending`` row; a small thread pool then uploads it to the backend
+    and flips the row to ``ready`` or ``failed``. With ``max_workers=0``
+    jobs run inline, which keeps tests and benchmarks deterministic.
+    """
+
+    def __init__(self, app, backend, spool_dir, max_workers):
+        self.app = app
+        self.backend = backend
+        self.spool_dir = spool_dir
+        self.max_workers = max_workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def spool(self, file):
+        os.makedirs(self.spool_dir, exist_ok=True)
+        path = os.path.join(self.spool_dir, uuid.uuid4().hex)
+        file.save(path)
+
+        if os.path.getsize(path) > MAX_UPLOAD_BYTES:
+            os.remove(path)
+            raise UploadTooLarge(file.filename)
+
+        return path
+
+    def submit_media(self, media_id, path, content_type):
+        self._submit(self._upload_media, media_id, path, content_type)
+
+    def submit_profile_image(self, user_id, path, content_type):
+        self._submit(self._upload_profile_image, user_id, path, content_type)
+
+    def submit_cleanup(self, assets):
+        """Delete stored files of rows that are already gone."""
+        if assets:
+            self._submit(self._delete_assets, assets)
+
+    def _submit(self, job, *args):
+        if not self.max_workers:
+            job(*args)
+            return
+
+        # Created lazily so the pool is started in each gunicorn worker
+        # after the fork rather than in the master.
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="upload"
+                )
+        self._executor.submit(job, *args)
+
+    # -------------------------
+    # JOBS
+    # -------------------------
+    def _upload_media(self, media_id, path, content_type):
+        with self.app.app_context():
+            media = db.session.get(Media, media_id)
+            if media is None:
+                self._discard(path)
+                return
+
+            try:
+                result = self.backend.upload(path, content_type=content_type)
+            except Exception:
+                logger.exception("Upload of media %s failed", media_id)
+                media.status = "failed"
+            else:
+                media.media_url = result["url"]
+                media.public_id = result["public_id"]
+                media.thumbnail_url = result["thumbnail_url"]
+                media.media_type = (
+                    "video" if result["resource_type"] == "video" else "image"
+                )
+                media.status = "ready"
+
+            db.session.commit()
+            invalidate("blogs", f"blog:{media.blog_id}")
+            self._discard(path)
+
+    def _upload_profile_image(self, user_id, path, content_type):
+        with self.app.app_context():
+            user = db.session.get(User, user_id)
+            if user is None:
+                self._discard(path)
+                return
+
+            try:
+                result = self.backend.upload(
+                    path,
+                    content_type=content_type,
+                    folder="profile_images",
+                    resource_type="image"
+                )
+            except Exception:
+                logger.exception("Profile image upload for user %s failed", user_id)
+                user.profile_image_status = "failed"
+            else:
+                user.profile_image_url = result["url"]
+                user.profile_image_public_id = result["public_id"]
+                user.profile_image_status = "ready"
+
+            db.session.commit()
+            # Follower listings embed profile_image_url
+            invalidate("users")
+            self._discard(path)
+
+    def _delete_assets(self, assets):
+        try:
+            self.backend.delete(assets)
+        except Exception:
+            # Orphaned files cost storage, not correctness
+            logger.exception("Deleting %d stored file(s) failed", len(assets))
+
+    def _discard(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# -------------------------
+# SWEEP
+# -------------------------
+def fail_stale_media(older_than):
+    """Mark media still ``pending`` after ``older_than`` as failed; returns
+    how many rows changed.
+
+    A worker that dies mid-upload leaves its rows pending for good. The
+    spooled file only existed on that worker's host, so they cannot be
+    resubmitted; the uploader sees the failure and can retry.
+    """
+    blog_ids = db.session.scalars(
+        update(Media)
+        .where(Media.status == "pending", Media.created_at < datetime.utcnow() - older_than)
+        .values(status="failed")
+        .returning(Media.blog_id)
+    ).all()
+    db.session.commit()
+
+    if blog_ids:
+        invalidate("blogs", *{f"blog:{blog_id}" for blog_id in blog_ids})
+    return len(blog_ids)
+
+
+def create_backend(app):
+    if app.config["UPLOAD_BACKEND"] == "local":
+        return LocalBackend(
+            app.config["UPLOAD_LOCAL_ROOT"],
+            app.config["UPLOAD_LOCAL_BASE_URL"]
+        )
+    return CloudinaryBackend()
@@ -0,0 +1,6 @@
+from app import create_app
+from app.aio import AsgiApp
+
+# Alternative to wsgi.py for an ASGI server, e.g.
+#   uvicorn asgi:app --workers 4
+app = AsgiApp(create_app())
@@ -0,0 +1,274 @@
+"""Compare sync WSGI and ASGI serving under concurrent mixed load.
+
+    python -m bench.concurrency --concurrency 8 32 128 --duration 15
+    python -m bench.concurrency --database-url postgresql://... --reset
+
+Seeds a database like bench.run, then starts each server in turn on the
+same data (gunicorn sync workers for wsgi.py, uvicorn for asgi.py) and
+drives it over HTTP from client threads issuing a weighted mix of reads,
+writes and logins. Only 5xx responses and connection failures count as
+errors; a like that was already there (400) is an expected outcome.
+"""
+import argparse
+import http.client
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from bench.run import build_app, prepare_database, _percentile
+from bench.seed import PASSWORD
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _mix(ctx):
+    """(name, weight, request factory) for the load mix."""
+    return [
+        ("blog.get_all_blogs", 35, lambda rng: ("GET", "/blogs?per_page=20&cursor=", None, None)),
+        ("blog.get_single_blog", 20, lambda rng: ("GET", f"/blogs/{ctx.blog(rng)}", None, None)),
+        ("comment.get_comments", 15, lambda rng: ("GET", f"/blogs/{ctx.blog(rng)}/comments", None, None)),
+        ("follow.get_followers", 10, lambda rng: ("GET", f"/users/{ctx.user(rng)}/followers", None, None)),
+        ("blog.following_feed", 8, lambda rng: ("GET", "/feed?per_page=20", None, ctx.token(rng))),
+        ("blog.search_blogs", 5, lambda rng: ("GET", "/blogs/search?q=lorem", None, None)),
+        ("blog.like_blog", 5, lambda rng: (
+            rng.choice(("POST", "DELETE")), f"/blogs/{ctx.blog(rng)}/like", None, ctx.token(rng)
+        )),
+        ("auth.login", 2, lambda rng: ("POST", "/login", {
+            "email": f"user{ctx.user(rng)}@bench.local", "password": PASSWORD
+        }, None)),
+    ]
+
+
+class LoadContext:
+
+    def __init__(self, app, users, blogs):
+        from flask_jwt_extended import create_access_token
+
+        self.users = users
+        self.blogs = blogs
+        with app.app_context():
+            self.tokens = [create_access_token(identity=str(i)) for i in range(1, users + 1)]
+
+    def user(self, rng):
+        return rng.randint(1, self.users)
+
+    def blog(self, rng):
+        return rng.randint(1, self.blogs)
+
+    def token(self, rng):
+        return rng.choice(self.tokens)
+
+
+# -------------------------
+# SERVERS
+# -------------------------
+def server_command(mode, port, workers, threads):
+    if mode == "wsgi":
+        return [
+            sys.executable, "-m", "gunicorn", "wsgi:app",
+            "--bind", f"127.0.0.1:{port}",
+            "--workers", str(workers),
+            "--threads", str(threads),
+            "--log-level", "warning"
+        ]
+    return [
+        sys.executable, "-m", "uvicorn", "asgi:app",
+        "--port", str(port),
+        "--workers", str(workers),
+        "--log-level", "warning"
+    ]
+
+
+def start_server(mode, port, workers, threads):
+    process = subprocess.Popen(server_command(mode, port, workers, threads), cwd=ROOT)
+
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            return process
+        except OSError:
+            time.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"{mode} server did not start on port {port}")
+
+
+# -------------------------
+# LOAD
+# -------------------------
+def _client(port, mix, weights, seed, stop_at, samples):
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+
+    while time.monotonic() < stop_at:
+        name, _, make = rng.choices(mix, weights)[0]
+        method, path, body, token = make(rng)
+        headers = {"Content-Type": "application/json"}
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+
+        start = time.perf_counter()
+        try:
+            conn.request(method, path, body=json.dumps(body) if body else None, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            status = 599
+        samples.append((name, time.perf_counter() - start, status))
+
+    conn.close()
+
+
+def _summary(latencies, errors, duration):
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / duration, 1),
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3)
+    }
+
+
+def run_load(port, ctx, concurrency, duration, seed):
+    mix = _mix(ctx)
+    weights = [weight for _, weight, _ in mix]
+    samples = []
+    stop_at = time.monotonic() + duration
+
+    clients = [
+        threading.Thread(
+            target=_client,
+            args=(port, mix, weights, seed + i, stop_at, samples)
+        )
+        for i in range(concurrency)
+    ]
+    for client in clients:
+        client.start()
+    for client in clients:
+        client.join()
+
+    by_name = {}
+    for name, latency, status in samples:
+        by_name.setdefault(name, []).append((latency, status))
+
+    return {
+        **_summary(
+            [latency for _, latency, _ in samples],
+            sum(1 for _, _, status in samples if status >= 500),
+            duration
+        ),
+        "endpoints": {
+            name: _summary(
+                [latency for latency, _ in rows],
+                sum(1 for _, status in rows if status >= 500),
+                duration
+            )
+            for name, rows in sorted(by_name.items())
+        }
+    }
+
+
+def run(args):
+    database_url = args.database_url
+    if database_url is None:
+        fd, path = tempfile.mkstemp(prefix="blig_bench_", suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+    elif not database_url.startswith("sqlite") and not args.reset:
+        sys.exit("Refusing to drop and reseed a non-SQLite database without --reset")
+
+    # Servers inherit this environment, including the bench defaults
+    os.environ["UPLOAD_WORKERS"] = "4"
+    app = build_app(database_url)
+    prepare_database(app, args)
+    ctx = LoadContext(app, args.users, args.blogs)
+
+    results = {}
+    for mode in args.modes:
+        process = start_server(mode, args.port, args.workers, args.threads)
+        try:
+            results[mode] = {}
+            for concurrency in args.concurrency:
+                report = run_load(args.port, ctx, concurrency, args.duration, args.seed)
+                results[mode][str(concurrency)] = report
+                print(
+                    f"{mode:5} c={concurrency:<4} {report['throughput_rps']:8.1f} req/s  "
+                    f"p50 {report['p50_ms']:9.3f}ms  p99 {report['p99_ms']:9.3f}ms  "
+                    f"errors {report['errors']}",
+                    file=sys.stderr
+                )
+        finally:
+            process.terminate()
+            process.wait()
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "database": database_url.split(":", 1)[0],
+            "workers": args.workers,
+            "threads": args.threads,
+            "duration_s": args.duration,
+            "volumes": {
+                "users": args.users,
+                "blogs": args.blogs,
+                "likes": args.likes,
+                "comments": args.comments,
+                "follows": args.follows
+            },
+            "seed": args.seed
+        },
+        "modes": results
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--reset", action="store_true",
+                        help="allow dropping and reseeding a non-SQLite database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--blogs", type=int, default=2000)
+    parser.add_argument("--likes", type=int, default=10000)
+    parser.add_argument("--comments", type=int, default=10000)
+    parser.add_argument("--follows", type=int, default=5000)
+    parser.add_argument("--body-words", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--modes", nargs="*", default=["wsgi", "asgi"], choices=["wsgi", "asgi"])
+    parser.add_argument("--workers", type=int, default=2,
+                        help="server worker processes in both modes")
+    parser.add_argument("--threads", type=int, default=4,
+                        help="gunicorn threads per worker in wsgi mode")
+    parser.add_argument("--concurrency", type=int, nargs="*", default=[8, 32, 128],
+                        help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=15, help="seconds per level")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
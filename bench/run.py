@@ -0,0 +1,259 @@
+"""Seed a database and benchmark every API route in-process.
+
+    python -m bench.run --users 500 --blogs 5000 --output baseline.json
+    python -m bench.run --baseline baseline.json --only blog.get_all_blogs
+    python -m bench.run --database-url postgresql://... --reset \
+        --blogs 1000000 --only blog.search_blogs
+
+Without --database-url a throwaway SQLite file is used as a stand-in for
+Postgres. Requests go through the Flask test client, so the numbers measure
+application and database time without any network or WSGI server overhead.
+With --baseline, the CPU time saved per response is printed per endpoint.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+
+def _percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def build_app(database_url):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("JWT_SECRET_KEY", "bench-secret-key-that-is-long-enough-for-hs256")
+    os.environ.setdefault("UPLOAD_BACKEND", "local")
+    os.environ.setdefault("UPLOAD_WORKERS", "0")
+    # Measure the database path; set CACHE_BACKEND=lru to benchmark cache hits
+    os.environ.setdefault("CACHE_BACKEND", "none")
+    os.environ.setdefault("UPLOAD_LOCAL_ROOT", tempfile.mkdtemp(prefix="blig_bench_media_"))
+
+    from app import create_app
+
+    return create_app()
+
+
+def prepare_database(app, args):
+    from app.extensions import db
+    from bench.seed import seed
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(
+            users=args.users,
+            blogs=args.blogs,
+            likes=args.likes,
+            comments=args.comments,
+            follows=args.follows,
+            body_words=args.body_words,
+            seed=args.seed
+        )
+
+
+def run_scenario(ctx, engine, fn, iterations):
+    from app.query_counter import QueryCounter
+
+    latencies = []
+    cpu_times = []
+    queries = []
+    errors = 0
+
+    started = time.perf_counter()
+    for i in range(iterations):
+        request = fn(ctx, i)
+
+        with QueryCounter(engine) as counter:
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            response = request()
+            cpu_times.append(time.process_time() - cpu_start)
+            latencies.append(time.perf_counter() - start)
+
+        queries.append(counter.count)
+        if response.status_code >= 400:
+            errors += 1
+    wall = time.perf_counter() - started
+
+    return {
+        "iterations": iterations,
+        "errors": errors,
+        "p50_ms": round(_percentile(latencies, 0.50) * 1000, 3),
+        "p99_ms": round(_percentile(latencies, 0.99) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3),
+        "throughput_rps": round(iterations / sum(latencies), 1),
+        # Process CPU per response: the application's own work, excluding
+        # time spent waiting on the database server
+        "cpu_ms": round(statistics.fmean(cpu_times) * 1000, 3),
+        "wall_s": round(wall, 3),
+        "queries_per_request": {
+            "median": statistics.median(queries),
+            "max": max(queries)
+        }
+    }
+
+
+def run(args):
+    database_url = args.database_url
+    if database_url is None:
+        fd, path = tempfile.mkstemp(prefix="blig_bench_", suffix=".db")
+        os.close(fd)
+        database_url = f"sqlite:///{path}"
+    elif not database_url.startswith("sqlite") and not args.reset:
+        sys.exit("Refusing to drop and reseed a non-SQLite database without --reset")
+
+    app = build_app(database_url)
+    prepare_database(app, args)
+
+    from app.extensions import db
+    from bench.scenarios import SCENARIOS, BenchContext
+
+    with app.app_context():
+        engine = db.engine
+
+    ctx = BenchContext(app, app.test_client(), users=args.users, blogs=args.blogs)
+
+    results = {}
+    for name, (fn, heavy) in SCENARIOS.items():
+        if args.only and name not in args.only:
+            continue
+        iterations = args.heavy_iterations if heavy else args.iterations
+        results[name] = run_scenario(ctx, engine, fn, iterations)
+        print(
+            f"{name:34} p50 {results[name]['p50_ms']:9.3f}ms  "
+            f"p99 {results[name]['p99_ms']:9.3f}ms  "
+            f"cpu {results[name]['cpu_ms']:8.3f}ms  "
+            f"q/req {results[name]['queries_per_request']['max']:3}",
+            file=sys.stderr
+        )
+
+    return {
+        "meta": {
+            "created_at": datetime.utcnow().isoformat(),
+            "database": database_url.split(":", 1)[0],
+            "python": platform.python_version(),
+            "volumes": {
+                "users": args.users,
+                "blogs": args.blogs,
+                "likes": args.likes,
+                "comments": args.comments,
+                "follows": args.follows
+            },
+            "iterations": args.iterations,
+            "heavy_iterations": args.heavy_iterations,
+            "seed": args.seed
+        },
+        "endpoints": results
+    }
+
+
+# -------------------------
+# REGRESSION COMPARISON
+# -------------------------
+def compare(report, baseline, tolerance, min_delta_ms):
+    """Return a list of regressions of ``report`` against ``baseline``.
+
+    A latency regression must exceed both the relative ``tolerance`` and
+    ``min_delta_ms`` so that sub-millisecond noise is ignored. Any increase
+    in queries per request is a regression.
+    """
+    regressions = []
+
+    for name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        if previous is None:
+            continue
+
+        for metric in ("p50_ms", "p99_ms"):
+            delta = current[metric] - previous[metric]
+            if delta > min_delta_ms and current[metric] > previous[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name}: {metric} {previous[metric]} -> {current[metric]}"
+                )
+
+        if current["queries_per_request"]["max"] > previous["queries_per_request"]["max"]:
+            regressions.append(
+                f"{name}: queries/request {previous['queries_per_request']['max']}"
+                f" -> {current['queries_per_request']['max']}"
+            )
+
+    return regressions
+
+
+def cpu_savings(report, baseline):
+    """Per-endpoint CPU per response against ``baseline``, as report lines."""
+    lines = []
+
+    for name, current in report["endpoints"].items():
+        previous = baseline["endpoints"].get(name)
+        # Reports written before cpu_ms was recorded have nothing to compare
+        if previous is None or "cpu_ms" not in previous:
+            continue
+
+        saved = previous["cpu_ms"] - current["cpu_ms"]
+        share = saved / previous["cpu_ms"] if previous["cpu_ms"] else 0.0
+        lines.append(
+            f"{name:34} cpu/response {previous['cpu_ms']:8.3f}ms -> "
+            f"{current['cpu_ms']:8.3f}ms  saved {saved:+8.3f}ms ({share:+.0%})"
+        )
+
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", help="defaults to a temporary SQLite file")
+    parser.add_argument("--reset", action="store_true",
+                        help="allow dropping and reseeding a non-SQLite database")
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--blogs", type=int, default=2000)
+    parser.add_argument("--likes", type=int, default=10000)
+    parser.add_argument("--comments", type=int, default=10000)
+    parser.add_argument("--follows", type=int, default=5000)
+    parser.add_argument("--body-words", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--heavy-iterations", type=int, default=5,
+                        help="iterations for bcrypt-bound routes")
+    parser.add_argument("--only", nargs="*", help="scenario names to run")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    parser.add_argument("--baseline", help="JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative latency increase (default 0.25)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.5)
+    args = parser.parse_args(argv)
+
+    report = run(args)
+
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    if args.baseline:
+        with open(args.baseline) as fh:
+            baseline = json.load(fh)
+
+        for line in cpu_savings(report, baseline):
+            print(line, file=sys.stderr)
+
+        regressions = compare(report, baseline, args.tolerance, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
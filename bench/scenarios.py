@@ -0,0 +1,344 @@
+import io
+import itertools
+from flask_jwt_extended import create_access_token, create_refresh_token
+from app.models import Blog, User
+from bench.seed import PASSWORD
+
+SCENARIOS = {}
+
+
+def scenario(name, heavy=False):
+    """Register a benchmark for one route.
+
+    The decorated function does any untimed setup for iteration ``i`` and
+    returns a zero-argument callable that issues the measured request.
+    ``heavy`` scenarios (bcrypt-bound) run ``--heavy-iterations`` times.
+    """
+    def register(fn):
+        SCENARIOS[name] = (fn, heavy)
+        return fn
+    return register
+
+
+class BenchContext:
+
+    def __init__(self, app, client, users, blogs):
+        self.app = app
+        self.client = client
+        self.users = users
+        self.blogs = blogs
+        self._tokens = {}
+        self._counter = itertools.count()
+
+    def unique(self):
+        return next(self._counter)
+
+    def user_id(self, i):
+        return i % self.users + 1
+
+    def blog_id(self, i):
+        return (i * 7919) % self.blogs + 1
+
+    def auth(self, user_id, refresh=False):
+        key = (user_id, refresh)
+        if key not in self._tokens:
+            with self.app.app_context():
+                make = create_refresh_token if refresh else create_access_token
+                self._tokens[key] = make(identity=str(user_id))
+        return {"Authorization": f"Bearer {self._tokens[key]}"}
+
+    def fresh_auth(self, user_id, refresh=False):
+        with self.app.app_context():
+            make = create_refresh_token if refresh else create_access_token
+            return {"Authorization": f"Bearer {make(identity=str(user_id))}"}
+
+    def author_of(self, blog_id):
+        with self.app.app_context():
+            return Blog.query.filter_by(id=blog_id).with_entities(Blog.author_id).scalar()
+
+    def new_blog(self, user_id):
+        response = self.client.post(
+            "/blogs",
+            json={"title": "bench", "body_text": "bench body"},
+            headers=self.auth(user_id)
+        )
+        return response.get_json()["blog_id"]
+
+
+# -------------------------
+# AUTH
+# -------------------------
+@scenario("auth.register", heavy=True)
+def register(ctx, i):
+    n = ctx.unique()
+    body = {"username": f"bench{n}", "email": f"bench{n}@bench.local", "password": PASSWORD}
+    return lambda: ctx.client.post("/register", json=body)
+
+
+@scenario("auth.login", heavy=True)
+def login(ctx, i):
+    body = {"email": f"user{ctx.user_id(i)}@bench.local", "password": PASSWORD}
+    return lambda: ctx.client.post("/login", json=body)
+
+
+@scenario("auth.get_current_user")
+def get_current_user(ctx, i):
+    headers = ctx.auth(ctx.user_id(i))
+    return lambda: ctx.client.get("/me", headers=headers)
+
+
+@scenario("auth.upload_profile_image")
+def upload_profile_image(ctx, i):
+    headers = ctx.auth(ctx.user_id(i))
+    return lambda: ctx.client.post(
+        "/profile/image",
+        headers=headers,
+        data={"file": (io.BytesIO(b"\x89PNG bench"), "bench.png", "image/png")}
+    )
+
+
+@scenario("auth.refresh")
+def refresh(ctx, i):
+    headers = ctx.auth(ctx.user_id(i), refresh=True)
+    return lambda: ctx.client.post("/refresh", headers=headers)
+
+
+@scenario("auth.logout")
+def logout(ctx, i):
+    headers = ctx.fresh_auth(ctx.user_id(i))
+    return lambda: ctx.client.post("/logout", headers=headers)
+
+
+@scenario("auth.logout_refresh")
+def logout_refresh(ctx, i):
+    headers = ctx.fresh_auth(ctx.user_id(i), refresh=True)
+    return lambda: ctx.client.post("/logout/refresh", headers=headers)
+
+
+@scenario("auth.delete_current_user", heavy=True)
+def delete_current_user(ctx, i):
+    # A fresh account with a few blogs, a like and a follow to remove
+    n = ctx.unique()
+    ctx.client.post("/register", json={
+        "username": f"gone{n}", "email": f"gone{n}@bench.local", "password": PASSWORD
+    })
+    with ctx.app.app_context():
+        user_id = User.query.filter_by(username=f"gone{n}").with_entities(User.id).scalar()
+    headers = ctx.fresh_auth(user_id)
+    for _ in range(3):
+        ctx.new_blog(user_id)
+    ctx.client.post(f"/blogs/{ctx.blog_id(i)}/like", headers=headers)
+    ctx.client.post(f"/users/{ctx.user_id(i)}/follow", headers=headers)
+    return lambda: ctx.client.delete("/me", headers=headers)
+
+
+# -------------------------
+# BLOGS
+# -------------------------
+@scenario("blog.create_blog")
+def create_blog(ctx, i):
+    headers = ctx.auth(ctx.user_id(i))
+    body = {"title": f"bench {i}", "body_text": "bench body " * 50}
+    return lambda: ctx.client.post("/blogs", json=body, headers=headers)
+
+
+@scenario("blog.get_all_blogs")
+def get_all_blogs(ctx, i):
+    page = i % 20 + 1
+    return lambda: ctx.client.get(f"/blogs?page={page}&per_page=20")
+
+
+@scenario("blog.get_all_blogs[cursor]")
+def get_all_blogs_cursor(ctx, i):
+    if i % 20 == 0:
+        ctx.blog_cursor = ""
+    cursor = ctx.blog_cursor
+
+    def run():
+        response = ctx.client.get(f"/blogs?per_page=20&cursor={cursor}")
+        ctx.blog_cursor = response.get_json().get("next_cursor") or ""
+        return response
+    return run
+
+
+@scenario("blog.get_all_blogs[summary]")
+def get_all_blogs_summary(ctx, i):
+    page = i % 20 + 1
+    return lambda: ctx.client.get(f"/blogs?page={page}&per_page=20&view=summary")
+
+
+@scenario("blog.trending_blogs")
+def trending_blogs(ctx, i):
+    window = ("24h", "7d")[i % 2]
+    return lambda: ctx.client.get(f"/blogs/trending?window={window}&per_page=20")
+
+
+@scenario("blog.get_single_blog")
+def get_single_blog(ctx, i):
+    blog_id = ctx.blog_id(i)
+    return lambda: ctx.client.get(f"/blogs/{blog_id}")
+
+
+@scenario("blog.search_blogs")
+def search_blogs(ctx, i):
+    # Single terms, prefixes and multi-term queries over the seeded vocabulary
+    queries = ("lorem", "dolo", "magna aliqua", "exercitation ull", "tempor in")
+    q = queries[i % len(queries)]
+    return lambda: ctx.client.get(f"/blogs/search?q={q}&per_page=20")
+
+
+@scenario("blog.update_blog")
+def update_blog(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.author_of(blog_id))
+    body = {"title": f"updated {i}"}
+    return lambda: ctx.client.put(f"/blogs/{blog_id}", json=body, headers=headers)
+
+
+@scenario("blog.delete_blog")
+def delete_blog(ctx, i):
+    user_id = ctx.user_id(i)
+    blog_id = ctx.new_blog(user_id)
+    headers = ctx.auth(user_id)
+    return lambda: ctx.client.delete(f"/blogs/{blog_id}", headers=headers)
+
+
+@scenario("blog.like_blog")
+def like_blog(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.user_id(i))
+    ctx.client.delete(f"/blogs/{blog_id}/like", headers=headers)
+    return lambda: ctx.client.post(f"/blogs/{blog_id}/like", headers=headers)
+
+
+@scenario("blog.unlike_blog")
+def unlike_blog(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.user_id(i))
+    ctx.client.post(f"/blogs/{blog_id}/like", headers=headers)
+    return lambda: ctx.client.delete(f"/blogs/{blog_id}/like", headers=headers)
+
+
+@scenario("blog.upload_media")
+def upload_media(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.author_of(blog_id))
+    return lambda: ctx.client.post(
+        f"/blogs/{blog_id}/media",
+        headers=headers,
+        data={"file": (io.BytesIO(b"\x89PNG bench"), "bench.png", "image/png")}
+    )
+
+
+@scenario("blog.get_media")
+def get_media(ctx, i):
+    if not hasattr(ctx, "media_id"):
+        blog_id = ctx.blog_id(0)
+        response = ctx.client.post(
+            f"/blogs/{blog_id}/media",
+            headers=ctx.auth(ctx.author_of(blog_id)),
+            data={"file": (io.BytesIO(b"\x89PNG bench"), "bench.png", "image/png")}
+        )
+        ctx.media_id = response.get_json()["media_id"]
+    return lambda: ctx.client.get(f"/media/{ctx.media_id}")
+
+
+@scenario("blog.following_feed")
+def following_feed(ctx, i):
+    headers = ctx.auth(ctx.user_id(i))
+    return lambda: ctx.client.get("/feed?per_page=20", headers=headers)
+
+
+# -------------------------
+# COMMENTS
+# -------------------------
+@scenario("comment.create_comment")
+def create_comment(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.user_id(i))
+    return lambda: ctx.client.post(
+        f"/blogs/{blog_id}/comments",
+        json={"content": f"bench comment {i}"},
+        headers=headers
+    )
+
+
+@scenario("comment.get_comments")
+def get_comments(ctx, i):
+    if not hasattr(ctx, "busiest_blog_id"):
+        with ctx.app.app_context():
+            ctx.busiest_blog_id = Blog.query.order_by(
+                Blog.comments_count.desc()
+            ).with_entities(Blog.id).limit(1).scalar()
+
+    # Alternate between a typical post and the most commented one
+    blog_id = ctx.busiest_blog_id if i % 2 else ctx.blog_id(i)
+    return lambda: ctx.client.get(f"/blogs/{blog_id}/comments")
+
+
+@scenario("comment.delete_comment")
+def delete_comment(ctx, i):
+    blog_id = ctx.blog_id(i)
+    headers = ctx.auth(ctx.user_id(i))
+    comment_id = ctx.client.post(
+        f"/blogs/{blog_id}/comments",
+        json={"content": "to delete"},
+        headers=headers
+    ).get_json()["comment_id"]
+    return lambda: ctx.client.delete(f"/comments/{comment_id}", headers=headers)
+
+
+# -------------------------
+# FOLLOWS
+# -------------------------
+def _follow_pair(ctx, i):
+    follower_id = ctx.user_id(i)
+    following_id = ctx.user_id(i * 31 + 1)
+    if following_id == follower_id:
+        following_id = ctx.user_id(follower_id)
+    return follower_id, following_id
+
+
+@scenario("follow.follow_user")
+def follow_user(ctx, i):
+    follower_id, following_id = _follow_pair(ctx, i)
+    headers = ctx.auth(follower_id)
+    ctx.client.delete(f"/users/{following_id}/follow", headers=headers)
+    return lambda: ctx.client.post(f"/users/{following_id}/follow", headers=headers)
+
+
+@scenario("follow.unfollow_user")
+def unfollow_user(ctx, i):
+    follower_id, following_id = _follow_pair(ctx, i)
+    headers = ctx.auth(follower_id)
+    ctx.client.post(f"/users/{following_id}/follow", headers=headers)
+    return lambda: ctx.client.delete(f"/users/{following_id}/follow", headers=headers)
+
+
+@scenario("follow.get_followers")
+def get_followers(ctx, i):
+    user_id = ctx.user_id(i)
+    return lambda: ctx.client.get(f"/users/{user_id}/followers")
+
+
+@scenario("follow.get_following")
+def get_following(ctx, i):
+    user_id = ctx.user_id(i)
+    return lambda: ctx.client.get(f"/users/{user_id}/following")
+
+
+# -------------------------
+# BATCH
+# -------------------------
+@scenario("batch.batch")
+def batch(ctx, i):
+    # One blog screen: the post, its comments and its author's followers
+    blog_id = ctx.blog_id(i)
+    author_id = ctx.author_of(blog_id)
+    headers = ctx.auth(ctx.user_id(i))
+    body = {"requests": [
+        {"path": f"/blogs/{blog_id}"},
+        {"path": f"/blogs/{blog_id}/comments"},
+        {"path": f"/users/{author_id}/followers"}
+    ]}
+    return lambda: ctx.client.post("/batch", json=body, headers=headers)
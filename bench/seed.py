@@ -0,0 +1,106 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from app.extensions import db
+from app.models import User, Blog, Like, Comment, Follow
+from app.models.blog import make_excerpt
+from app.counters import reconcile_counters
+from app.passwords import password_hasher
+from app.timeline import rebuild_timelines
+from app.trending import refresh_trending
+
+PASSWORD = "bench-password"
+CHUNK = 5000
+
+WORDS = (
+    "lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod "
+    "tempor incididunt ut labore et dolore magna aliqua enim ad minim veniam "
+    "quis nostrud exercitation ullamco laboris nisi aliquip ex ea commodo"
+).split()
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+
+
+def _text(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _pairs(rng, count, left, right, allow_equal=True):
+    count = min(count, left * right - (0 if allow_equal else min(left, right)))
+    pairs = set()
+    while len(pairs) < count:
+        pair = (rng.randint(1, left), rng.randint(1, right))
+        if allow_equal or pair[0] != pair[1]:
+            pairs.add(pair)
+    return sorted(pairs)
+
+
+def seed(users, blogs, likes, comments, follows, body_words=200, seed=42):
+    """Fill an empty database with random but reproducible data.
+
+    Ids are assigned by the database, so on fresh tables users and blogs
+    are numbered 1..N in insertion order, which the scenarios rely on.
+
+    Every user shares one bcrypt hash of PASSWORD so seeding does not pay
+    the hashing cost per user. It is made at BCRYPT_ROUNDS so logins do
+    not trigger a rehash. Counters, timelines and trending scores are
+    rebuilt at the end exactly as the reconcile/rebuild/refresh commands
+    would.
+    """
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    password_hash = password_hasher().hash(PASSWORD)
+
+    def stamp():
+        return now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600))
+
+    _insert(User, [
+        {
+            "username": f"user{i}",
+            "email": f"user{i}@bench.local",
+            "password_hash": password_hash,
+            "created_at": now - timedelta(days=400)
+        } for i in range(1, users + 1)
+    ])
+
+    blog_rows = []
+    for i in range(1, blogs + 1):
+        created_at = stamp()
+        blog_rows.append({
+            "author_id": rng.randint(1, users),
+            "title": _text(rng, 6),
+            "body_text": (body_text := _text(rng, body_words)),
+            "excerpt": make_excerpt(body_text),
+            "is_published": True,
+            "created_at": created_at,
+            "updated_at": created_at
+        })
+    _insert(Blog, blog_rows)
+
+    _insert(Like, [
+        {"user_id": user_id, "blog_id": blog_id, "created_at": stamp()}
+        for user_id, blog_id in _pairs(rng, likes, users, blogs)
+    ])
+
+    _insert(Comment, [
+        {
+            "blog_id": rng.randint(1, blogs),
+            "author_id": rng.randint(1, users),
+            "content": _text(rng, 20),
+            "created_at": (created_at := stamp()),
+            "updated_at": created_at
+        } for _ in range(comments)
+    ])
+
+    _insert(Follow, [
+        {"follower_id": follower_id, "following_id": following_id, "created_at": stamp()}
+        for follower_id, following_id in _pairs(rng, follows, users, users, allow_equal=False)
+    ])
+
+    db.session.commit()
+    reconcile_counters()
+    rebuild_timelines()
+    refresh_trending()
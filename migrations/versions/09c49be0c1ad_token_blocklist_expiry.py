@@ -0,0 +1,41 @@
+"""store token expiry on token_blocklist and make jti unique
+
+Revision ID: 09c49be0c1ad
+Revises: d4e3727f768d
+Create Date: 2026-10-18 13:02:16.775530
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '09c49be0c1ad'
+down_revision = 'd4e3727f768d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows written before this migration have no expiry; the purge job
+    # treats them as expired once the longest token lifetime has passed.
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('expires_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_token_blocklist_expires_at'), ['expires_at'], unique=False)
+
+    op.execute(
+        "DELETE FROM token_blocklist WHERE id NOT IN "
+        "(SELECT min_id FROM (SELECT MIN(id) AS min_id FROM token_blocklist GROUP BY jti) AS keep)"
+    )
+
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_jti'))
+        batch_op.create_index(batch_op.f('ix_token_blocklist_jti'), ['jti'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('token_blocklist', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_jti'))
+        batch_op.create_index(batch_op.f('ix_token_blocklist_jti'), ['jti'], unique=False)
+        batch_op.drop_index(batch_op.f('ix_token_blocklist_expires_at'))
+        batch_op.drop_column('expires_at')
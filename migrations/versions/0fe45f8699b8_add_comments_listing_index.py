@@ -0,0 +1,37 @@
+"""add (blog_id, created_at, id) index on comments
+
+Revision ID: 0fe45f8699b8
+Revises: 66b9c6cebb3d
+Create Date: 2026-10-18 15:37:12.604481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0fe45f8699b8'
+down_revision = '66b9c6cebb3d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # A plain CREATE INDEX would hold off new comments until it finished
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_comments_blog_id_created_at_id', 'comments', ['blog_id', 'created_at', 'id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_comments_blog_id_created_at_id',
+            table_name='comments',
+            if_exists=True,
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,46 @@
+"""add follows indexes for follower/following listings
+
+Revision ID: 3efea4ea7f3c
+Revises: 09c49be0c1ad
+Create Date: 2026-10-18 13:41:08.216954
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3efea4ea7f3c'
+down_revision = '09c49be0c1ad'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_follows_following_id_created_at', ['following_id', 'created_at', 'id']),
+    ('ix_follows_follower_id_created_at', ['follower_id', 'created_at', 'id']),
+]
+
+
+def upgrade():
+    # Follows keep being written while the indexes build. Each one commits
+    # by itself, so an interrupted run can simply be repeated.
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(
+                name, 'follows', columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name='follows',
+                if_exists=True,
+                postgresql_concurrently=True
+            )
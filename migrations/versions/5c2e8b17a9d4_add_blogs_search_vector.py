@@ -0,0 +1,45 @@
+"""add generated search_vector column and GIN index on blogs
+
+Revision ID: 5c2e8b17a9d4
+Revises: 0fe45f8699b8
+Create Date: 2026-10-18 16:02:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c2e8b17a9d4'
+down_revision = '0fe45f8699b8'
+branch_labels = None
+depends_on = None
+
+
+# Title is weighted A and body B, matching the ranking in app/search.py.
+# Other databases search through the in-process index instead.
+def upgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute(
+        "ALTER TABLE blogs ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(body_text, '')), 'B')"
+        ") STORED"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_blogs_search_vector "
+            "ON blogs USING GIN (search_vector)"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute("DROP INDEX IF EXISTS ix_blogs_search_vector")
+    op.execute("ALTER TABLE blogs DROP COLUMN IF EXISTS search_vector")
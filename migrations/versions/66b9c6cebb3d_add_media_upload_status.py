@@ -0,0 +1,42 @@
+"""track upload status for media and profile images
+
+Revision ID: 66b9c6cebb3d
+Revises: 3efea4ea7f3c
+Create Date: 2026-10-18 14:25:39.051872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '66b9c6cebb3d'
+down_revision = '3efea4ea7f3c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('public_id', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('status', sa.String(length=20), server_default='ready', nullable=False))
+        batch_op.alter_column('media_url',
+               existing_type=sa.String(length=500),
+               nullable=True)
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_image_status', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('profile_image_status')
+
+    op.execute("DELETE FROM media WHERE media_url IS NULL")
+
+    with op.batch_alter_table('media', schema=None) as batch_op:
+        batch_op.alter_column('media_url',
+               existing_type=sa.String(length=500),
+               nullable=False)
+        batch_op.drop_column('status')
+        batch_op.drop_column('public_id')
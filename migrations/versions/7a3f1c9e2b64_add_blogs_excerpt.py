@@ -0,0 +1,61 @@
+"""add stored excerpt column on blogs
+
+Revision ID: 7a3f1c9e2b64
+Revises: 5c2e8b17a9d4
+Create Date: 2026-10-18 17:20:05.512934
+
+"""
+import re
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a3f1c9e2b64'
+down_revision = '5c2e8b17a9d4'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+EXCERPT_LENGTH = 280
+
+
+# Frozen copy of app.models.blog.make_excerpt at this revision
+def make_excerpt(body_text):
+    text = re.sub(r"\s+", " ", body_text or "").strip()
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+
+    cut = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0] or text[:EXCERPT_LENGTH]
+    return cut.rstrip(" .,;:") + "…"
+
+
+def upgrade():
+    with op.batch_alter_table('blogs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column(
+            'excerpt', sa.String(length=EXCERPT_LENGTH + 1), server_default='', nullable=False
+        ))
+
+    # Backfill in id order, one batch of bodies in memory at a time
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.text(
+                "SELECT id, body_text FROM blogs WHERE id > :last_id ORDER BY id LIMIT :limit"
+            ),
+            {"last_id": last_id, "limit": BATCH_SIZE}
+        ).fetchall()
+        if not rows:
+            break
+
+        bind.execute(
+            sa.text("UPDATE blogs SET excerpt = :excerpt WHERE id = :id"),
+            [{"id": row.id, "excerpt": make_excerpt(row.body_text)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+
+def downgrade():
+    with op.batch_alter_table('blogs', schema=None) as batch_op:
+        batch_op.drop_column('excerpt')
@@ -0,0 +1,38 @@
+"""add (created_at, id) index on blogs for keyset pagination
+
+Revision ID: a397530148c6
+Revises: b1433b7cf4bc
+Create Date: 2026-10-18 11:04:27.902114
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a397530148c6'
+down_revision = 'b1433b7cf4bc'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Built CONCURRENTLY so that writes to blogs are not blocked meanwhile;
+    # that cannot happen inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_blogs_created_at_id', 'blogs', ['created_at', 'id'],
+            unique=False,
+            if_not_exists=True,
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_blogs_created_at_id',
+            table_name='blogs',
+            if_exists=True,
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,48 @@
+"""add denormalized like/comment/follow counters
+
+Revision ID: b1433b7cf4bc
+Revises: 9da6aab2761e
+Create Date: 2026-10-18 10:12:41.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1433b7cf4bc'
+down_revision = '9da6aab2761e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('blogs', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('likes_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comments_count', sa.Integer(), server_default='0', nullable=False))
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('followers_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('following_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the child tables
+    op.execute(
+        "UPDATE blogs SET "
+        "likes_count = (SELECT count(*) FROM likes WHERE likes.blog_id = blogs.id), "
+        "comments_count = (SELECT count(*) FROM comments WHERE comments.blog_id = blogs.id)"
+    )
+    op.execute(
+        "UPDATE users SET "
+        "followers_count = (SELECT count(*) FROM follows WHERE follows.following_id = users.id), "
+        "following_count = (SELECT count(*) FROM follows WHERE follows.follower_id = users.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('following_count')
+        batch_op.drop_column('followers_count')
+
+    with op.batch_alter_table('blogs', schema=None) as batch_op:
+        batch_op.drop_column('comments_count')
+        batch_op.drop_column('likes_count')
@@ -0,0 +1,53 @@
+"""add foreign key and hot-path indexes
+
+Revision ID: c6f04a9d2e18
+Revises: e81d0b5c3f27
+Create Date: 2026-10-18 18:51:09.774305
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6f04a9d2e18'
+down_revision = 'e81d0b5c3f27'
+branch_labels = None
+depends_on = None
+
+# comments.blog_id and follows.following_id are already the leading
+# columns of their listing indexes. The rest back relationship loads, the
+# /feed pull for large accounts, and ON DELETE CASCADE lookups.
+INDEXES = [
+    ('ix_blogs_author_id_created_at', 'blogs', ['author_id', 'created_at', 'id']),
+    ('ix_comments_author_id', 'comments', ['author_id']),
+    ('ix_likes_blog_id', 'likes', ['blog_id']),
+    ('ix_media_blog_id_position', 'media', ['blog_id', 'position']),
+    ('ix_media_uploader_id', 'media', ['uploader_id']),
+    ('ix_timeline_entries_blog_id', 'timeline_entries', ['blog_id']),
+]
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction. Each index commits on
+    # its own, so a rerun after an interruption skips the finished ones
+    # (an index left INVALID by a failed build must be dropped first).
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
@@ -0,0 +1,56 @@
+"""add materialized home timelines
+
+Revision ID: d4e3727f768d
+Revises: a397530148c6
+Create Date: 2026-10-18 12:20:53.447019
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e3727f768d'
+down_revision = 'a397530148c6'
+branch_labels = None
+depends_on = None
+
+# Keep in sync with the TIMELINE_MAX_LENGTH default in create_app
+TIMELINE_MAX_LENGTH = 500
+
+
+def upgrade():
+    op.create_table('timeline_entries',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('user_id', sa.BigInteger(), nullable=False),
+    sa.Column('blog_id', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['blog_id'], ['blogs.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'blog_id', name='uq_timeline_user_blog')
+    )
+    with op.batch_alter_table('timeline_entries', schema=None) as batch_op:
+        batch_op.create_index('ix_timeline_user_created_at', ['user_id', 'created_at', 'blog_id'], unique=False)
+
+    # Seed every follower's timeline with the newest posts of the accounts
+    # they already follow.
+    op.execute(
+        "INSERT INTO timeline_entries (user_id, blog_id, created_at) "
+        "SELECT user_id, blog_id, created_at FROM ("
+        "  SELECT follows.follower_id AS user_id, blogs.id AS blog_id, blogs.created_at,"
+        "         row_number() OVER ("
+        "           PARTITION BY follows.follower_id"
+        "           ORDER BY blogs.created_at DESC, blogs.id DESC"
+        "         ) AS rank"
+        "  FROM follows JOIN blogs ON blogs.author_id = follows.following_id"
+        ") AS ranked "
+        f"WHERE rank <= {TIMELINE_MAX_LENGTH}"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('timeline_entries', schema=None) as batch_op:
+        batch_op.drop_index('ix_timeline_user_created_at')
+
+    op.drop_table('timeline_entries')
@@ -0,0 +1,26 @@
+"""add deleted_at to users for background account deletion
+
+Revision ID: e81d0b5c3f27
+Revises: 7a3f1c9e2b64
+Create Date: 2026-10-18 18:04:37.190226
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e81d0b5c3f27'
+down_revision = '7a3f1c9e2b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('deleted_at')
@@ -0,0 +1,71 @@
+"""add trending scores
+
+Revision ID: f2b8d41c7a93
+Revises: c6f04a9d2e18
+Create Date: 2026-10-18 19:42:16.208531
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2b8d41c7a93'
+down_revision = 'c6f04a9d2e18'
+branch_labels = None
+depends_on = None
+
+# Let `flask refresh-trending` read the last week of activity as a range
+INDEXES = [
+    ('ix_likes_created_at', 'likes', ['created_at']),
+    ('ix_comments_created_at', 'comments', ['created_at']),
+]
+
+
+def upgrade():
+    op.create_table('trending_periods',
+    sa.Column('name', sa.String(length=8), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+    op.create_table('trending_scores',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('period', sa.String(length=8), nullable=False),
+    sa.Column('blog_id', sa.BigInteger(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.ForeignKeyConstraint(['blog_id'], ['blogs.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('period', 'blog_id', name='uq_trending_period_blog')
+    )
+    with op.batch_alter_table('trending_scores', schema=None) as batch_op:
+        batch_op.create_index('ix_trending_period_score', ['period', 'score', 'blog_id'], unique=False)
+        batch_op.create_index('ix_trending_scores_blog_id', ['blog_id'], unique=False)
+
+    # The tables above are new; these two are not and are built without
+    # blocking writes (see c6f04a9d2e18)
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(
+                name, table, columns,
+                unique=False,
+                if_not_exists=True,
+                postgresql_concurrently=True
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                if_exists=True,
+                postgresql_concurrently=True
+            )
+
+    with op.batch_alter_table('trending_scores', schema=None) as batch_op:
+        batch_op.drop_index('ix_trending_scores_blog_id')
+        batch_op.drop_index('ix_trending_period_score')
+
+    op.drop_table('trending_scores')
+    op.drop_table('trending_periods')
@@ -0,0 +1,150 @@
+import os
+import tempfile
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+
+# create_app reads its configuration from the environment
+_, DATABASE_PATH = tempfile.mkstemp(prefix="blig_test_", suffix=".db")
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{DATABASE_PATH}",
+    "JWT_SECRET_KEY": "test-secret-key-that-is-long-enough-for-hs256",
+    "BCRYPT_ROUNDS": "4",
+    "UPLOAD_BACKEND": "local",
+    "UPLOAD_WORKERS": "0",
+    "UPLOAD_LOCAL_ROOT": tempfile.mkdtemp(prefix="blig_test_media_"),
+    "CACHE_BACKEND": "none",
+    # Keep the periodic blocklist reload out of per-request query counts
+    "BLOCKLIST_REFRESH_SECONDS": "3600",
+    "METRICS_TOKEN": "test-metrics-token"
+})
+
+from app import create_app  # noqa: E402
+from app.extensions import db  # noqa: E402
+from app.models import Blog, Comment, Follow, Like, Media, User  # noqa: E402
+
+USERS = 60
+
+
+def _seed():
+    now = datetime.utcnow()
+
+    def at(i):
+        return now - timedelta(minutes=i)
+
+    db.session.execute(insert(User), [
+        {"username": f"user{i}", "email": f"user{i}@test.local", "password_hash": "x"}
+        for i in range(1, USERS + 1)
+    ])
+    db.session.execute(insert(Blog), [
+        {
+            "author_id": i, "title": f"blog {i}", "body_text": "lorem ipsum",
+            "excerpt": "lorem ipsum", "is_published": True,
+            "created_at": at(i), "updated_at": at(i)
+        } for i in range(1, USERS + 1)
+    ])
+
+    # Blog 1 has many comments, likes and media; blog 2 has none
+    db.session.execute(insert(Comment), [
+        {
+            "blog_id": 1, "author_id": i, "content": f"comment {i}",
+            "created_at": at(i), "updated_at": at(i)
+        } for i in range(1, USERS + 1)
+    ])
+    db.session.execute(insert(Like), [
+        {"user_id": i, "blog_id": 1, "created_at": at(i)} for i in range(1, USERS + 1)
+    ])
+    db.session.execute(insert(Media), [
+        {
+            "blog_id": 1, "uploader_id": 1, "media_type": "image", "status": "ready",
+            "media_url": f"http://media.test/{i}.png", "position": i
+        } for i in range(5)
+    ])
+
+    # User 1 is followed by everyone; user 2 follows everyone
+    db.session.execute(insert(Follow), [
+        {"follower_id": i, "following_id": 1, "created_at": at(i)}
+        for i in range(2, USERS + 1)
+    ] + [
+        {"follower_id": 2, "following_id": i, "created_at": at(i)}
+        for i in range(3, USERS + 1)
+    ])
+    db.session.commit()
+
+    from app.counters import reconcile_counters
+    from app.timeline import rebuild_timelines
+    from app.trending import refresh_trending
+
+    reconcile_counters()
+    rebuild_timelines()
+    refresh_trending()
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        _seed()
+
+    yield app
+
+    os.unlink(DATABASE_PATH)
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def auth_headers(app):
+    from flask_jwt_extended import create_access_token
+
+    with app.app_context():
+        token = create_access_token(identity="2")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def empty_app(monkeypatch, tmp_path):
+    """An app on its own empty database, for tests that write freely."""
+    from app import search
+
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'empty.db'}")
+    # The fallback search index is per process; keep this database's blogs
+    # out of the one built for the seeded app
+    monkeypatch.setattr(search, "_index", search.InvertedIndex())
+    app = create_app()
+    app.config["TESTING"] = True
+
+    with app.app_context():
+        # Other tests' apps may have registered replica binds on db
+        db.create_all(bind_key=None)
+
+    yield app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+def make_users(count):
+    db.session.execute(insert(User), [
+        {"username": f"member{i}", "email": f"member{i}@test.local", "password_hash": "x"}
+        for i in range(1, count + 1)
+    ])
+
+
+def make_blogs(count, author_id=1):
+    now = datetime.utcnow()
+    db.session.execute(insert(Blog), [
+        {
+            "author_id": author_id, "title": f"post {i}", "body_text": f"body of post {i}",
+            "excerpt": f"body of post {i}", "is_published": True,
+            "created_at": now, "updated_at": now
+        } for i in range(1, count + 1)
+    ])
@@ -0,0 +1,55 @@
+from sqlalchemy import text
+from app.advisor import find_seq_scans, sample_requests, seq_scans
+from app.extensions import db
+
+
+def test_samples_cover_every_get_route(app):
+    with app.app_context():
+        requests, viewer_id = sample_requests(app)
+
+    endpoints = {
+        rule.endpoint for rule in app.url_map.iter_rules()
+        if "GET" in rule.methods and rule.endpoint != "static"
+    }
+    assert {endpoint for endpoint, _ in requests} == endpoints
+    assert viewer_id == 2
+    assert ("blog.get_single_blog", "/blogs/1") in requests
+
+
+def test_seq_scans_reads_the_sqlite_plan(app):
+    with app.app_context():
+        engine = db.engine
+        assert seq_scans(engine, "SELECT * FROM comments WHERE content = ?", ("x",)) == ["comments"]
+        assert seq_scans(engine, "SELECT * FROM blogs WHERE id = ?", (1,)) == []
+        # Scans of subqueries are not scans of a table
+        assert seq_scans(engine, "SELECT * FROM (SELECT 1 AS x) AS t", ()) == []
+
+
+def test_find_seq_scans_requests_every_route(app):
+    issued, findings = find_seq_scans(app, min_rows=10 ** 9)
+
+    assert findings == []
+    assert issued["/blogs/1"] > 0
+    assert all(count >= 0 for count in issued.values())
+
+
+def test_find_seq_scans_flags_tables_over_the_threshold(app):
+    _, findings = find_seq_scans(app, min_rows=0)
+
+    for scan in findings:
+        assert scan.table in db.metadata.tables
+        assert scan.statement.lstrip().upper().startswith("SELECT")
+
+
+def test_explain_routes_command(app):
+    runner = app.test_cli_runner()
+
+    result = runner.invoke(args=["explain-routes", "--min-rows", str(10 ** 9)])
+    assert result.exit_code == 0, result.output
+    assert "queries  /blogs/1\n" in result.output
+    assert "No sequential scans" in result.output
+
+    _, findings = find_seq_scans(app, min_rows=0)
+    result = runner.invoke(args=["explain-routes", "--min-rows", "0"])
+    assert result.exit_code == (1 if findings else 0)
+    assert result.output.count("SEQ SCAN") == len(findings)
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import pytest
+from app import create_app, search
+from app.aio import THREADED_ENDPOINTS, AsgiApp, _environ
+from app.extensions import db
+from app.query_counter import QueryCounter
+
+# Values that legitimately differ between two runs
+VOLATILE = {"access_token", "refresh_token", "created_at", "updated_at", "next_cursor"}
+
+
+def test_threaded_endpoints_exist(app):
+    # A renamed view would silently fall back to the event loop
+    assert THREADED_ENDPOINTS <= set(app.view_functions)
+
+
+def test_environ_translates_the_scope():
+    environ = _environ({
+        "type": "http", "method": "GET", "path": "/blogs/café",
+        "query_string": b"per_page=5&q=a%26b", "root_path": "",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-forwarded-for", b"10.0.0.1"),
+            (b"x-forwarded-for", b"10.0.0.2"),
+        ],
+        "server": ("api.test", 443), "client": ("10.0.0.9", 5000), "scheme": "https"
+    }, b"{}")
+
+    assert environ["PATH_INFO"] == "/blogs/café".encode("utf-8").decode("latin-1")
+    assert environ["QUERY_STRING"] == "per_page=5&q=a%26b"
+    assert environ["CONTENT_TYPE"] == "application/json"
+    assert environ["CONTENT_LENGTH"] == "2"
+    assert environ["HTTP_X_FORWARDED_FOR"] == "10.0.0.1,10.0.0.2"
+    assert environ["wsgi.url_scheme"] == "https"
+    assert environ["wsgi.input"].read() == b"{}"
+
+
+def _app(monkeypatch, path):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{path}")
+    monkeypatch.setattr(search, "_index", search.InvertedIndex())
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all(bind_key=None)
+    return app
+
+
+def _scrub(value):
+    if isinstance(value, dict):
+        return {k: "*" if k in VOLATILE else _scrub(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_scrub(v) for v in value]
+    return value
+
+
+async def _scenario(call):
+    """Register, log in, post, list, like, follow and read the feed."""
+    results = []
+
+    async def step(method, path, body=None, token=None):
+        status, payload = await call(method, path, body, token)
+        results.append((method, path, status, _scrub(payload)))
+        return payload
+
+    for name in ("ann", "bob"):
+        await step("POST", "/register", {
+            "username": name, "email": f"{name}@test.local", "password": "hunter22"
+        })
+    ann = (await step("POST", "/login", {"email": "ann@test.local", "password": "hunter22"}))["access_token"]
+    bob = (await step("POST", "/login", {"email": "bob@test.local", "password": "hunter22"}))["access_token"]
+
+    for i in range(3):
+        await step("POST", "/blogs", {"title": f"post {i}", "body_text": f"words {i}"}, ann)
+    await step("GET", "/blogs?per_page=2")
+    await step("GET", "/blogs?per_page=2&cursor=")
+    await step("POST", "/blogs/1/like", token=bob)
+    await step("GET", "/blogs/1", token=bob)
+    await step("POST", "/users/1/follow", token=bob)
+    await step("GET", "/feed?per_page=10", token=bob)
+    await step("GET", "/users/1/followers", token=bob)
+    await step("GET", "/blogs/999")
+    await step("POST", "/blogs", {"title": "x", "body_text": "y"})
+
+    return results
+
+
+def _wsgi_call(app):
+    client = app.test_client()
+
+    async def call(method, path, body, token):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        response = client.open(path, method=method, json=body, headers=headers)
+        return response.status_code, response.get_json()
+
+    return call
+
+
+def _asgi_call(asgi):
+    async def call(method, path, body, token):
+        path, _, query = path.partition("?")
+        payload = json.dumps(body).encode() if body is not None else b""
+        headers = [(b"content-type", b"application/json")] if body is not None else []
+        if token:
+            headers.append((b"authorization", f"Bearer {token}".encode()))
+
+        messages = [{"type": "http.request", "body": payload, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await asgi({
+            "type": "http", "method": method, "path": path,
+            "query_string": query.encode(), "root_path": "", "headers": headers,
+            "server": ("localhost", 80), "client": ("127.0.0.1", 1234),
+            "scheme": "http", "http_version": "1.1"
+        }, receive, send)
+
+        body = sent[1]["body"]
+        return sent[0]["status"], json.loads(body) if body else None
+
+    return call
+
+
+async def _lifespan(asgi):
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    await asgi({"type": "lifespan"}, receive, send)
+    return sent
+
+
+def test_asgi_serves_the_same_responses_as_wsgi(monkeypatch, tmp_path):
+    wsgi = _app(monkeypatch, tmp_path / "wsgi.db")
+    asgi = AsgiApp(_app(monkeypatch, tmp_path / "asgi.db"))
+
+    async def run_asgi():
+        results = await _scenario(_asgi_call(asgi))
+
+        # Reads really went through the async engine, not the sync one
+        with QueryCounter(asgi.engines.engines[None]) as counter:
+            status, _ = await _asgi_call(asgi)("GET", "/blogs/1/comments", None, None)
+        assert await _lifespan(asgi) == [
+            "lifespan.startup.complete", "lifespan.shutdown.complete"
+        ]
+        return results, status, counter.count
+
+    expected = asyncio.run(_scenario(_wsgi_call(wsgi)))
+    actual, status, async_queries = asyncio.run(run_asgi())
+
+    assert [status for _, _, status, _ in expected] == [
+        201, 201, 200, 200, 201, 201, 201, 200, 200, 200, 200, 200, 200, 200, 404, 401
+    ]
+    assert actual == expected
+    assert status == 200 and async_queries > 0
+
+
+def test_asgi_rejects_other_scope_types(empty_app):
+    with pytest.raises(RuntimeError):
+        asyncio.run(AsgiApp(empty_app)({"type": "websocket"}, None, None))
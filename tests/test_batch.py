@@ -0,0 +1,100 @@
+import pytest
+from flask import g
+from app.batch import _own_globals
+from app.extensions import db
+from app.query_counter import QueryCounter
+
+
+def _batch(client, paths, headers=None):
+    return client.post(
+        "/batch", json={"requests": [{"path": path} for path in paths]}, headers=headers
+    )
+
+
+def test_sub_requests_share_lookups_of_the_same_blog(app, client):
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = _batch(client, ["/blogs/1", "/blogs/1?ref=a", "/blogs/1?ref=b"])
+
+    assert [r["status"] for r in response.get_json()["responses"]] == [200, 200, 200]
+    # Three distinct paths, one get_blog query
+    assert sum(s.startswith("SELECT blogs.id") for s in counter.statements) == 1
+
+
+def test_identical_sub_requests_run_once(app, client):
+    with app.app_context():
+        engine = db.engine
+
+    with QueryCounter(engine) as single:
+        _batch(client, ["/blogs/2"])
+    with QueryCounter(engine) as repeated:
+        response = _batch(client, ["/blogs/2"] * 5)
+
+    responses = response.get_json()["responses"]
+    assert len(responses) == 5 and all(r == responses[0] for r in responses)
+    assert repeated.count == single.count
+
+
+def test_authorization_is_forwarded(client, auth_headers):
+    anonymous = _batch(client, ["/feed", "/blogs?per_page=2"]).get_json()["responses"]
+    signed_in = _batch(client, ["/feed", "/blogs?per_page=2"], auth_headers).get_json()["responses"]
+
+    assert [r["status"] for r in anonymous] == [401, 200]
+    assert [r["status"] for r in signed_in] == [200, 200]
+    assert "liked_by_me" not in anonymous[1]["body"]["blogs"][0]
+    assert "liked_by_me" in signed_in[1]["body"]["blogs"][0]
+
+
+@pytest.mark.parametrize("requests", [
+    None,
+    [],
+    "/blogs",
+    [{"path": "/batch"}],
+    [{"path": "/batch/?x=1"}],
+    [{"path": "/blogs", "method": "POST"}],
+    [{"path": "//evil.test/blogs"}],
+    [{"path": "blogs"}],
+    [{"path": 1}],
+    [{"path": "/blogs"}] * 21,
+])
+def test_invalid_batches_are_rejected(client, requests):
+    assert client.post("/batch", json={"requests": requests}).status_code == 400
+
+
+def test_cap_follows_config(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "BATCH_MAX_REQUESTS", 2)
+
+    assert _batch(client, ["/blogs/1", "/blogs/2"]).status_code == 200
+    assert _batch(client, ["/blogs/1", "/blogs/2", "/blogs/3"]).status_code == 400
+
+
+def test_own_globals_restores_g_and_sums_sql_totals(app):
+    with app.test_request_context():
+        g.marker = "outer"
+        g.sql_count = 3
+        g.sql_statements = [(0.1, "SELECT 1")]
+
+        with _own_globals():
+            g.marker = "inner"
+            g.leaked = True
+            g.sql_count = 2
+            g.sql_statements = [(0.2, "SELECT 2")]
+
+        assert g.marker == "outer"
+        assert "leaked" not in g
+        assert g.sql_count == 5
+        assert [s for _, s in g.sql_statements] == ["SELECT 1", "SELECT 2"]
+
+
+def test_failing_sub_request_does_not_fail_the_batch(empty_app):
+    def boom():
+        raise RuntimeError("boom")
+
+    empty_app.add_url_rule("/boom", "boom", boom)
+    empty_app.config["PROPAGATE_EXCEPTIONS"] = False
+
+    response = _batch(empty_app.test_client(), ["/boom", "/blogs"])
+
+    assert response.status_code == 200
+    assert [r["status"] for r in response.get_json()["responses"]] == [500, 200]
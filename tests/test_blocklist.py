@@ -0,0 +1,92 @@
+import time
+from datetime import datetime, timedelta
+from flask_jwt_extended import create_access_token, decode_token
+from app.blocklist import BlocklistCache, revoke_token
+from app.extensions import db
+from app.models import TokenBlocklist
+from app.query_counter import QueryCounter
+
+
+def test_revoking_a_token_twice_is_idempotent(app):
+    # e.g. a retried logout, or two workers racing inside the refresh window
+    exp = int(time.time()) + 600
+    with app.app_context():
+        revoke_token("11111111-2222-3333-4444-555555555555", exp)
+        revoke_token("11111111-2222-3333-4444-555555555555", exp)
+
+        assert db.session.query(TokenBlocklist).filter_by(
+            jti="11111111-2222-3333-4444-555555555555"
+        ).count() == 1
+        assert app.extensions["blocklist_cache"].is_revoked(
+            "11111111-2222-3333-4444-555555555555"
+        )
+
+
+def test_blocklist_gauge_does_not_count_rows(app, client):
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        body = client.get(
+            "/metrics", headers={"Authorization": "Bearer test-metrics-token"}
+        ).get_data(as_text=True)
+
+    assert 'blig_token_blocklist_rows{state="cached"}' in body
+    assert not any("token_blocklist" in statement for statement in counter.statements)
+
+
+def _token(app, identity="3"):
+    with app.app_context():
+        token = create_access_token(identity=identity)
+        return token, decode_token(token)
+
+
+def test_revoked_token_is_rejected(app, client):
+    token, _ = _token(app)
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/me", headers=headers).status_code == 200
+    assert client.post("/logout", headers=headers).status_code == 200
+    assert client.get("/me", headers=headers).status_code == 401
+
+
+def test_revocation_by_another_worker_is_seen_on_refresh(app):
+    _, claims = _token(app)
+    with app.app_context():
+        # Refreshes on every lookup; the app's own cache never saw this row
+        cache = BlocklistCache(timedelta(minutes=15), 0)
+        db.session.add(TokenBlocklist(
+            jti=claims["jti"], expires_at=datetime.utcfromtimestamp(claims["exp"])
+        ))
+        db.session.commit()
+
+        assert cache.is_revoked(claims["jti"])
+        assert not cache.is_revoked("not-a-revoked-jti")
+
+
+def test_lookups_between_refreshes_run_no_queries(app):
+    with app.app_context():
+        cache = app.extensions["blocklist_cache"]
+        cache.is_revoked("warm-up")
+
+        with QueryCounter(db.engine) as counter:
+            assert not cache.is_revoked("not-a-revoked-jti")
+        assert counter.count == 0
+
+
+def test_entries_expire_with_their_token(app):
+    now = datetime.utcnow()
+    with app.app_context():
+        cache = BlocklistCache(timedelta(minutes=15), 0)
+        cache.is_revoked("warm-up")
+        held = len(cache)
+
+        cache.add("expired", now - timedelta(hours=1), now - timedelta(seconds=1))
+        cache.add("live", now, now + timedelta(minutes=5))
+        # Legacy rows without expires_at live for one token lifetime
+        cache.add("legacy", now - timedelta(minutes=20))
+
+        assert not cache.is_revoked("expired")
+        assert not cache.is_revoked("legacy")
+        assert cache.is_revoked("live")
+        # The refresh behind those lookups dropped the dead entries
+        assert len(cache) == held + 1
@@ -0,0 +1,64 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.cache import LRUBackend, ResponseCache
+
+LISTINGS = ["/blogs?per_page=10&cursor=", "/blogs/search?q=blog&per_page=60"]
+
+
+@pytest.fixture()
+def cache(app):
+    previous = app.extensions["response_cache"]
+    app.extensions["response_cache"] = ResponseCache(LRUBackend(100), 300)
+    yield
+    app.extensions["response_cache"] = previous
+
+
+@pytest.fixture()
+def headers(app):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='5')}"}
+
+
+def _blog(client, path, blog_id):
+    # Anonymous, so the shared cache is used
+    response = client.get(path)
+    return response.headers["X-Cache"], next(
+        blog for blog in response.get_json()["blogs"] if blog["id"] == blog_id
+    )
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_likes_invalidate_cached_listings(client, cache, headers, path):
+    _, before = _blog(client, path, 3)
+    assert _blog(client, path, 3)[0] == "HIT"
+
+    assert client.post("/blogs/3/like", headers=headers).status_code == 200
+    state, after = _blog(client, path, 3)
+    assert (state, after["likes_count"]) == ("MISS", before["likes_count"] + 1)
+
+    assert client.delete("/blogs/3/like", headers=headers).status_code == 200
+    state, after = _blog(client, path, 3)
+    assert (state, after["likes_count"]) == ("MISS", before["likes_count"])
+
+
+@pytest.mark.parametrize("path", LISTINGS)
+def test_comments_invalidate_cached_listings(client, cache, headers, path):
+    _, before = _blog(client, path, 3)
+
+    comment_id = client.post(
+        "/blogs/3/comments", json={"content": "hi"}, headers=headers
+    ).get_json()["comment_id"]
+    assert _blog(client, path, 3)[1]["comments_count"] == before["comments_count"] + 1
+
+    assert client.delete(f"/comments/{comment_id}", headers=headers).status_code == 200
+    assert _blog(client, path, 3)[1]["comments_count"] == before["comments_count"]
+
+
+def test_escaped_query_string_does_not_share_a_key(client, cache):
+    # page=2%26per_page%3D5 is one bad page value, not page=2&per_page=5
+    poisoned = client.get("/blogs?page=2%26per_page%3D5")
+    genuine = client.get("/blogs?page=2&per_page=5")
+
+    assert genuine.headers["X-Cache"] == "MISS"
+    assert genuine.get_json()["page"] == 2
+    assert genuine.get_json()["blogs"] != poisoned.get_json()["blogs"]
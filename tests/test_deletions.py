@@ -0,0 +1,34 @@
+from app.deletions import AccountDeleter, owned_rows
+from app.extensions import db
+from app.likes import apply_likes
+from app.models import Like, User
+
+
+def test_account_with_many_likes_but_no_blogs_is_deleted_in_background(app):
+    with app.app_context():
+        user = User(username="liker", email="liker@test.local", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+
+        apply_likes({(user.id, blog_id): True for blog_id in range(3, 23)})
+        db.session.commit()
+        assert owned_rows(user, 10) > 10
+
+        deleter = AccountDeleter(app, chunk_size=5, sync_max_rows=10)
+        assert deleter.submit(user) is True
+        deleter._executor.shutdown(wait=True)
+
+        db.session.remove()
+        assert db.session.get(User, user.id) is None
+        assert Like.query.filter_by(user_id=user.id).count() == 0
+
+
+def test_small_account_is_deleted_inline(app):
+    with app.app_context():
+        user = User(username="quiet", email="quiet@test.local", password_hash="x")
+        db.session.add(user)
+        db.session.commit()
+
+        deleter = AccountDeleter(app, chunk_size=5, sync_max_rows=10)
+        assert deleter.submit(user) is False
+        assert db.session.get(User, user.id) is None
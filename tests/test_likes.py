@@ -0,0 +1,117 @@
+import threading
+import time
+import pytest
+from sqlalchemy import select
+from app import likes
+from app.extensions import db
+from app.likes import LikeBuffer, add_like, apply_likes, remove_like
+from app.models import Blog, Like
+from tests.conftest import make_blogs, make_users
+
+
+@pytest.fixture()
+def app(empty_app):
+    with empty_app.app_context():
+        make_users(3)
+        make_blogs(2)
+        db.session.commit()
+    return empty_app
+
+
+def _state(blog_id):
+    return (
+        db.session.scalar(select(Blog.likes_count).where(Blog.id == blog_id)),
+        sorted(db.session.scalars(select(Like.user_id).where(Like.blog_id == blog_id)))
+    )
+
+
+def test_add_and_remove_are_idempotent(app):
+    with app.app_context():
+        assert add_like(1, 1) is True
+        assert add_like(1, 1) is False
+        db.session.commit()
+        assert _state(1) == (1, [1])
+
+        assert remove_like(1, 1) is True
+        assert remove_like(1, 1) is False
+        db.session.commit()
+        assert _state(1) == (0, [])
+
+
+def test_apply_likes_nets_out_per_blog(app):
+    with app.app_context():
+        add_like(3, 1)
+        db.session.commit()
+
+        deltas = apply_likes({(1, 1): True, (2, 1): True, (3, 1): False, (1, 2): True})
+        db.session.commit()
+
+        assert deltas == {1: 1, 2: 1}
+        assert _state(1) == (2, [1, 2])
+        assert _state(2) == (1, [1])
+
+
+def test_apply_likes_skips_missing_users_and_blogs(app):
+    with app.app_context():
+        deltas = apply_likes({(1, 1): True, (99, 1): True, (2, 99): True})
+        db.session.commit()
+
+        assert deltas == {1: 1}
+        assert _state(1) == (1, [1])
+
+
+def test_buffer_keeps_the_last_toggle(app):
+    buffer = LikeBuffer(app, interval_ms=60000, max_pending=100)
+
+    for liked in (True, False, True):
+        buffer.toggle(1, 1, liked)
+    buffer.toggle(2, 1, True)
+    buffer.toggle(2, 1, False)
+    assert len(buffer) == 2
+
+    buffer.flush()
+
+    assert len(buffer) == 0
+    with app.app_context():
+        assert _state(1) == (1, [1])
+
+
+def test_buffer_flushes_when_full(app):
+    buffer = LikeBuffer(app, interval_ms=60000, max_pending=2)
+
+    buffer.toggle(1, 1, True)
+    buffer.toggle(2, 1, True)
+
+    assert len(buffer) == 0
+    with app.app_context():
+        assert _state(1) == (2, [1, 2])
+
+
+def test_concurrent_flushes_apply_batches_in_order(app, monkeypatch):
+    buffer = LikeBuffer(app, interval_ms=60000, max_pending=100)
+    taken, release = threading.Event(), threading.Event()
+
+    def slow_apply(changes):
+        # Hold the first batch (the like) until the second flush has started
+        if not taken.is_set():
+            taken.set()
+            release.wait(5)
+        return apply_likes(changes)
+
+    monkeypatch.setattr(likes, "apply_likes", slow_apply)
+
+    buffer.toggle(1, 1, True)
+    first = threading.Thread(target=buffer.flush)
+    first.start()
+    taken.wait(5)
+
+    buffer.toggle(1, 1, False)
+    second = threading.Thread(target=buffer.flush)
+    second.start()
+    time.sleep(0.1)
+    release.set()
+    first.join(5)
+    second.join(5)
+
+    with app.app_context():
+        assert _state(1) == (0, [])
@@ -0,0 +1,31 @@
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app.extensions import db
+
+
+def test_metrics_requires_the_token(client):
+    assert client.get("/metrics").status_code == 401
+    assert client.get(
+        "/metrics", headers={"Authorization": "Bearer wrong"}
+    ).status_code == 401
+
+
+def test_metrics_is_not_served_without_a_token(monkeypatch):
+    from app import create_app
+
+    monkeypatch.delenv("METRICS_TOKEN")
+    app = create_app()
+
+    assert "metrics" not in app.view_functions
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_failed_statement_does_not_leak_its_start_time(app):
+    with app.app_context():
+        with db.engine.connect() as conn:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conn.execute(text("SELECT * FROM no_such_table"))
+
+            assert conn.info.get("query_start", []) == []
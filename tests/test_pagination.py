@@ -0,0 +1,51 @@
+import pytest
+from app.pagination import encode_cursor
+
+NOW = "2026-01-01T00:00:00"
+
+TAMPERED = [
+    [NOW, "1"],
+    [NOW, True],
+    [NOW, None],
+    [NOW, [1]],
+    [NOW, 1.5],
+    [1, 1],
+    [None, 1],
+    [NOW],
+]
+
+
+@pytest.mark.parametrize("path", [
+    "/blogs",
+    "/blogs/1/comments",
+    "/users/1/followers",
+    "/users/2/following",
+])
+@pytest.mark.parametrize("values", TAMPERED)
+def test_tampered_cursor_is_rejected(client, path, values):
+    response = client.get(path, query_string={"cursor": encode_cursor(values)})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "e30", encode_cursor([])])
+def test_malformed_cursor_is_rejected(client, cursor):
+    assert client.get("/blogs", query_string={"cursor": cursor}).status_code == 400
+
+
+def test_trending_cursor_checks_the_score(client):
+    assert client.get("/blogs/trending", query_string={
+        "cursor": encode_cursor([True, 1])
+    }).status_code == 400
+
+
+def test_valid_cursor_pages_on(client):
+    first = client.get("/blogs", query_string={"per_page": 5}).get_json()
+    second = client.get("/blogs", query_string={
+        "per_page": 5, "cursor": first["next_cursor"]
+    })
+
+    assert second.status_code == 200
+    assert {b["id"] for b in first["blogs"]}.isdisjoint(
+        b["id"] for b in second.get_json()["blogs"]
+    )
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import select
+from app.extensions import db
+from app.models import User
+from app.passwords import HasherBusy, PasswordHasher
+
+CREDENTIALS = {"email": "ann@test.local", "password": "hunter22"}
+
+
+def _hasher(app, rounds=4, max_workers=1, max_queue=0):
+    hasher = PasswordHasher(rounds=rounds, max_workers=max_workers, max_queue=max_queue, timeout=5)
+    app.extensions["password_hasher"] = hasher
+    return hasher
+
+
+def _register(client):
+    return client.post("/register", json={"username": "ann", **CREDENTIALS})
+
+
+def _stored_cost(app):
+    with app.app_context():
+        return db.session.scalar(select(User.password_hash)).split("$")[2]
+
+
+def test_full_pool_sheds_load_with_429(empty_app):
+    client = empty_app.test_client()
+    assert _register(client).status_code == 201
+
+    hasher = _hasher(empty_app)
+    # Take the only slot, as a long-running hash would
+    assert hasher._slots.acquire(blocking=False)
+    try:
+        with pytest.raises(HasherBusy):
+            hasher.verify("x", "y")
+
+        for response in (
+            client.post("/register", json={
+                "username": "bob", "email": "bob@test.local", "password": "hunter22"
+            }),
+            client.post("/login", json=CREDENTIALS),
+        ):
+            assert response.status_code == 429
+            assert response.headers["Retry-After"] == "1"
+            assert response.get_json() == {"error": "Server busy, try again shortly"}
+    finally:
+        hasher._slots.release()
+
+    assert client.post("/login", json=CREDENTIALS).status_code == 200
+
+
+def test_login_rehashes_after_a_cost_change(empty_app):
+    client = empty_app.test_client()
+    _hasher(empty_app, rounds=4)
+    assert _register(client).status_code == 201
+    assert _stored_cost(empty_app) == "04"
+
+    _hasher(empty_app, rounds=5)
+    bad = client.post("/login", json={**CREDENTIALS, "password": "wrong"})
+    assert bad.status_code == 401
+    assert _stored_cost(empty_app) == "04"
+
+    assert client.post("/login", json=CREDENTIALS).status_code == 200
+    assert _stored_cost(empty_app) == "05"
+    assert client.post("/login", json=CREDENTIALS).status_code == 200
+
+
+def test_needs_rehash():
+    hasher = PasswordHasher(rounds=12, max_workers=1, max_queue=0, timeout=5)
+
+    assert not hasher.needs_rehash("$2b$12$" + "a" * 53)
+    assert hasher.needs_rehash("$2b$10$" + "a" * 53)
+    assert hasher.needs_rehash("not-a-bcrypt-hash")
@@ -0,0 +1,80 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.cache import LRUBackend, ResponseCache
+
+# In the seed every user likes blog 1, user 2 follows users 3-60 and
+# users 2-60 follow user 1
+
+BLOG_LISTINGS = [
+    "/blogs?per_page=60",
+    "/blogs?per_page=60&cursor=",
+    "/blogs?per_page=60&view=summary",
+    "/blogs/search?q=blog&per_page=60",
+    "/blogs/trending?per_page=60",
+    "/feed?per_page=60",
+]
+
+
+def _headers(app, user_id):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity=str(user_id))}"}
+
+
+@pytest.mark.parametrize("path", BLOG_LISTINGS)
+def test_liked_by_me_marks_the_viewers_likes(client, auth_headers, path):
+    blogs = client.get(path, headers=auth_headers).get_json()["blogs"]
+
+    assert blogs
+    assert all(blog["liked_by_me"] == (blog["id"] == 1) for blog in blogs)
+
+
+@pytest.mark.parametrize("path", [p for p in BLOG_LISTINGS if not p.startswith("/feed")])
+def test_anonymous_listings_have_no_flags(client, path):
+    blogs = client.get(path).get_json()["blogs"]
+
+    assert blogs
+    assert not any("liked_by_me" in blog for blog in blogs)
+
+
+def test_is_following_marks_the_viewers_follows(app, client, auth_headers):
+    followers = client.get("/users/1/followers?per_page=60", headers=auth_headers).get_json()
+    following = client.get("/users/2/following?per_page=60", headers=auth_headers).get_json()
+
+    assert {user["id"]: user["is_following"] for user in followers} == {
+        user_id: user_id != 2 for user_id in range(2, 61)
+    }
+    assert following and all(user["is_following"] for user in following)
+
+    # User 1 follows nobody
+    as_user_1 = client.get("/users/1/followers?per_page=60", headers=_headers(app, 1)).get_json()
+    assert not any(user["is_following"] for user in as_user_1)
+
+
+def test_anonymous_follow_listings_have_no_flags(client):
+    for path in ("/users/1/followers?per_page=10", "/users/2/following?per_page=10"):
+        users = client.get(path).get_json()
+        assert users and not any("is_following" in user for user in users)
+
+
+def test_bad_token_is_served_as_anonymous(client):
+    response = client.get("/blogs?per_page=5", headers={"Authorization": "Bearer nope"})
+
+    assert response.status_code == 200
+    assert not any("liked_by_me" in blog for blog in response.get_json()["blogs"])
+
+
+def test_flagged_responses_bypass_the_shared_cache(app, client, auth_headers):
+    previous = app.extensions["response_cache"]
+    app.extensions["response_cache"] = ResponseCache(LRUBackend(100), 300)
+    try:
+        client.get("/blogs?per_page=5")
+        anonymous = client.get("/blogs?per_page=5")
+        signed_in = client.get("/blogs?per_page=5", headers=auth_headers)
+    finally:
+        app.extensions["response_cache"] = previous
+
+    assert anonymous.headers["X-Cache"] == "HIT"
+    assert "X-Cache" not in signed_in.headers
+    assert "liked_by_me" in signed_in.get_json()["blogs"][0]
+    assert "Authorization" in signed_in.headers["Vary"]
+    assert "Authorization" in anonymous.headers["Vary"]
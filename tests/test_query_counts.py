@@ -0,0 +1,57 @@
+import pytest
+from app.extensions import db
+from app.query_counter import QueryCounter
+
+# Statement counts must not grow with the number of rows on a page; a
+# difference between the small and the large page is an N+1 query.
+
+LISTINGS = [
+    "/blogs?per_page={n}",
+    "/blogs?per_page={n}&cursor=",
+    "/blogs?per_page={n}&cursor=&view=summary",
+    "/blogs/search?q=blog&per_page={n}",
+    "/blogs/1/comments?per_page={n}",
+    "/users/1/followers?per_page={n}",
+    "/users/2/following?per_page={n}",
+]
+
+
+def _count(app, client, path, headers=None):
+    # Warm up first: one-off work such as building the search index or
+    # loading the token blocklist is not part of the per-request cost
+    client.get(path, headers=headers)
+
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get(path, headers=headers)
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return counter.count, response.get_json()
+
+
+@pytest.mark.parametrize("template", LISTINGS)
+@pytest.mark.parametrize("authenticated", [False, True])
+def test_listing_queries_do_not_grow_with_page_size(app, client, auth_headers, template, authenticated):
+    headers = auth_headers if authenticated else None
+
+    small, small_body = _count(app, client, template.format(n=5), headers)
+    large, large_body = _count(app, client, template.format(n=50), headers)
+
+    assert len(str(large_body)) > len(str(small_body))
+    assert small == large
+
+
+def test_feed_queries_do_not_grow_with_page_size(app, client, auth_headers):
+    small, _ = _count(app, client, "/feed?per_page=5", auth_headers)
+    large, _ = _count(app, client, "/feed?per_page=50", auth_headers)
+
+    assert small == large
+
+
+def test_single_blog_queries_do_not_grow_with_children(app, client):
+    # Blog 1 has comments, likes and media; blog 2 has none
+    busy, body = _count(app, client, "/blogs/1")
+    empty, _ = _count(app, client, "/blogs/2")
+
+    assert len(body["media"]) == 5
+    assert busy == empty
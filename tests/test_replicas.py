@@ -0,0 +1,129 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import insert, select
+from app import cache, replicas, search
+from app.cache import LRUBackend, ResponseCache
+from app.extensions import db
+from app.models import Blog, User
+
+
+def test_replicas_require_a_shared_sticky_store(monkeypatch, tmp_path):
+    from app import create_app
+
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{tmp_path / 'replica.db'}")
+    for backend in ("lru", "none"):
+        monkeypatch.setenv("CACHE_BACKEND", backend)
+        with pytest.raises(RuntimeError, match="CACHE_BACKEND=redis"):
+            create_app()
+
+
+class SharedBackend(LRUBackend):
+    """Stands in for Redis: the tests run in one process anyway."""
+
+    def __init__(self, url):
+        super().__init__(1000)
+
+
+@pytest.fixture()
+def app(monkeypatch, tmp_path):
+    from app import create_app
+
+    monkeypatch.setattr(cache, "RedisBackend", SharedBackend)
+    monkeypatch.setattr(replicas, "RedisBackend", SharedBackend)
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'primary.db'}")
+    monkeypatch.setenv("DATABASE_REPLICA_URLS", f"sqlite:///{tmp_path / 'replica.db'}")
+    monkeypatch.setenv("CACHE_BACKEND", "redis")
+    monkeypatch.setenv("REPLICA_STICKY_SECONDS", "60")
+    monkeypatch.setattr(search, "_index", search.InvertedIndex())
+
+    app = create_app()
+    app.config["TESTING"] = True
+    # Keep the sticky markers but serve every response fresh
+    app.extensions["response_cache"] = ResponseCache(None, 0)
+
+    # The same user on both; each database's blog says where it lives
+    with app.app_context():
+        for key in (None, "replica_0"):
+            engine = db.engines[key]
+            db.metadata.create_all(engine)
+            with engine.begin() as conn:
+                conn.execute(insert(User), [
+                    {"username": "ann", "email": "ann@test.local", "password_hash": "x"}
+                ])
+                conn.execute(insert(Blog), [{
+                    "author_id": 1, "title": key or "primary", "body_text": "x",
+                    "excerpt": "x", "is_published": True
+                }])
+
+    yield app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture()
+def router(app):
+    return app.extensions["replica_router"]
+
+
+@pytest.fixture()
+def headers(app):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+
+def _titles(app, headers=None):
+    body = app.test_client().get("/blogs?cursor=", headers=headers).get_json()
+    return sorted(blog["title"] for blog in body["blogs"])
+
+
+def test_reads_go_to_a_replica(app, headers):
+    assert _titles(app) == ["replica_0"]
+    assert _titles(app, headers) == ["replica_0"]
+
+
+def test_writes_go_to_the_primary_and_stick_the_writer(app, headers):
+    response = app.test_client().post(
+        "/blogs", json={"title": "new", "body_text": "y"}, headers=headers
+    )
+    assert response.status_code == 201
+
+    with app.app_context():
+        assert db.session.scalars(select(Blog.title)).all() == ["primary", "new"]
+        with db.engines["replica_0"].connect() as conn:
+            assert conn.scalars(select(Blog.title)).all() == ["replica_0"]
+
+    # The writer reads their own write; everyone else keeps the replica
+    assert _titles(app, headers) == ["new", "primary"]
+    assert _titles(app) == ["replica_0"]
+
+
+def test_sticky_reads_end_with_the_window(app, router, headers):
+    router.mark_sticky("1")
+    assert _titles(app, headers) == ["primary"]
+
+    router.sticky_store._entries.clear()
+    assert _titles(app, headers) == ["replica_0"]
+
+
+def test_lagging_replica_leaves_and_rejoins_rotation(app, router, monkeypatch):
+    monkeypatch.setattr(router, "_lag", lambda engine: router.max_lag + 1)
+    router._next_check["replica_0"] = 0
+    assert _titles(app) == ["primary"]
+    assert router.healthy() == []
+
+    monkeypatch.setattr(router, "_lag", lambda engine: 0.0)
+    router._next_check["replica_0"] = 0
+    assert _titles(app) == ["replica_0"]
+
+
+def test_failing_replica_falls_back_to_the_primary(app, router, monkeypatch):
+    def unreachable(engine):
+        raise ConnectionError("replica is down")
+
+    monkeypatch.setattr(router, "_lag", unreachable)
+    router._next_check["replica_0"] = 0
+
+    assert _titles(app) == ["primary"]
+    assert router._healthy == {"replica_0": False}
@@ -0,0 +1,108 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import Blog
+from app.query_counter import QueryCounter
+from tests.conftest import make_users
+
+POSTS = [
+    ("Python packaging", "wheels and sdists"),
+    ("Flask tips", "python decorators for flask views"),
+    ("Cooking", "pasta with python-free sauce"),
+    ("Gardening", "tomatoes"),
+]
+
+
+@pytest.fixture()
+def app(empty_app):
+    with empty_app.app_context():
+        make_users(1)
+        db.session.add_all([
+            Blog(author_id=1, title=title, body_text=body, excerpt=body, is_published=True)
+            for title, body in POSTS
+        ])
+        db.session.commit()
+    return empty_app
+
+
+@pytest.fixture()
+def headers(app):
+    with app.app_context():
+        return {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+
+def _search(app, q, **args):
+    response = app.test_client().get("/blogs/search", query_string={"q": q, **args})
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def _ids(app, q):
+    return [blog["id"] for blog in _search(app, q)["blogs"]]
+
+
+def test_terms_are_prefix_matched(app):
+    assert set(_ids(app, "pyth")) == {1, 2, 3}
+    assert _ids(app, "tomato") == [4]
+    assert _ids(app, "ython") == []
+
+
+def test_every_term_must_match(app):
+    assert _ids(app, "python flask") == [2]
+    assert _ids(app, "python tomatoes") == []
+
+
+def test_title_matches_rank_above_body_matches(app):
+    # Blog 1 has "python" in its title; 2 and 3 only in the body,
+    # and 2 ties with 3 on rank, so the higher id comes first
+    blogs = _search(app, "python")["blogs"]
+
+    assert [blog["id"] for blog in blogs] == [1, 3, 2]
+    assert blogs[0]["rank"] > blogs[1]["rank"] == blogs[2]["rank"]
+
+
+def test_cursor_continues_the_ranking(app):
+    seen, cursor = [], None
+    while True:
+        args = {"per_page": 1, **({"cursor": cursor} if cursor else {})}
+        page = _search(app, "python", **args)
+        seen += [blog["id"] for blog in page["blogs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert seen == _ids(app, "python")
+
+
+def test_index_follows_create_update_and_delete(app, headers):
+    client = app.test_client()
+    assert _ids(app, "zucchini") == []
+
+    blog_id = client.post(
+        "/blogs", json={"title": "Zucchini bread", "body_text": "moist"}, headers=headers
+    ).get_json()["blog_id"]
+    assert _ids(app, "zucchini") == [blog_id]
+
+    client.put(f"/blogs/{blog_id}", json={"title": "Banana bread"}, headers=headers)
+    assert _ids(app, "zucchini") == []
+    assert _ids(app, "banana moist") == [blog_id]
+
+    client.put(f"/blogs/{blog_id}", json={"body_text": "dense"}, headers=headers)
+    assert _ids(app, "moist") == []
+    assert _ids(app, "banana dense") == [blog_id]
+
+    client.delete(f"/blogs/{blog_id}", headers=headers)
+    assert _ids(app, "banana") == []
+
+
+def test_title_update_does_not_load_the_body(app):
+    _ids(app, "python")
+
+    with app.app_context():
+        blog = db.session.get(Blog, 4)
+        blog.title = "Gardening notes"
+        with QueryCounter(db.engine) as counter:
+            db.session.commit()
+
+    assert not any("body_text" in statement for statement in counter.statements)
+    assert _ids(app, "notes tomatoes") == [4]
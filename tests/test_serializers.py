@@ -0,0 +1,107 @@
+import json
+from datetime import datetime
+import pytest
+from flask.json.provider import DefaultJSONProvider
+from app.extensions import db
+from app.query_counter import QueryCounter
+from app.serializers import (
+    BLOG_DEFAULT_FIELDS, COMMENT, FOLLOW_USER, OrjsonProvider, Serializer, orjson
+)
+
+
+def _get(app, client, path):
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get(path)
+    return response, counter.statements
+
+
+@pytest.mark.parametrize("path", [
+    "/blogs?per_page=3",
+    "/blogs?per_page=3&cursor=",
+    "/blogs/search?q=blog&per_page=3",
+    "/feed?per_page=3",
+])
+def test_default_blog_payload(app, client, auth_headers, path):
+    blogs = client.get(path, headers=auth_headers).get_json()["blogs"]
+
+    assert blogs
+    assert all(set(blog) - {"liked_by_me", "rank"} == set(BLOG_DEFAULT_FIELDS) for blog in blogs)
+
+
+def test_single_blog_payload(client):
+    blog = client.get("/blogs/1").get_json()
+
+    assert set(blog) == set(BLOG_DEFAULT_FIELDS)
+    assert blog["author"] == {"id": 1, "username": "user1"}
+    assert blog["likes_count"] == 60 and blog["comments_count"] == 60
+    assert [m["url"] for m in blog["media"]] == [f"http://media.test/{i}.png" for i in range(5)]
+    datetime.fromisoformat(blog["created_at"])
+
+
+@pytest.mark.parametrize("path", [
+    "/blogs?per_page=3&fields=title,id",
+    "/blogs?per_page=3&cursor=&fields=id,title",
+    "/blogs/search?q=blog&per_page=3&fields=id,title",
+])
+def test_listing_projection_selects_only_what_it_returns(app, client, path):
+    response, statements = _get(app, client, path)
+
+    assert [set(blog) - {"rank"} for blog in response.get_json()["blogs"]] == [{"id", "title"}] * 3
+    assert not any("body_text" in s or "FROM media" in s for s in statements)
+
+
+def test_single_blog_projection(app, client):
+    response, statements = _get(app, client, "/blogs/1?fields=id,media")
+
+    assert set(response.get_json()) == {"id", "media"}
+    assert not any("body_text" in s for s in statements)
+
+
+@pytest.mark.parametrize("path, fields", [
+    ("/blogs/1/comments?per_page=2&fields=content", {"content"}),
+    ("/blogs/1/comments?per_page=2", set(COMMENT.fields)),
+    ("/users/1/followers?per_page=2&fields=username", {"username"}),
+    ("/users/2/following?per_page=2", set(FOLLOW_USER.fields)),
+])
+def test_comment_and_follow_projection(client, path, fields):
+    items = client.get(path).get_json()
+
+    assert len(items) == 2
+    assert all(set(item) == fields for item in items)
+
+
+@pytest.mark.parametrize("path", [
+    "/blogs?fields=id,nope",
+    "/blogs/1?fields=password_hash",
+    "/blogs/1/comments?fields=email",
+    "/users/1/followers?fields=email",
+])
+def test_unknown_fields_are_rejected(client, path):
+    response = client.get(path)
+
+    assert response.status_code == 400
+    assert response.get_json()["error"].startswith("Unknown fields: ")
+
+
+def test_serializer_compiles_each_selection_once():
+    serializer = Serializer(a=lambda row: row["a"], b=lambda row: row["b"])
+
+    assert serializer(("a",)) is serializer(("a",))
+    assert serializer(("b", "a"))({"a": 1, "b": 2}) == {"b": 2, "a": 1}
+    assert serializer()({"a": 1, "b": 2}) == {"a": 1, "b": 2}
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+def test_orjson_provider_matches_the_default_encoding(app):
+    payload = {
+        "b": [1, 2.5, None], "a": {"z": True, "y": "é"},
+        "at": datetime(2026, 1, 2, 3, 4, 5)
+    }
+
+    fast = OrjsonProvider(app).dumps(payload)
+    plain = DefaultJSONProvider(app).dumps(payload)
+
+    assert json.loads(fast) == json.loads(plain)
+    assert list(json.loads(fast)) == ["a", "at", "b"]
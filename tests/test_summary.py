@@ -0,0 +1,76 @@
+import pytest
+from flask_jwt_extended import create_access_token
+from app.extensions import db
+from app.models import Blog
+from app.models.blog import EXCERPT_LENGTH, make_excerpt
+from app.query_counter import QueryCounter
+from app.serializers import BLOG_SUMMARY_FIELDS
+from tests.conftest import make_users
+
+SUMMARY_LISTINGS = [
+    "/blogs?per_page=10&view=summary",
+    "/blogs?per_page=10&cursor=&view=summary",
+    "/blogs/search?q=blog&per_page=10&view=summary",
+    "/blogs/trending?per_page=10&view=summary",
+    "/feed?per_page=10&view=summary",
+]
+
+
+@pytest.mark.parametrize("path", SUMMARY_LISTINGS)
+def test_summary_never_reads_the_body(app, client, auth_headers, path):
+    # Building the SQLite search index reads every body once; that is not
+    # part of serving the page
+    client.get(path, headers=auth_headers)
+
+    with app.app_context():
+        engine = db.engine
+    with QueryCounter(engine) as counter:
+        response = client.get(path, headers=auth_headers)
+
+    assert response.status_code == 200
+    for blog in response.get_json()["blogs"]:
+        assert set(blog) - {"liked_by_me", "rank", "score"} == set(BLOG_SUMMARY_FIELDS)
+    assert not any("body_text" in statement for statement in counter.statements)
+
+
+def test_summary_thumbnail_is_the_first_media_item(client):
+    blogs = {
+        blog["id"]: blog
+        for blog in client.get("/blogs?per_page=60&view=summary").get_json()["blogs"]
+    }
+
+    assert blogs[1]["thumbnail"] == "http://media.test/0.png"
+    assert blogs[2]["thumbnail"] is None
+    assert blogs[1]["excerpt"] == "lorem ipsum"
+
+
+def test_excerpt_is_cut_at_a_word_boundary():
+    assert make_excerpt("  short\n\ttext  ") == "short text"
+    assert make_excerpt(None) == ""
+
+    excerpt = make_excerpt("word " * 100)
+    assert excerpt.endswith("word…")
+    assert len(excerpt) <= EXCERPT_LENGTH + 1
+
+    assert make_excerpt("x" * 500) == "x" * EXCERPT_LENGTH + "…"
+
+
+def test_writes_keep_the_excerpt_current(empty_app):
+    client = empty_app.test_client()
+    with empty_app.app_context():
+        make_users(1)
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity='1')}"}
+
+    blog_id = client.post(
+        "/blogs", json={"title": "t", "body_text": "first  body"}, headers=headers
+    ).get_json()["blog_id"]
+    client.put(f"/blogs/{blog_id}", json={"title": "renamed"}, headers=headers)
+
+    with empty_app.app_context():
+        assert db.session.get(Blog, blog_id).excerpt == "first body"
+
+    client.put(f"/blogs/{blog_id}", json={"body_text": "second body"}, headers=headers)
+
+    with empty_app.app_context():
+        assert db.session.get(Blog, blog_id).excerpt == "second body"
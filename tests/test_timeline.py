@@ -0,0 +1,48 @@
+from sqlalchemy import func, select
+from app.extensions import db
+from app.models import TimelineEntry
+from app.query_counter import QueryCounter
+from app.timeline import trim_timelines
+
+
+def _lengths(user_ids):
+    return dict(db.session.execute(
+        select(TimelineEntry.user_id, func.count())
+        .where(TimelineEntry.user_id.in_(user_ids))
+        .group_by(TimelineEntry.user_id)
+    ).all())
+
+
+def test_trim_cuts_only_timelines_over_the_cap(app, monkeypatch):
+    # User 2 follows everyone; user 3 only follows user 1
+    monkeypatch.setitem(app.config, "TIMELINE_MAX_LENGTH", 5)
+
+    with app.app_context():
+        before = _lengths([2, 3])
+        assert before[2] > 5 >= before[3]
+
+        newest = db.session.scalars(
+            select(TimelineEntry.blog_id)
+            .where(TimelineEntry.user_id == 2)
+            .order_by(TimelineEntry.created_at.desc(), TimelineEntry.blog_id.desc())
+            .limit(5)
+        ).all()
+
+        trim_timelines([2, 3])
+
+        assert _lengths([2, 3]) == {2: 5, 3: before[3]}
+        assert set(db.session.scalars(
+            select(TimelineEntry.blog_id).where(TimelineEntry.user_id == 2)
+        )) == set(newest)
+
+        db.session.rollback()
+
+
+def test_trim_skips_the_ranking_when_nothing_is_over_the_cap(app):
+    with app.app_context():
+        with QueryCounter(db.engine) as counter:
+            trim_timelines([2, 3])
+        db.session.rollback()
+
+    assert counter.count == 1
+    assert not any("DELETE" in statement for statement in counter.statements)
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert, select, update
+from app.extensions import db
+from app.likes import add_like, remove_like
+from app.models import Comment, Like, TrendingPeriod, TrendingScore
+from app.trending import refresh_trending
+from tests.conftest import make_blogs, make_users
+
+
+@pytest.fixture()
+def activity(empty_app):
+    """Blog 1: two likes now. Blog 2: a comment an hour ago. Blog 3: three
+    likes 25 hours ago, outside the 24h window but inside 7d."""
+    now = datetime.utcnow()
+
+    with empty_app.app_context():
+        make_users(4)
+        make_blogs(4)
+        db.session.execute(insert(Like), [
+            {"user_id": 1, "blog_id": 1, "created_at": now},
+            {"user_id": 2, "blog_id": 1, "created_at": now},
+        ] + [
+            {"user_id": user_id, "blog_id": 3, "created_at": now - timedelta(hours=25)}
+            for user_id in (1, 2, 3)
+        ])
+        db.session.execute(insert(Comment), [{
+            "blog_id": 2, "author_id": 1, "content": "hi",
+            "created_at": now - timedelta(hours=1), "updated_at": now - timedelta(hours=1)
+        }])
+        db.session.commit()
+
+        refresh_trending()
+
+    return empty_app
+
+
+def _trending(app, window):
+    body = app.test_client().get(f"/blogs/trending?window={window}").get_json()
+    return {blog["id"]: blog["score"] for blog in body["blogs"]}, [
+        blog["id"] for blog in body["blogs"]
+    ]
+
+
+def test_scores_decay_with_age_and_respect_the_window(activity):
+    scores, order = _trending(activity, "24h")
+
+    # A comment is worth 3 likes and halves every 6 hours in this window
+    assert order == [2, 1]
+    assert scores[1] == pytest.approx(2.0, rel=0.02)
+    assert scores[2] == pytest.approx(3 * 2 ** (-1 / 6), rel=0.02)
+
+    scores, order = _trending(activity, "7d")
+
+    assert order == [2, 1, 3]
+    assert scores[3] == pytest.approx(3 * 2 ** (-25 / 36), rel=0.02)
+
+
+def test_likes_after_a_refresh_move_the_score(activity):
+    with activity.app_context():
+        assert add_like(4, 3)
+        db.session.commit()
+    assert _trending(activity, "24h")[0][3] == pytest.approx(1.0, rel=0.01)
+
+    with activity.app_context():
+        assert remove_like(4, 3)
+        db.session.commit()
+    assert 3 not in _trending(activity, "24h")[0]
+
+
+def test_writers_use_the_latest_refresh_as_base(activity):
+    # As if another process had refreshed 12 hours (two half-lives) ago:
+    # a like now must be stored as 2^2 relative to that base
+    _trending(activity, "24h")
+    with activity.app_context():
+        db.session.execute(
+            update(TrendingPeriod)
+            .where(TrendingPeriod.name == "24h")
+            .values(refreshed_at=datetime.utcnow() - timedelta(hours=12))
+        )
+        db.session.commit()
+
+        add_like(4, 4)
+        db.session.commit()
+
+        stored = db.session.scalar(select(TrendingScore.score).where(
+            TrendingScore.period == "24h", TrendingScore.blog_id == 4
+        ))
+    assert stored == pytest.approx(4.0, rel=0.01)
+
+
+def test_refresh_replaces_scores_written_since(activity):
+    with activity.app_context():
+        add_like(4, 4)
+        db.session.commit()
+
+        assert refresh_trending(["24h"]) == {"24h": 3}
+    assert _trending(activity, "24h")[1] == [2, 1, 4]
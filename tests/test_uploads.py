@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from app.extensions import db
+from app.models import Media
+from app.uploads import fail_stale_media
+
+
+def test_sweep_fails_only_stale_pending_media(app):
+    now = datetime.utcnow()
+
+    with app.app_context():
+        stale, fresh, done = (
+            Media(blog_id=2, uploader_id=2, media_type="image", status=status,
+                  created_at=now - age)
+            for status, age in (
+                ("pending", timedelta(hours=2)),
+                ("pending", timedelta(minutes=1)),
+                ("ready", timedelta(hours=2)),
+            )
+        )
+        db.session.add_all([stale, fresh, done])
+        db.session.commit()
+
+        assert fail_stale_media(timedelta(minutes=30)) == 1
+        assert (stale.status, fresh.status, done.status) == ("failed", "pending", "ready")
+
+        db.session.delete(stale)
+        db.session.delete(fresh)
+        db.session.delete(done)
+        db.session.commit()
+
+
+def test_sweep_command(app):
+    result = app.test_cli_runner().invoke(args=["sweep-uploads", "--older-than", "5"])
+
+    assert result.exit_code == 0
+    assert "Marked 0 stale upload(s) as failed" in result.output